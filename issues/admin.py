@@ -1,6 +1,8 @@
 from django.contrib import admin
+from django.contrib.auth import get_user_model
 from django.contrib.gis.admin import GISModelAdmin
-from .models import Issue, IssueImage
+from django.db.models import Q
+from .models import ImageBlob, Issue, IssueImage, search_query
 
 class IssueImageInline(admin.TabularInline):
     """Inline admin for issue images"""
@@ -12,13 +14,29 @@ class IssueAdmin(GISModelAdmin):
     """Admin interface for issues with map display"""
     list_display = (
         'id', 'title', 'type', 'status', 'priority', 
-        'reported_by', 'created_at', 'updated_at'
+        'reported_by', 'upvotes', 'created_at', 'updated_at'
     )
     list_filter = ('type', 'status', 'priority', 'created_at')
+    # Searched through search_vector, see get_search_results()
     search_fields = ('title', 'description', 'reported_by__username')
     readonly_fields = ('created_at', 'updated_at')
     date_hierarchy = 'created_at'
     inlines = [IssueImageInline]
+    
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Match the full-text index on title and description, or the exact
+        username of the reporter, instead of icontains scans
+        """
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        reporters = list(
+            get_user_model().objects.filter(username__iexact=search_term).values_list('pk', flat=True)
+        )
+        return queryset.filter(
+            Q(search_vector=search_query(search_term)) | Q(reported_by__in=reporters)
+        ), False
 
     # gis_widget_kwargs = {
     #     'default_lat': 20.5937,   # Latitude for center of India
@@ -32,4 +50,11 @@ class IssueImageAdmin(admin.ModelAdmin):
     list_display = ('id', 'issue', 'caption', 'uploaded_at')
     list_filter = ('uploaded_at',)
     search_fields = ('caption', 'issue__title')
-    readonly_fields = ('uploaded_at',)
\ No newline at end of file
+    readonly_fields = ('uploaded_at',)
+
+@admin.register(ImageBlob)
+class ImageBlobAdmin(admin.ModelAdmin):
+    """Admin interface for deduplicated image files"""
+    list_display = ('digest', 'name', 'size', 'refcount', 'created_at')
+    search_fields = ('digest', 'name')
+    readonly_fields = ('digest', 'name', 'size', 'refcount', 'created_at')
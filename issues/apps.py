@@ -3,4 +3,8 @@ from django.apps import AppConfig
 class IssuesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'issues'
-    verbose_name = 'Issue Management'
\ No newline at end of file
+    verbose_name = 'Issue Management'
+    
+    def ready(self):
+        # Register signal handlers
+        from . import signals  # noqa: F401
@@ -0,0 +1,91 @@
+"""
+Async versions of the hot issue reads (list, retrieve and nearby), served in
+place of IssueViewSet under ASGI by nagarkranti.async_views.AsyncReadMiddleware.
+Querysets, filters, pagination, serializers and the response cache are the
+viewset's own, so both paths return the same responses.
+"""
+from django.conf import settings
+from django.contrib.gis.geos import Point
+from django.http import StreamingHttpResponse
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import exceptions
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from nagarkranti.async_views import AsyncAPIView
+from users.permissions import IsOwnerOrMunicipal
+from .cache import acached_response
+from .models import Issue
+from .pagination import IssueCursorPagination, NearbyCursorPagination
+from .serializers import IssueListSerializer, IssueSerializer, NearbyIssueSerializer
+from .views import IssueQuerysetMixin, IssueViewSet
+
+class IssueListView(IssueQuerysetMixin, AsyncAPIView):
+    """GET /api/issues/"""
+    action = 'list'
+    permission_classes = IssueViewSet.permission_classes + [IsOwnerOrMunicipal]
+    filterset_fields = IssueViewSet.filterset_fields
+    
+    async def get(self, request):
+        return await acached_response(request, self.list)
+    
+    async def list(self, request):
+        queryset = DjangoFilterBackend().filter_queryset(request, self.get_queryset(), self)
+        paginator = IssueCursorPagination()
+        page = await paginator.apaginate_queryset(queryset, request, self)
+        serializer = IssueListSerializer(page, many=True, context=self.get_serializer_context())
+        return paginator.get_paginated_response(serializer.data)
+
+class IssueDetailView(IssueQuerysetMixin, AsyncAPIView):
+    """GET /api/issues/{id}/"""
+    action = 'retrieve'
+    permission_classes = IssueViewSet.permission_classes + [IsOwnerOrMunicipal]
+    
+    async def get(self, request, pk):
+        return await acached_response(request, self.retrieve, pk)
+    
+    async def retrieve(self, request, pk):
+        try:
+            issue = await self.get_queryset().aget(pk=pk)
+        except (Issue.DoesNotExist, TypeError, ValueError):
+            raise exceptions.NotFound()
+        self.check_object_permissions(request, issue)
+        serializer = IssueSerializer(issue, context=self.get_serializer_context())
+        return Response(serializer.data)
+
+class NearbyIssueView(IssueQuerysetMixin, AsyncAPIView):
+    """POST /api/issues/nearby/"""
+    action = 'nearby'
+    replica_read_actions = IssueViewSet.replica_read_actions
+    throttle_classes = IssueViewSet.throttle_classes
+    throttle_scopes = IssueViewSet.throttle_scopes
+    
+    async def post(self, request):
+        serializer = NearbyIssueSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        latitude = serializer.validated_data['latitude']
+        longitude = serializer.validated_data['longitude']
+        distance = serializer.validated_data.get('distance', 5000)  # Default 5km
+        limit = serializer.validated_data.get('limit')
+        
+        queryset = self.get_queryset().within_distance(
+            Point(longitude, latitude, srid=4326), distance
+        ).order_by('distance', 'id')
+        
+        if serializer.validated_data['stream']:
+            return self.stream_issues(queryset[:limit or settings.NEARBY_MAX_RESULTS])
+        
+        paginator = NearbyCursorPagination()
+        paginator.page_size = limit or api_settings.PAGE_SIZE
+        page = await paginator.apaginate_queryset(queryset, request, self)
+        return paginator.get_paginated_response(IssueListSerializer(page, many=True).data)
+    
+    def stream_issues(self, queryset):
+        """Stream serialized issues as NDJSON, fetched in chunks with aiterator()"""
+        renderer = JSONRenderer()
+        
+        async def rows():
+            async for issue in queryset.aiterator(chunk_size=settings.NEARBY_STREAM_CHUNK_SIZE):
+                yield renderer.render(IssueListSerializer(issue).data) + b'\n'
+        
+        return StreamingHttpResponse(rows(), content_type='application/x-ndjson')
@@ -0,0 +1,183 @@
+"""
+Response cache for issue reads (list and retrieve).
+Entries live in per-user-scope namespaces: one per citizen, since citizens
+only see their own issues, and one shared by all municipal users. Each
+namespace carries a version number that is part of every key, and the
+signal handlers in issues.signals bump it when an issue or image in that
+scope changes, so stale entries are never read again.
+"""
+import hashlib
+import time
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+from nagarkranti.routers import reading_from_replica
+
+KEY_PREFIX = 'issue-response'
+COUNTERS = ('hits', 'misses', 'not_modified')
+
+def get_cache():
+    return caches[settings.ISSUE_CACHE_ALIAS]
+
+def user_scope(user):
+    """Cache namespace whose entries `user` may see"""
+    if user.is_municipal_user():
+        return 'municipal'
+    return f'citizen:{user.pk}'
+
+def version_key(scope):
+    return f'{KEY_PREFIX}:version:{scope}'
+
+def scope_version(scope):
+    # Versions start from the clock so a lost version key never reuses an old one
+    return get_cache().get_or_set(version_key(scope), time.time_ns, None)
+
+async def ascope_version(scope):
+    return await get_cache().aget_or_set(version_key(scope), time.time_ns, None)
+
+def invalidate_reporter(reporter_id):
+    """
+    Invalidate every cached response that could include issues of `reporter_id`.
+    Runs now and again after commit, so a read racing with the write cannot
+    re-cache the old data for the lifetime of the entry.
+    """
+    def bump():
+        cache = get_cache()
+        for scope in ('municipal', f'citizen:{reporter_id}'):
+            cache.set(version_key(scope), time.time_ns(), None)
+    
+    bump()
+    transaction.on_commit(bump)
+
+def count(counter):
+    cache = get_cache()
+    key = f'{KEY_PREFIX}:stats:{counter}'
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add() and incr(), or a backend that stores nothing
+        pass
+
+async def acount(counter):
+    cache = get_cache()
+    key = f'{KEY_PREFIX}:stats:{counter}'
+    await cache.aadd(key, 0, None)
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        pass
+
+def cache_stats():
+    """Hit/miss counters for tuning ISSUE_CACHE_TIMEOUT and the cache size"""
+    cache = get_cache()
+    stats = {counter: cache.get(f'{KEY_PREFIX}:stats:{counter}', 0) for counter in COUNTERS}
+    lookups = sum(stats.values())
+    stats['hit_rate'] = (stats['hits'] + stats['not_modified']) / lookups if lookups else None
+    return stats
+
+def response_etag(key, data):
+    """ETag from the cache key (scope version and URL) and the latest updated_at"""
+    items = data.get('results', [data]) if isinstance(data, dict) else data
+    latest = max((item.get('updated_at') or '' for item in items), default='')
+    return '"%s"' % hashlib.md5(f'{key}:{latest}'.encode()).hexdigest()
+
+def not_modified(etag):
+    return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+def etag_matches(etag, if_none_match):
+    """Whether an If-None-Match header value matches `etag`, by weak comparison"""
+    etags = parse_etags(if_none_match)
+    if etags == ['*']:
+        return True
+    return etag.removeprefix('W/') in {tag.removeprefix('W/') for tag in etags}
+
+def response_key(request, scope, version):
+    # Responses embed absolute links, so they differ by host
+    return f'{KEY_PREFIX}:{scope}:{version}:{request.get_host()}:{request.get_full_path()}'
+
+def cached_hit(entry, if_none_match):
+    """Return the counter to bump and the response for a cache hit"""
+    if etag_matches(entry['etag'], if_none_match):
+        return 'not_modified', not_modified(entry['etag'])
+    response = Response(entry['data'], headers=entry['headers'])
+    response['ETag'] = entry['etag']
+    response['X-Cache'] = 'HIT'
+    return 'hits', response
+
+def cache_entry(key, response):
+    return {
+        'etag': response_etag(key, response.data),
+        'data': response.data,
+        'headers': dict(response.items()),
+    }
+
+def cached_miss(entry, response, if_none_match):
+    """Return the response for a cache miss that has just been stored as `entry`"""
+    if etag_matches(entry['etag'], if_none_match):
+        return not_modified(entry['etag'])
+    response['ETag'] = entry['etag']
+    response['X-Cache'] = 'MISS'
+    return response
+
+def entry_timeout():
+    """
+    Seconds to keep the response just built. One read from a lagging replica
+    may predate the scope version it is stored under, so it is only kept for
+    REPLICA_STICKY_SECONDS, the lag the replicas are expected to stay within.
+    """
+    if reading_from_replica():
+        return min(settings.ISSUE_CACHE_TIMEOUT, settings.REPLICA_STICKY_SECONDS)
+    return settings.ISSUE_CACHE_TIMEOUT
+
+def cached_response(request, handler, *args, **kwargs):
+    """
+    Serve `handler(request, ...)` from the response cache.
+    Requests whose If-None-Match matches get a 304; other hits are rebuilt
+    from the cached data without touching the database. Only 200 responses
+    are stored; see entry_timeout() for misses read from a replica.
+    """
+    scope = user_scope(request.user)
+    key = response_key(request, scope, scope_version(scope))
+    cache = get_cache()
+    if_none_match = request.headers.get('If-None-Match', '')
+    
+    entry = cache.get(key)
+    if entry is not None:
+        counter, response = cached_hit(entry, if_none_match)
+        count(counter)
+        return response
+    
+    count('misses')
+    response = handler(request, *args, **kwargs)
+    if response.status_code != status.HTTP_200_OK:
+        return response
+    
+    entry = cache_entry(key, response)
+    cache.set(key, entry, entry_timeout())
+    return cached_miss(entry, response, if_none_match)
+
+async def acached_response(request, handler, *args, **kwargs):
+    """cached_response() for async views; `handler` is a coroutine function"""
+    scope = user_scope(request.user)
+    key = response_key(request, scope, await ascope_version(scope))
+    cache = get_cache()
+    if_none_match = request.headers.get('If-None-Match', '')
+    
+    entry = await cache.aget(key)
+    if entry is not None:
+        counter, response = cached_hit(entry, if_none_match)
+        await acount(counter)
+        return response
+    
+    await acount('misses')
+    response = await handler(request, *args, **kwargs)
+    if response.status_code != status.HTTP_200_OK:
+        return response
+    
+    entry = cache_entry(key, response)
+    await cache.aset(key, entry, entry_timeout())
+    return cached_miss(entry, response, if_none_match)
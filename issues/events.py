@@ -0,0 +1,199 @@
+"""
+In-process broker for pushing issue status changes to connected clients.
+Each IssueStatusEvent is published once its transaction commits and fanned
+out to the event streams (issues.streams) of the issue's reporter and of
+every municipal user. The backend decides how far an event travels:
+
+- 'local' delivers to streams in the publishing process only, which is
+  enough for a single worker.
+- 'postgres' sends it through PostgreSQL NOTIFY; every worker LISTENs on a
+  dedicated connection and delivers to its own streams.
+
+ISSUE_EVENTS_BACKEND may also be the dotted path of a backend class.
+"""
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+from collections import defaultdict
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, connections
+from django.db.backends.postgresql.psycopg_any import is_psycopg3
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+MUNICIPAL = 'municipal'
+
+def event_payload(event):
+    """JSON-safe message for IssueStatusEvent `event`"""
+    return {
+        'id': event.id,
+        'issue': event.issue_id,
+        'reported_by': event.issue.reported_by_id,
+        'title': event.issue.title,
+        'from_status': event.from_status,
+        'to_status': event.to_status,
+        'from_priority': event.from_priority,
+        'to_priority': event.to_priority,
+        'created_at': event.created_at,
+    }
+
+def encode(payload):
+    return json.dumps(payload, cls=DjangoJSONEncoder)
+
+class Subscription:
+    """
+    Queue of events for one stream, fed from any thread.
+    A None in the queue ends the stream: the client disconnected, or it fell
+    more than ISSUE_EVENTS_QUEUE_SIZE events behind and should reconnect.
+    """
+    def __init__(self, key, loop):
+        self.key = key
+        self.loop = loop
+        self.queue = asyncio.Queue()
+    
+    def put(self, payload):
+        self.loop.call_soon_threadsafe(self._put, payload)
+    
+    def _put(self, payload):
+        if self.queue.qsize() >= settings.ISSUE_EVENTS_QUEUE_SIZE:
+            payload = None
+        self.queue.put_nowait(payload)
+    
+    def close(self):
+        self.queue.put_nowait(None)
+    
+    async def get(self):
+        return await self.queue.get()
+
+class Broker:
+    """Routes published events to the subscriptions of this process"""
+    def __init__(self, backend_class):
+        self.subscriptions = defaultdict(set)
+        self.lock = threading.Lock()
+        self.backend = backend_class(self)
+    
+    def subscribe(self, user_id, is_municipal):
+        """Subscribe the running event loop to events visible to the user"""
+        self.backend.start()
+        subscription = Subscription(MUNICIPAL if is_municipal else user_id, asyncio.get_running_loop())
+        with self.lock:
+            self.subscriptions[subscription.key].add(subscription)
+        return subscription
+    
+    def unsubscribe(self, subscription):
+        with self.lock:
+            subscribers = self.subscriptions[subscription.key]
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self.subscriptions[subscription.key]
+    
+    def publish(self, payload):
+        self.backend.publish(payload)
+    
+    def dispatch(self, payload):
+        """Deliver `payload` to the reporter's and the municipal subscriptions"""
+        with self.lock:
+            targets = [
+                *self.subscriptions.get(payload['reported_by'], ()),
+                *self.subscriptions.get(MUNICIPAL, ()),
+            ]
+        for subscription in targets:
+            subscription.put(payload)
+    
+    def subscriber_count(self):
+        with self.lock:
+            return sum(len(subscribers) for subscribers in self.subscriptions.values())
+
+class LocalBackend:
+    """Delivers events to subscriptions in the publishing process only"""
+    def __init__(self, broker):
+        self.broker = broker
+    
+    def start(self):
+        pass
+    
+    def publish(self, payload):
+        # Round-trip through JSON so subscribers see what other backends deliver
+        self.broker.dispatch(json.loads(encode(payload)))
+
+class PostgresBackend:
+    """
+    Fans events out to every worker with LISTEN/NOTIFY on the default
+    database. A daemon thread per process holds one LISTEN connection,
+    reconnecting after errors, and dispatches notifications locally.
+    """
+    channel = 'issue_events'
+    reconnect_delay = 5  # seconds
+    
+    def __init__(self, broker):
+        self.broker = broker
+        self.thread = None
+        self.lock = threading.Lock()
+    
+    def start(self):
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.listen_forever, name='issue-events', daemon=True)
+                self.thread.start()
+    
+    def publish(self, payload):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [self.channel, encode(payload)])
+    
+    def listen_forever(self):
+        while True:
+            try:
+                self.listen()
+            except Exception:
+                logger.exception('Listening for issue events failed; reconnecting')
+            time.sleep(self.reconnect_delay)
+    
+    def listen(self):
+        wrapper = connections['default']
+        # A connection of its own, outside any pool, held for as long as it works
+        listener = wrapper.Database.connect(**wrapper.get_connection_params())
+        try:
+            listener.autocommit = True
+            listener.cursor().execute(f'LISTEN {self.channel}')
+            while True:
+                idle = True
+                for payload in self.notifications(listener, timeout=60):
+                    idle = False
+                    self.broker.dispatch(json.loads(payload))
+                if idle:
+                    # Make sure a quiet connection is still alive
+                    listener.cursor().execute('SELECT 1')
+        finally:
+            listener.close()
+    
+    def notifications(self, listener, timeout):
+        """Yield notification payloads as they arrive, for up to `timeout` seconds"""
+        if is_psycopg3:
+            for notification in listener.notifies(timeout=timeout):
+                yield notification.payload
+            return
+        if select.select([listener], [], [], timeout) != ([], [], []):
+            listener.poll()
+        while listener.notifies:
+            yield listener.notifies.pop(0).payload
+
+BACKENDS = {
+    'local': LocalBackend,
+    'postgres': PostgresBackend,
+}
+
+_broker = None
+_broker_lock = threading.Lock()
+
+def get_broker():
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            backend = settings.ISSUE_EVENTS_BACKEND
+            _broker = Broker(BACKENDS.get(backend) or import_string(backend))
+    return _broker
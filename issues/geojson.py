@@ -0,0 +1,48 @@
+"""
+Slim GeoJSON export of issues.
+Rows come straight from .values() with the geometry rendered by
+ST_AsGeoJSON in the database, so no serializer or model instance is built
+per issue, and the FeatureCollection is produced in chunks for streaming.
+"""
+import json
+from django.contrib.gis.db.models.functions import AsGeoJSON
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.renderers import JSONRenderer
+
+FEATURE_PROPERTIES = [
+    'title', 'type', 'status', 'priority', 'reported_by', 'created_at', 'updated_at'
+]
+
+class GeoJSONRenderer(JSONRenderer):
+    """Lets clients request the export with Accept: application/geo+json"""
+    media_type = 'application/geo+json'
+    format = 'geojson'
+
+def feature_collection_chunks(queryset, chunk_size):
+    """
+    Yield a GeoJSON FeatureCollection of `queryset` as byte chunks of up to
+    `chunk_size` features each.
+    """
+    rows = queryset.annotate(
+        geometry=AsGeoJSON('location', precision=6)
+    ).values('id', 'geometry', *FEATURE_PROPERTIES)
+    encoder = DjangoJSONEncoder()
+    
+    yield b'{"type":"FeatureCollection","features":['
+    separator = ''
+    features = []
+    for row in rows.iterator(chunk_size=chunk_size):
+        properties = {name: row[name] for name in FEATURE_PROPERTIES}
+        # The geometry is already JSON text from ST_AsGeoJSON
+        features.append(
+            f'{separator}{{"type":"Feature","id":{row["id"]},'
+            f'"geometry":{row["geometry"]},'
+            f'"properties":{encoder.encode(properties)}}}'
+        )
+        separator = ','
+        if len(features) >= chunk_size:
+            yield ''.join(features).encode()
+            features = []
+    if features:
+        yield ''.join(features).encode()
+    yield b']}'
@@ -0,0 +1,129 @@
+"""
+Bulk issue import shared by the bulk API endpoint and the import_issues
+command. Readers turn an input stream into row dicts one at a time, and
+import_issues() validates and inserts them batch by batch, so inputs of
+any size are processed in bounded memory.
+"""
+import csv
+import json
+from itertools import islice
+from django.db import transaction
+from .cache import invalidate_reporter
+from .models import Issue
+from .serializers import IssueImportSerializer
+
+READ_SIZE = 64 * 1024
+
+def iter_ndjson(stream):
+    """
+    Yield one row per non-empty line of a newline-delimited JSON text stream.
+    Lines that are not valid JSON are yielded as-is and rejected on validation.
+    """
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield line
+
+def iter_json_array(stream, key=None):
+    """
+    Yield the items of a JSON array from a text stream without loading it whole.
+    With `key`, the array is the value of that key (e.g. 'features' of a
+    FeatureCollection); otherwise the document itself must be an array.
+    """
+    decoder = json.JSONDecoder()
+    buffer = stream.read(READ_SIZE)
+    
+    # Find the opening bracket of the array
+    marker = f'"{key}"' if key else '['
+    while marker not in buffer:
+        chunk = stream.read(READ_SIZE)
+        if not chunk:
+            raise ValueError(f'No {marker} array found in input.')
+        buffer += chunk
+    position = buffer.index(marker) + len(marker)
+    if key:
+        while '[' not in buffer[position:]:
+            chunk = stream.read(READ_SIZE)
+            if not chunk:
+                raise ValueError(f'No {marker} array found in input.')
+            buffer += chunk
+        position = buffer.index('[', position) + 1
+    buffer = buffer[position:]
+    
+    while True:
+        buffer = buffer.lstrip(' \t\r\n,')
+        if buffer.startswith(']'):
+            return
+        try:
+            item, end = decoder.raw_decode(buffer)
+        except ValueError:
+            chunk = stream.read(READ_SIZE)
+            if not chunk:
+                raise ValueError('Unterminated JSON array in input.')
+            buffer += chunk
+            continue
+        yield item
+        buffer = buffer[end:]
+
+def feature_to_row(feature):
+    """Flatten a GeoJSON Point feature into an import row"""
+    if not isinstance(feature, dict):
+        return feature
+    row = dict(feature.get('properties') or {})
+    geometry = feature.get('geometry') or {}
+    if geometry.get('type') == 'Point':
+        row['longitude'], row['latitude'] = geometry['coordinates'][:2]
+    return row
+
+def iter_csv(stream):
+    """Yield CSV rows, dropping empty cells so model defaults apply"""
+    for row in csv.DictReader(stream):
+        yield {field: value for field, value in row.items() if value not in ('', None)}
+
+READERS = {
+    'csv': iter_csv,
+    'json': iter_json_array,
+    'ndjson': iter_ndjson,
+    'geojson': lambda stream: map(feature_to_row, iter_json_array(stream, key='features')),
+    'geojsonl': lambda stream: map(feature_to_row, iter_ndjson(stream)),
+}
+
+def import_issues(rows, reported_by, batch_size):
+    """
+    Validate and insert `rows` in batches of `batch_size`.
+    Each batch is inserted with bulk_create in its own transaction. Invalid
+    rows are skipped and reported with their 1-based row number, they don't
+    stop the rest of the batch. Returns (created, errors).
+    """
+    created = 0
+    errors = []
+    rows = enumerate(rows, 1)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+        
+        issues = []
+        for number, row in batch:
+            if not isinstance(row, dict):
+                errors.append({'row': number, 'errors': {'non_field_errors': ['Expected a JSON object.']}})
+                continue
+            serializer = IssueImportSerializer(data=row)
+            if serializer.is_valid():
+                issues.append(serializer.to_issue(reported_by))
+            else:
+                errors.append({'row': number, 'errors': serializer.errors})
+        
+        if issues:
+            with transaction.atomic():
+                Issue.objects.bulk_create(issues)
+            created += len(issues)
+    
+    # bulk_create sends no post_save signals
+    if created:
+        invalidate_reporter(reported_by.pk)
+    return created, errors
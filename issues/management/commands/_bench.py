@@ -0,0 +1,153 @@
+"""
+Helpers shared by the benchmark management commands: synthetic data seeding
+and latency summaries. Synthetic issues are reported by dedicated users whose
+names start with BENCH_USERNAME, so deleting those users removes them again.
+"""
+import hashlib
+import io
+import itertools
+import math
+import os
+import random
+import tempfile
+import time
+from PIL import Image
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import Point
+from django.db import connection
+from issues.models import Issue, IssueImage
+
+User = get_user_model()
+
+BENCH_USERNAME = 'bench_reporter'
+
+# Longitude, latitude of New Delhi
+DEFAULT_CENTER = (77.2090, 28.6139)
+
+# Vocabulary for synthetic complaint text, so trigram matching sees a
+# realistic mix of near-identical and unrelated reports
+PROBLEMS = [
+    'Pothole', 'Broken streetlight', 'Overflowing garbage bin', 'Water leakage',
+    'Blocked drain', 'Illegal parking', 'Fallen tree', 'Open manhole',
+    'Encroached footpath', 'Damaged road divider', 'Stray cattle', 'Sewage overflow',
+]
+PLACES = [
+    'Main Road', 'Market Street', 'Station Road', 'Park Avenue', 'Ring Road',
+    'School Lane', 'Temple Street', 'Bus Stand', 'Hospital Road', 'Sector 4',
+]
+
+def get_bench_user():
+    """Return the user that owns all synthetic issues"""
+    user, _ = User.objects.get_or_create(
+        username=BENCH_USERNAME,
+        defaults={'email': 'bench@example.com', 'type': User.UserType.CITIZEN}
+    )
+    return user
+
+def get_bench_users(count, user_type):
+    """Return `count` synthetic users of `user_type`, creating the missing ones"""
+    names = [f'{BENCH_USERNAME}_{user_type.lower()}_{i}' for i in range(count)]
+    existing = set(User.objects.filter(username__in=names).values_list('username', flat=True))
+    missing = [
+        User(username=name, email=f'{name}@example.com', type=user_type)
+        for name in names if name not in existing
+    ]
+    for user in missing:
+        user.set_unusable_password()
+    User.objects.bulk_create(missing)
+    return list(User.objects.filter(username__in=names).order_by('id'))
+
+def synthetic_issues(count, reporters, center=DEFAULT_CENTER, spread=0.25, clusters=50, seed=0):
+    """
+    Yield unsaved issues spread around `center`, reported by `reporters`.
+    Locations are gathered around `clusters` hotspots within `spread` degrees
+    of the centre, which is closer to real complaint data than a uniform box.
+    """
+    rng = random.Random(seed)
+    hotspots = [
+        (center[0] + rng.uniform(-spread, spread), center[1] + rng.uniform(-spread, spread))
+        for _ in range(clusters)
+    ]
+    types = Issue.IssueType.values
+    statuses = Issue.StatusType.values
+    priorities = Issue.PriorityType.values
+    for i in range(count):
+        x, y = rng.choice(hotspots)
+        problem, place = rng.choice(PROBLEMS), rng.choice(PLACES)
+        yield Issue(
+            reported_by=rng.choice(reporters),
+            title=f'{problem} near {place}',
+            description=f'{problem} reported near {place}, house {rng.randint(1, 500)} (synthetic #{i})',
+            type=rng.choice(types),
+            status=rng.choice(statuses),
+            priority=rng.choice(priorities),
+            location=Point(x + rng.gauss(0, 0.01), y + rng.gauss(0, 0.01), srid=4326)
+        )
+
+def seed_issues(count, reporters=None, batch_size=10000, **kwargs):
+    """
+    Insert `count` synthetic issues in batches and refresh planner statistics.
+    Issues are reported by the benchmark user unless `reporters` is given.
+    """
+    issues = synthetic_issues(count, reporters or [get_bench_user()], **kwargs)
+    created = 0
+    while created < count:
+        batch = [issue for _, issue in zip(range(batch_size), issues)]
+        Issue.objects.bulk_create(batch)
+        created += len(batch)
+    with connection.cursor() as cursor:
+        cursor.execute(f'ANALYZE {Issue._meta.db_table}')
+    return created
+
+def synthetic_photo(seed=0, size=64):
+    """JPEG bytes of a noise image, the same for the same seed"""
+    rng = random.Random(seed)
+    image = Image.frombytes('RGB', (size, size), rng.randbytes(size * size * 3))
+    buffer = io.BytesIO()
+    image.save(buffer, 'JPEG')
+    return buffer.getvalue()
+
+def seed_images(count, issues, seed=0, batch_size=10000):
+    """
+    Attach `count` images to `issues`, round robin. They are all the same
+    synthetic photo, stored once as a deduplicated blob that they reference.
+    """
+    if not count:
+        return 0
+    storage = IssueImage._meta.get_field('image').storage
+    data = synthetic_photo(seed)
+    directory = storage.path(storage.prefix)
+    os.makedirs(directory, exist_ok=True)
+    # Next to the blobs, so that it can be moved into place
+    with tempfile.NamedTemporaryFile(dir=directory, suffix='.tmp', delete=False) as temp:
+        temp.write(data)
+    try:
+        name = storage.add_reference(temp.name, hashlib.sha256(data).hexdigest(), '.jpg', count=count)
+    finally:
+        if os.path.exists(temp.name):
+            os.remove(temp.name)
+    images = (
+        IssueImage(issue=issue, image=name, caption=f'Synthetic photo #{i}')
+        for i, issue in zip(range(count), itertools.cycle(issues))
+    )
+    IssueImage.objects.bulk_create(images, batch_size=batch_size)
+    return count
+
+def clear_synthetic_data():
+    """Delete the benchmark users and, by cascade, every synthetic issue and image"""
+    User.objects.filter(username__startswith=BENCH_USERNAME).delete()
+
+def time_calls(func, runs):
+    """Call `func` `runs` times and return the latencies in milliseconds"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+def percentile(values, pct):
+    """Nearest-rank percentile of `values`"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
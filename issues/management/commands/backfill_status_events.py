@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from issues.models import Issue, IssueStatusEvent
+
+# One event per issue that has left PENDING but has no history yet, dated
+# when it was resolved or else last updated. Inserted in time order so the
+# BRIN index on created_at stays tight.
+BACKFILL_SQL = f"""
+INSERT INTO {IssueStatusEvent._meta.db_table}
+    (issue_id, changed_by_id, from_status, to_status, from_priority, to_priority, created_at)
+SELECT issue.id, NULL, %s, issue.status, issue.priority, issue.priority,
+       COALESCE(issue.resolved_at, issue.updated_at)
+FROM {Issue._meta.db_table} AS issue
+WHERE issue.status <> %s
+  AND NOT EXISTS (
+      SELECT 1 FROM {IssueStatusEvent._meta.db_table} AS event WHERE event.issue_id = issue.id
+  )
+ORDER BY COALESCE(issue.resolved_at, issue.updated_at)
+"""
+
+class Command(BaseCommand):
+    """
+    Reconstruct status history for issues changed before status events were
+    recorded, in a single INSERT ... SELECT. Only the latest status is known
+    for those issues, so each gets one event from PENDING to its current
+    status. Safe to re-run: issues that have events are skipped.
+    """
+    help = 'Backfill issue status events from the current issue rows'
+    
+    def handle(self, *args, **options):
+        pending = Issue.StatusType.PENDING
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(BACKFILL_SQL, [pending, pending])
+            created = cursor.rowcount
+        self.stdout.write(self.style.SUCCESS(f'Backfilled {created} status events.'))
@@ -0,0 +1,287 @@
+import json
+import random
+import re
+import threading
+import time
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client, override_settings
+from issues.models import Issue, IssueImage
+from users.serializers import UserTokenObtainPairSerializer
+from ._bench import (
+    BENCH_USERNAME,
+    DEFAULT_CENTER,
+    clear_synthetic_data,
+    get_bench_users,
+    percentile,
+    seed_images,
+    seed_issues,
+    synthetic_photo,
+)
+
+User = get_user_model()
+
+QUERIES = re.compile(r'desc="(\d+) queries"')
+
+# Registered cases, in run order: name -> function(client, context, rng)
+# returning the response of one request
+CASES = {}
+
+def case(name):
+    def register(func):
+        CASES[name] = func
+        return func
+    return register
+
+@case('list')
+def list_issues(client, context, rng):
+    return client.get('/api/issues/', headers=context.auth(rng.choice(context.municipal)))
+
+@case('retrieve')
+def retrieve_issue(client, context, rng):
+    issue_id = rng.choice(context.issue_ids)
+    return client.get(f'/api/issues/{issue_id}/', headers=context.auth(rng.choice(context.municipal)))
+
+@case('nearby')
+def nearby_issues(client, context, rng):
+    data = {
+        'latitude': DEFAULT_CENTER[1] + rng.uniform(-0.2, 0.2),
+        'longitude': DEFAULT_CENTER[0] + rng.uniform(-0.2, 0.2),
+        'distance': 2000,
+    }
+    return client.post('/api/issues/nearby/', data, content_type='application/json',
+                       headers=context.auth(rng.choice(context.citizens)))
+
+@case('create')
+def create_issue(client, context, rng):
+    data = {
+        'title': f'Benchmark report {rng.randrange(10 ** 9)}',
+        'description': 'Created by manage.py bench',
+        'issue_type': rng.choice(Issue.IssueType.values),
+        'location': {
+            'type': 'Point',
+            'coordinates': [DEFAULT_CENTER[0] + rng.uniform(-0.25, 0.25),
+                            DEFAULT_CENTER[1] + rng.uniform(-0.25, 0.25)],
+        },
+    }
+    return client.post('/api/issues/', data, content_type='application/json',
+                       headers=context.auth(rng.choice(context.citizens)))
+
+@case('add_image')
+def add_image(client, context, rng):
+    # Citizens may only add images to their own issues
+    user = rng.choice([user for user in context.citizens if context.own_issues.get(user.pk)])
+    issue_id = rng.choice(context.own_issues[user.pk])
+    image = SimpleUploadedFile('bench.jpg', context.photo, content_type='image/jpeg')
+    return client.post(f'/api/issues/{issue_id}/add_image/', {'image': image, 'caption': 'Benchmark photo'},
+                       headers=context.auth(user))
+
+class Context:
+    """The seeded dataset and the access tokens of its users"""
+    def __init__(self, citizens, municipal, issues, seed):
+        self.citizens = citizens
+        self.municipal = municipal
+        self.tokens = {
+            user.pk: str(UserTokenObtainPairSerializer.get_token(user).access_token)
+            for user in citizens + municipal
+        }
+        self.issue_ids = [issue_id for issue_id, _ in issues]
+        self.own_issues = {}
+        for issue_id, reporter_id in issues:
+            self.own_issues.setdefault(reporter_id, []).append(issue_id)
+        self.photo = synthetic_photo(seed)
+        # Everything past these was written by the benchmark itself
+        self.last_issue = Issue.objects.order_by('-id').values_list('id', flat=True).first() or 0
+        self.last_image = IssueImage.objects.order_by('-id').values_list('id', flat=True).first() or 0
+    
+    def discard_writes(self):
+        """Delete the issues and images created by the run, so the dataset can be reused"""
+        IssueImage.objects.filter(id__gt=self.last_image).delete()
+        Issue.objects.filter(id__gt=self.last_issue).delete()
+    
+    def auth(self, user):
+        return {'Authorization': f'Bearer {self.tokens[user.pk]}'}
+
+def run_case(func, context, requests, concurrency, seed):
+    """
+    Send `requests` requests from `concurrency` threads. Returns the wall
+    time and, for each request, (status, milliseconds, SQL queries).
+    """
+    results = []
+    lock = threading.Lock()
+    counter = iter(range(requests))
+    
+    def worker(index):
+        client = Client(raise_request_exception=False)
+        rng = random.Random(seed * 1000 + index)
+        samples = []
+        try:
+            while True:
+                with lock:
+                    if next(counter, None) is None:
+                        break
+                start = time.perf_counter()
+                response = func(client, context, rng)
+                elapsed = (time.perf_counter() - start) * 1000
+                match = QUERIES.search(response.get('Server-Timing', ''))
+                samples.append((response.status_code, elapsed, int(match.group(1)) if match else None))
+        finally:
+            connections.close_all()
+        with lock:
+            results.extend(samples)
+    
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, results
+
+def summarize(wall, results):
+    ok = [(ms, queries) for status, ms, queries in results if 200 <= status < 300]
+    timings = [ms for ms, _ in ok] or [0.0]
+    queries = [queries for _, queries in ok if queries is not None]
+    return {
+        'requests': len(results),
+        'errors': len(results) - len(ok),
+        'throughput': round(len(ok) / wall, 1) if wall else 0.0,
+        'p50': round(percentile(timings, 50), 1),
+        'p95': round(percentile(timings, 95), 1),
+        'p99': round(percentile(timings, 99), 1),
+        'queries': round(sum(queries) / len(queries), 2) if queries else None,
+    }
+
+def compare(results, baseline, tolerance):
+    """Regressions of `results` against `baseline`, as messages"""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if result['p95'] > base['p95'] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {result['p95']} ms, baseline {base['p95']} ms")
+        if result['throughput'] < base['throughput'] * (1 - tolerance):
+            regressions.append(f"{name}: {result['throughput']} req/s, baseline {base['throughput']} req/s")
+        # Query counts don't depend on the machine; any increase is a regression
+        if None not in (result['queries'], base['queries']) and result['queries'] > base['queries'] + 0.5:
+            regressions.append(f"{name}: {result['queries']} queries/request, baseline {base['queries']}")
+        if result['errors'] and not base['errors']:
+            regressions.append(f"{name}: {result['errors']} failed requests, baseline none")
+    return regressions
+
+class Command(BaseCommand):
+    """
+    Load test the issues API: seed a reproducible synthetic dataset, drive
+    the list, retrieve, nearby, create and add_image endpoints from
+    concurrent clients and report throughput, latency percentiles and SQL
+    queries per request. Requests go through the full middleware and view
+    stack in this process, so runs compare code changes rather than
+    deployments (see bench_asgi for those).
+    Run against a development database: it inserts synthetic users and issues.
+    """
+    help = 'Benchmark the issues API under concurrent load and compare with a baseline'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--citizens', type=int, default=200,
+                            help='Number of synthetic citizen users')
+        parser.add_argument('--municipal', type=int, default=20,
+                            help='Number of synthetic municipal users')
+        parser.add_argument('--issues', type=int, default=100_000,
+                            help='Number of synthetic issues')
+        parser.add_argument('--clusters', type=int, default=50,
+                            help='Number of hotspots the issues are gathered around')
+        parser.add_argument('--images', type=int, default=20_000,
+                            help='Number of synthetic issue images')
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Random seed for the dataset and the requests')
+        parser.add_argument('--cases', default=','.join(CASES),
+                            help='Comma-separated endpoints to benchmark')
+        parser.add_argument('--requests', type=int, default=500,
+                            help='Requests per endpoint')
+        parser.add_argument('--concurrency', type=int, default=8,
+                            help='Concurrent clients')
+        parser.add_argument('--baseline',
+                            help='JSON results of an earlier run to compare with')
+        parser.add_argument('--tolerance', type=float, default=0.25,
+                            help='Allowed relative slowdown of p95 and throughput')
+        parser.add_argument('--save-baseline',
+                            help='Write the results to this JSON file')
+        parser.add_argument('--keep', action='store_true',
+                            help='Keep the synthetic data for later runs')
+    
+    def handle(self, *args, **options):
+        names = [name.strip() for name in options['cases'].split(',') if name.strip()]
+        unknown = set(names) - set(CASES)
+        if unknown:
+            raise CommandError(f"Unknown cases: {', '.join(sorted(unknown))}. Choose from {', '.join(CASES)}.")
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                baseline = json.load(f)
+        
+        dataset = {
+            key: options[key] for key in ('citizens', 'municipal', 'issues', 'clusters', 'images', 'seed')
+        }
+        context = None
+        try:
+            context = self.seed(dataset)
+            # Rate limits would turn the load into 429s; the host is the test client's
+            with override_settings(
+                REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {}},
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+            ):
+                results = {}
+                for i, name in enumerate(names):
+                    wall, samples = run_case(
+                        CASES[name], context, options['requests'], options['concurrency'], options['seed'] + i
+                    )
+                    results[name] = summarize(wall, samples)
+        finally:
+            if not options['keep']:
+                clear_synthetic_data()
+            elif context is not None:
+                context.discard_writes()
+        
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"{'endpoint':<12}{'requests':>10}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}"
+            f"{'p99 ms':>10}{'queries':>10}{'errors':>8}"
+        ))
+        for name, result in results.items():
+            queries = '-' if result['queries'] is None else f"{result['queries']:.1f}"
+            self.stdout.write(
+                f"{name:<12}{result['requests']:>10}{result['throughput']:>10.1f}{result['p50']:>10.1f}"
+                f"{result['p95']:>10.1f}{result['p99']:>10.1f}{queries:>10}{result['errors']:>8}"
+            )
+        
+        report = {'dataset': dataset, 'concurrency': options['concurrency'], 'results': results}
+        if options['save_baseline']:
+            with open(options['save_baseline'], 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(f"Results saved to {options['save_baseline']}")
+        
+        if baseline is not None:
+            if baseline['dataset'] != dataset or baseline['concurrency'] != options['concurrency']:
+                self.stdout.write(self.style.WARNING(
+                    'The baseline was recorded with other dataset or concurrency settings'
+                ))
+            regressions = compare(results, baseline['results'], options['tolerance'])
+            if regressions:
+                raise CommandError('Regressions against the baseline:\n' + '\n'.join(regressions))
+            self.stdout.write(self.style.SUCCESS('No regressions against the baseline'))
+    
+    def seed(self, dataset):
+        """Create the synthetic dataset, reusing one kept from an identical run"""
+        citizens = get_bench_users(dataset['citizens'], User.UserType.CITIZEN)
+        municipal = get_bench_users(dataset['municipal'], User.UserType.MUNICIPAL)
+        issues = Issue.objects.filter(reported_by__username__startswith=BENCH_USERNAME)
+        images = IssueImage.objects.filter(issue__in=issues)
+        if issues.count() != dataset['issues'] or images.count() != dataset['images']:
+            self.stdout.write(f"Seeding {dataset['issues']} issues and {dataset['images']} images...")
+            issues.delete()
+            seed_issues(dataset['issues'], reporters=citizens, clusters=dataset['clusters'], seed=dataset['seed'])
+            seed_images(dataset['images'], issues.order_by('id'), seed=dataset['seed'])
+        return Context(citizens, municipal, list(issues.values_list('id', 'reported_by_id')), dataset['seed'])
@@ -0,0 +1,135 @@
+import asyncio
+import json
+import time
+from urllib.parse import urlsplit
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+from issues.models import Issue
+from ._bench import DEFAULT_CENTER, clear_synthetic_data, get_bench_user, percentile, seed_issues
+
+def endpoints(issue_id):
+    """(name, method, path, body) of the reads served asynchronously under ASGI"""
+    nearby = json.dumps({'latitude': DEFAULT_CENTER[1], 'longitude': DEFAULT_CENTER[0], 'distance': 2000})
+    return [
+        ('list', 'GET', '/api/issues/', None),
+        ('retrieve', 'GET', f'/api/issues/{issue_id}/', None),
+        ('nearby', 'POST', '/api/issues/nearby/', nearby),
+        ('me', 'GET', '/api/users/me/', None),
+    ]
+
+async def read_response(reader):
+    """Read one HTTP/1.1 response; return its status and whether the connection stays open"""
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while (line := await reader.readline()) not in (b'\r\n', b''):
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    if 'content-length' in headers:
+        await reader.readexactly(int(headers['content-length']))
+    elif headers.get('transfer-encoding') == 'chunked':
+        while size := int((await reader.readline()).split(b';')[0], 16):
+            await reader.readexactly(size + 2)
+        await reader.readline()
+    else:
+        await reader.read()
+        return status, False
+    return status, headers.get('connection', '').lower() != 'close'
+
+class Command(BaseCommand):
+    """
+    Compare the WSGI and ASGI deployments of the hot reads (issue list and
+    retrieve, nearby, users/me) at high concurrency: requests per second and
+    latency percentiles per endpoint. Start both servers against the same
+    database first, e.g.
+        gunicorn nagarkranti.wsgi -w 4 --threads 8 -b 127.0.0.1:8001
+        uvicorn nagarkranti.asgi:application --workers 4 --port 8002
+    Requests are sent as the synthetic benchmark user, who reported every
+    synthetic issue.
+    """
+    help = 'Benchmark the async read path under ASGI against WSGI'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--wsgi-url', default='http://127.0.0.1:8001',
+                            help='Base URL of the WSGI server')
+        parser.add_argument('--asgi-url', default='http://127.0.0.1:8002',
+                            help='Base URL of the ASGI server')
+        parser.add_argument('--concurrency', type=int, default=256,
+                            help='Concurrent keep-alive connections')
+        parser.add_argument('--duration', type=float, default=20.0,
+                            help='Seconds to load each endpoint on each server')
+        parser.add_argument('--issues', type=int, default=100_000,
+                            help='Number of synthetic issues to seed')
+        parser.add_argument('--keep', action='store_true',
+                            help='Keep the synthetic issues for later runs')
+    
+    def handle(self, *args, **options):
+        servers = [('wsgi', urlsplit(options['wsgi_url'])), ('asgi', urlsplit(options['asgi_url']))]
+        if any(url.scheme != 'http' for _, url in servers):
+            raise CommandError('Only plain http URLs are supported')
+        
+        user = get_bench_user()
+        existing = Issue.objects.filter(reported_by=user).count()
+        if existing < options['issues']:
+            self.stdout.write(f"Seeding {options['issues'] - existing} synthetic issues...")
+            seed_issues(options['issues'] - existing)
+        token = str(AccessToken.for_user(user))
+        
+        try:
+            issue_id = Issue.objects.filter(reported_by=user).values_list('id', flat=True).first()
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'{options["concurrency"]} connections, {options["duration"]:.0f} s per endpoint'
+            ))
+            self.stdout.write(f'{"endpoint":<10}{"server":<8}{"req/s":>10}{"p50 ms":>10}{"p99 ms":>10}{"errors":>8}')
+            for name, method, path, body in endpoints(issue_id):
+                for server, url in servers:
+                    result = asyncio.run(self.load(url, method, path, body, token, options))
+                    timings = result['timings'] or [0]
+                    self.stdout.write(
+                        f'{name:<10}{server:<8}{len(result["timings"]) / options["duration"]:>10.0f}'
+                        f'{percentile(timings, 50):>10.1f}{percentile(timings, 99):>10.1f}{result["errors"]:>8}'
+                    )
+        finally:
+            if not options['keep']:
+                clear_synthetic_data()
+    
+    async def load(self, url, method, path, body, token, options):
+        """Send requests over `concurrency` connections for `duration` seconds"""
+        headers = [
+            f'{method} {path} HTTP/1.1',
+            f'Host: {url.netloc}',
+            f'Authorization: Bearer {token}',
+            'Accept: application/json',
+        ]
+        if body is not None:
+            headers += ['Content-Type: application/json', f'Content-Length: {len(body)}']
+        request = ('\r\n'.join(headers) + '\r\n\r\n' + (body or '')).encode()
+        result = {'timings': [], 'errors': 0}
+        deadline = time.monotonic() + options['duration']
+        
+        async def client():
+            connection = None
+            while time.monotonic() < deadline:
+                try:
+                    if connection is None:
+                        connection = await asyncio.open_connection(url.hostname, url.port or 80)
+                    reader, writer = connection
+                    start = time.perf_counter()
+                    writer.write(request)
+                    status, keep_alive = await read_response(reader)
+                    elapsed = (time.perf_counter() - start) * 1000
+                except (OSError, ValueError, IndexError, asyncio.IncompleteReadError):
+                    result['errors'] += 1
+                    connection = None
+                    continue
+                if status == 200:
+                    result['timings'].append(elapsed)
+                else:
+                    result['errors'] += 1
+                if not keep_alive:
+                    writer.close()
+                    connection = None
+            if connection is not None:
+                connection[1].close()
+        
+        await asyncio.gather(*(client() for _ in range(options['concurrency'])))
+        return result
@@ -0,0 +1,112 @@
+import threading
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.signals import request_finished, request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from issues.models import Issue
+from ._bench import percentile
+
+MODES = ('none', 'persistent', 'pool')
+
+class Command(BaseCommand):
+    """
+    Measure what opening database connections costs each request under
+    concurrent load, for each DB_POOL_MODE (see settings). Worker threads
+    replay the request cycle the handlers run: request_started, one indexed
+    query, request_finished, which is where connections are closed, kept or
+    returned to the pool. Reports throughput, latency and connections opened.
+    """
+    help = 'Benchmark database connection handling per request'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--modes', default=','.join(MODES),
+                            help='Comma-separated DB_POOL_MODE values to compare')
+        parser.add_argument('--threads', type=int, default=32,
+                            help='Concurrent request threads')
+        parser.add_argument('--requests', type=int, default=200,
+                            help='Requests per thread')
+        parser.add_argument('--pool-size', type=int, default=10,
+                            help='max_size of the pool in pool mode')
+    
+    def handle(self, *args, **options):
+        modes = options['modes'].split(',')
+        unknown = set(modes) - set(MODES)
+        if unknown:
+            raise CommandError(f'Unknown modes: {", ".join(sorted(unknown))}')
+        
+        database = connections.settings['default']
+        original = {key: database.get(key) for key in ('CONN_MAX_AGE', 'CONN_HEALTH_CHECKS')}
+        original_options = dict(database['OPTIONS'])
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'{options["threads"]} threads x {options["requests"]} requests (configured: {settings.DB_POOL_MODE})'
+        ))
+        self.stdout.write(f'{"mode":<12}{"req/s":>10}{"p50 ms":>10}{"p99 ms":>10}{"connections":>13}')
+        try:
+            for mode in modes:
+                if mode == 'pool':
+                    try:
+                        import psycopg_pool  # noqa: F401
+                    except ImportError:
+                        self.stderr.write('Skipping pool: install "psycopg[binary,pool]" to use it.')
+                        continue
+                self.configure(database, original_options, mode, options['pool_size'])
+                timings, opened, elapsed = self.run(options['threads'], options['requests'])
+                self.stdout.write(
+                    f'{mode:<12}{len(timings) / elapsed:>10.0f}{percentile(timings, 50):>10.2f}'
+                    f'{percentile(timings, 99):>10.2f}{opened:>13}'
+                )
+        finally:
+            connections['default'].close_pool()
+            database.update(original)
+            database['OPTIONS'] = original_options
+    
+    def configure(self, database, original_options, mode, pool_size):
+        """Switch the default database to `mode` for connections opened from now on"""
+        connections['default'].close()
+        connections['default'].close_pool()
+        database['OPTIONS'] = {key: value for key, value in original_options.items() if key != 'pool'}
+        database['CONN_MAX_AGE'] = 60 if mode == 'persistent' else 0
+        database['CONN_HEALTH_CHECKS'] = mode == 'persistent'
+        if mode == 'pool':
+            database['OPTIONS']['pool'] = {'min_size': pool_size, 'max_size': pool_size}
+    
+    def run(self, threads, requests):
+        timings = []
+        opened = []
+        lock = threading.Lock()
+        
+        def count_connection(sender, connection, **kwargs):
+            with lock:
+                opened.append(connection.alias)
+        
+        def worker():
+            local = []
+            for i in range(requests):
+                start = time.perf_counter()
+                request_started.send(sender=self.__class__)
+                Issue.objects.filter(pk=i).exists()
+                request_finished.send(sender=self.__class__)
+                local.append((time.perf_counter() - start) * 1000)
+            # Thread-local connections outlive the thread otherwise
+            connections.close_all()
+            with lock:
+                timings.extend(local)
+        
+        connection_created.connect(count_connection)
+        try:
+            workers = [threading.Thread(target=worker) for _ in range(threads)]
+            start = time.perf_counter()
+            for thread in workers:
+                thread.start()
+            for thread in workers:
+                thread.join()
+            elapsed = time.perf_counter() - start
+        finally:
+            connection_created.disconnect(count_connection)
+        pool = connections['default'].pool
+        if pool:
+            # connection_created fires per borrow; the pool knows what it opened
+            return timings, pool.get_stats()['connections_num'], elapsed
+        return timings, len(opened), elapsed
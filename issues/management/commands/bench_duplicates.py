@@ -0,0 +1,71 @@
+from django.core.management.base import BaseCommand, CommandError
+from issues.models import Issue
+from ._bench import (
+    clear_synthetic_data,
+    get_bench_user,
+    percentile,
+    seed_issues,
+    time_calls,
+)
+
+class Command(BaseCommand):
+    """
+    Measure the duplicate check IssueCreateSerializer runs for every new
+    report, probing with the text and location of random synthetic issues.
+    Fails if the p95 latency is over the budget.
+    Run against a development database: it inserts synthetic issues.
+    """
+    help = 'Benchmark duplicate detection at report time'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--issues', type=int, default=1_000_000,
+                            help='Number of synthetic issues to search over')
+        parser.add_argument('--probes', type=int, default=200,
+                            help='Number of reports to check for duplicates')
+        parser.add_argument('--budget', type=float, default=10.0,
+                            help='Maximum p95 latency in milliseconds')
+        parser.add_argument('--batch-size', type=int, default=10000,
+                            help='bulk_create batch size when seeding')
+        parser.add_argument('--keep', action='store_true',
+                            help='Keep the synthetic issues for later runs')
+    
+    def handle(self, *args, **options):
+        reporter = get_bench_user()
+        synthetic = Issue.objects.filter(reported_by=reporter)
+        existing = synthetic.count()
+        if existing < options['issues']:
+            self.stdout.write(f"Seeding {options['issues'] - existing} synthetic issues...")
+            seed_issues(options['issues'] - existing, batch_size=options['batch_size'])
+        
+        try:
+            probes = list(
+                synthetic.order_by('?').values_list('type', 'location', 'title', 'description')[:options['probes']]
+            )
+            remaining = iter(probes)
+            found = []
+            
+            def check():
+                found.append(len(Issue.objects.duplicate_candidates(*next(remaining))))
+            
+            # One warm-up call so the timings don't include connection setup
+            Issue.objects.duplicate_candidates(*probes[0]).exists()
+            timings = time_calls(check, len(probes))
+            
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'duplicate check ({options["issues"]} issues, {len(probes)} probes)'
+            ))
+            self.stdout.write(Issue.objects.duplicate_candidates(*probes[0]).explain(analyze=True))
+            p95 = percentile(timings, 95)
+            self.stdout.write(
+                f'p50 {percentile(timings, 50):.1f} ms  '
+                f'p95 {p95:.1f} ms  '
+                f'max {max(timings):.1f} ms  '
+                f'avg candidates {sum(found) / len(found):.1f}'
+            )
+        finally:
+            if not options['keep']:
+                clear_synthetic_data()
+        
+        if p95 > options['budget']:
+            raise CommandError(f'p95 {p95:.1f} ms is over the {options["budget"]:.1f} ms budget')
+        self.stdout.write(self.style.SUCCESS(f'Within the {options["budget"]:.1f} ms budget.'))
@@ -0,0 +1,127 @@
+import asyncio
+import os
+import resource
+import time
+from urllib.parse import urlsplit
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+from issues.streams import EVENTS_PATH
+from ._bench import get_bench_user, percentile
+
+def process_usage(pid):
+    """Resident memory in MB, threads and open file descriptors of `pid`"""
+    with open(f'/proc/{pid}/status') as status:
+        fields = dict(line.split(':', 1) for line in status)
+    return (
+        int(fields['VmRSS'].split()[0]) / 1024,
+        int(fields['Threads']),
+        len(os.listdir(f'/proc/{pid}/fd')),
+    )
+
+class Command(BaseCommand):
+    """
+    Hold many idle issue event streams open against a running ASGI server
+    and report how long they took to connect and, given the server's pid,
+    what they cost it in memory, threads and file descriptors. Streams are
+    opened as the synthetic benchmark user.
+    """
+    help = 'Load test the issue event stream with idle connections'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default=f'http://127.0.0.1:8000{EVENTS_PATH}',
+                            help='Event stream URL of the running server')
+        parser.add_argument('--connections', type=int, default=10000,
+                            help='Number of concurrent streams to open')
+        parser.add_argument('--duration', type=float, default=60.0,
+                            help='Seconds to hold the streams open')
+        parser.add_argument('--concurrency', type=int, default=200,
+                            help='Maximum connection attempts in flight')
+        parser.add_argument('--pid', type=int,
+                            help='Server process to measure while the streams are open')
+    
+    def handle(self, *args, **options):
+        url = urlsplit(options['url'])
+        if url.scheme != 'http':
+            raise CommandError('Only plain http URLs are supported')
+        
+        # Each stream needs a descriptor on this side too
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        wanted = min(hard, options['connections'] + 100)
+        if soft < wanted:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (wanted, hard))
+        
+        token = str(AccessToken.for_user(get_bench_user()))
+        baseline = process_usage(options['pid']) if options['pid'] else None
+        results = asyncio.run(self.run(url, token, options))
+        
+        timings = results['timings']
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'{len(timings)} of {options["connections"]} streams held for {options["duration"]:.0f} s'
+        ))
+        if timings:
+            self.stdout.write(
+                f'connect p50 {percentile(timings, 50):.1f} ms  '
+                f'p95 {percentile(timings, 95):.1f} ms  '
+                f'max {max(timings):.1f} ms'
+            )
+        self.stdout.write(f'heartbeats {results["heartbeats"]}  errors {results["errors"]}')
+        if baseline:
+            rss, threads, fds = results['usage']
+            self.stdout.write(
+                f'server rss {baseline[0]:.0f} -> {rss:.0f} MB '
+                f'({(rss - baseline[0]) * 1024 / max(1, len(timings)):.1f} KB per stream)  '
+                f'threads {baseline[1]} -> {threads}  fds {baseline[2]} -> {fds}'
+            )
+        if results['errors']:
+            raise CommandError(f'{results["errors"]} streams failed to open')
+    
+    async def run(self, url, token, options):
+        results = {'timings': [], 'heartbeats': 0, 'errors': 0, 'usage': None}
+        slots = asyncio.Semaphore(options['concurrency'])
+        request = (
+            f'GET {url.path} HTTP/1.1\r\n'
+            f'Host: {url.netloc}\r\n'
+            f'Authorization: Bearer {token}\r\n'
+            f'Accept: text/event-stream\r\n\r\n'
+        ).encode()
+        deadline = time.monotonic() + options['duration']
+        
+        async def hold():
+            try:
+                async with slots:
+                    start = time.perf_counter()
+                    reader, writer = await asyncio.open_connection(url.hostname, url.port or 80)
+                    writer.write(request)
+                    status = await reader.readline()
+                    if b' 200 ' not in status:
+                        raise ConnectionError(status.decode().strip())
+                    results['timings'].append((time.perf_counter() - start) * 1000)
+            except (OSError, ConnectionError) as exc:
+                results['errors'] += 1
+                if results['errors'] == 1:
+                    self.stderr.write(f'Stream failed: {exc}')
+                return
+            try:
+                while (remaining := deadline - time.monotonic()) > 0:
+                    try:
+                        line = await asyncio.wait_for(reader.readline(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                    if not line:
+                        results['errors'] += 1
+                        break
+                    if line.startswith(b': keep-alive'):
+                        results['heartbeats'] += 1
+            finally:
+                writer.close()
+        
+        async def measure():
+            # Sample once every stream has had its chance to connect
+            await asyncio.sleep(max(0, deadline - time.monotonic() - 1))
+            results['usage'] = process_usage(options['pid'])
+        
+        tasks = [hold() for _ in range(options['connections'])]
+        if options['pid']:
+            tasks.append(measure())
+        await asyncio.gather(*tasks)
+        return results
@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+from issues.geojson import feature_collection_chunks
+from issues.models import Issue
+from issues.serializers import IssueSerializer
+from ._bench import (
+    clear_synthetic_data,
+    get_bench_user,
+    percentile,
+    seed_issues,
+    time_calls,
+)
+
+class Command(BaseCommand):
+    """
+    Compare the streamed GeoJSON export with rendering IssueSerializer(many=True).
+    Run against a development database: it inserts synthetic issues.
+    """
+    help = 'Benchmark the GeoJSON export against IssueSerializer(many=True)'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000],
+                            help='Numbers of issues to export')
+        parser.add_argument('--runs', type=int, default=5,
+                            help='Timed runs per size and method')
+        parser.add_argument('--chunk-size', type=int, default=2000,
+                            help='Features per GeoJSON chunk')
+        parser.add_argument('--keep', action='store_true',
+                            help='Keep the synthetic issues for later runs')
+    
+    def handle(self, *args, **options):
+        reporter = get_bench_user()
+        existing = Issue.objects.filter(reported_by=reporter).count()
+        largest = max(options['sizes'])
+        if existing < largest:
+            self.stdout.write(f'Seeding {largest - existing} synthetic issues...')
+            seed_issues(largest - existing)
+        
+        issues = Issue.objects.filter(reported_by=reporter).order_by('id')
+        
+        def serializer_export(size):
+            queryset = issues.select_related('reported_by').prefetch_related('images')[:size]
+            return JSONRenderer().render(IssueSerializer(queryset, many=True).data)
+        
+        def geojson_export(size):
+            return b''.join(feature_collection_chunks(issues[:size], options['chunk_size']))
+        
+        try:
+            for size in sorted(options['sizes']):
+                self.stdout.write(self.style.MIGRATE_HEADING(f'{size} issues'))
+                for name, export in (('IssueSerializer', serializer_export),
+                                     ('GeoJSON stream', geojson_export)):
+                    payload = len(export(size))
+                    timings = time_calls(lambda: export(size), options['runs'])
+                    median = percentile(timings, 50)
+                    self.stdout.write(
+                        f'{name:16} p50 {median:9.1f} ms  '
+                        f'{size / median * 1000:10.0f} issues/s  '
+                        f'{payload / 1024:10.0f} KiB'
+                    )
+        finally:
+            if not options['keep']:
+                clear_synthetic_data()
@@ -0,0 +1,68 @@
+from django.contrib.gis.db.models.functions import Distance
+from django.contrib.gis.geos import Point
+from django.core.management.base import BaseCommand
+from issues.models import Issue
+from ._bench import (
+    DEFAULT_CENTER,
+    clear_synthetic_data,
+    get_bench_user,
+    percentile,
+    seed_issues,
+    time_calls,
+)
+
+class Command(BaseCommand):
+    """
+    Compare the old Distance-filtered radius search with the dwithin
+    prefilter used by IssueQuerySet.within_distance().
+    Run against a development database: it inserts synthetic issues.
+    """
+    help = 'Benchmark nearby radius queries: Distance filter vs dwithin prefilter'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--issues', type=int, default=1_000_000,
+                            help='Number of synthetic issues to search over')
+        parser.add_argument('--distance', type=int, default=5000,
+                            help='Search radius in meters')
+        parser.add_argument('--runs', type=int, default=20,
+                            help='Timed runs per query')
+        parser.add_argument('--batch-size', type=int, default=10000,
+                            help='bulk_create batch size when seeding')
+        parser.add_argument('--keep', action='store_true',
+                            help='Keep the synthetic issues for later runs')
+    
+    def handle(self, *args, **options):
+        reporter = get_bench_user()
+        existing = Issue.objects.filter(reported_by=reporter).count()
+        if existing < options['issues']:
+            self.stdout.write(f"Seeding {options['issues'] - existing} synthetic issues...")
+            seed_issues(options['issues'] - existing, batch_size=options['batch_size'])
+        
+        point = Point(*DEFAULT_CENTER, srid=4326)
+        distance = options['distance']
+        queries = {
+            'distance filter': lambda: Issue.objects.annotate(
+                distance=Distance('location', point)
+            ).filter(distance__lte=distance).order_by('distance'),
+            'dwithin prefilter': lambda: Issue.objects.within_distance(
+                point, distance
+            ).order_by('distance'),
+        }
+        
+        try:
+            for name, queryset in queries.items():
+                rows = queryset().count()
+                timings = time_calls(
+                    lambda: list(queryset().values_list('pk', 'distance')),
+                    options['runs']
+                )
+                self.stdout.write(self.style.MIGRATE_HEADING(f'{name} ({rows} rows)'))
+                self.stdout.write(queryset().explain(analyze=True))
+                self.stdout.write(
+                    f'p50 {percentile(timings, 50):.1f} ms  '
+                    f'p95 {percentile(timings, 95):.1f} ms  '
+                    f'max {max(timings):.1f} ms\n'
+                )
+        finally:
+            if not options['keep']:
+                clear_synthetic_data()
@@ -0,0 +1,68 @@
+import os
+from collections import Counter
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from issues.cache import invalidate_reporter
+from issues.models import ImageBlob, IssueImage
+from issues.uploads import file_sha256
+
+class Command(BaseCommand):
+    """
+    Move issue images stored before content-addressed storage into the
+    deduplicated blob layout. Each file is hashed, moved to its blob or
+    removed if the blob already exists, and the images referencing it are
+    re-pointed at the blob.
+    """
+    help = 'Migrate existing issue images into deduplicated storage'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only report the space that would be saved')
+    
+    def handle(self, *args, **options):
+        storage = IssueImage._meta.get_field('image').storage
+        legacy = Counter(
+            IssueImage.objects.exclude(image='')
+            .exclude(image__startswith=f'{storage.prefix}/')
+            .values_list('image', flat=True)
+            .iterator()
+        )
+        
+        files = duplicates = missing = saved = 0
+        seen = set()
+        for name, references in legacy.items():
+            if not storage.exists(name):
+                missing += 1
+                self.stderr.write(f'Missing file: {name}')
+                continue
+            
+            path = storage.path(name)
+            size = os.path.getsize(path)
+            digest = file_sha256(path)
+            files += 1
+            
+            if options['dry_run']:
+                if digest in seen or ImageBlob.objects.filter(digest=digest).exists():
+                    duplicates += 1
+                    saved += size
+                seen.add(digest)
+                continue
+            
+            with transaction.atomic():
+                blob_name = storage.add_reference(path, digest, os.path.splitext(name)[1].lower(), references)
+                images = IssueImage.objects.filter(image=name)
+                reporters = set(images.values_list('issue__reported_by', flat=True))
+                images.update(image=blob_name)
+            for reporter_id in reporters:
+                invalidate_reporter(reporter_id)
+            if os.path.exists(path):
+                # The content was already stored; this copy is redundant
+                os.remove(path)
+                duplicates += 1
+                saved += size
+        
+        action = 'Would migrate' if options['dry_run'] else 'Migrated'
+        self.stdout.write(self.style.SUCCESS(
+            f'{action} {files} files, {duplicates} duplicates, '
+            f'{saved / (1024 * 1024):.1f} MB saved, {missing} missing.'
+        ))
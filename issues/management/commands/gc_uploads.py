@@ -0,0 +1,50 @@
+import os
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from issues.models import ImageUpload
+from issues.uploads import delete_part_file
+
+class Command(BaseCommand):
+    """
+    Delete resumable image uploads that have not received a chunk within the
+    expiry window, along with their part files, plus any part file left in
+    IMAGE_UPLOAD_TEMP_DIR without an upload.
+    """
+    help = 'Garbage-collect abandoned resumable image uploads'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=float, default=settings.IMAGE_UPLOAD_EXPIRY_HOURS,
+                            help='Hours since the last chunk after which an upload is abandoned')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only report what would be deleted')
+    
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options['older_than'])
+        abandoned = ImageUpload.objects.filter(updated_at__lt=cutoff)
+        
+        uploads = 0
+        for upload in abandoned.iterator():
+            uploads += 1
+            if not options['dry_run']:
+                part_path = upload.part_path
+                upload.delete()
+                delete_part_file(part_path)
+        
+        # Part files whose upload row is gone, e.g. after a crash
+        orphans = 0
+        if os.path.isdir(settings.IMAGE_UPLOAD_TEMP_DIR):
+            live = {f'{pk}.part' for pk in ImageUpload.objects.values_list('pk', flat=True).iterator()}
+            for name in os.listdir(settings.IMAGE_UPLOAD_TEMP_DIR):
+                path = os.path.join(settings.IMAGE_UPLOAD_TEMP_DIR, name)
+                if name in live or os.path.getmtime(path) >= cutoff.timestamp():
+                    continue
+                orphans += 1
+                if not options['dry_run']:
+                    delete_part_file(path)
+        
+        action = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(
+            f'{action} {uploads} abandoned uploads and {orphans} orphaned part files.'
+        ))
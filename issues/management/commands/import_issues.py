@@ -0,0 +1,66 @@
+import os
+import sys
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from issues.importers import READERS, import_issues
+
+User = get_user_model()
+
+# File extensions recognised when --format is not given
+EXTENSION_FORMATS = {
+    '.csv': 'csv',
+    '.json': 'json',
+    '.ndjson': 'ndjson',
+    '.jsonl': 'ndjson',
+    '.geojson': 'geojson',
+    '.geojsonl': 'geojsonl',
+    '.geojsons': 'geojsonl',
+}
+
+class Command(BaseCommand):
+    """
+    Import issues from legacy helpdesk or field-survey exports.
+    The input is streamed and inserted in batches, so files of any size can
+    be imported. CSV columns and JSON/GeoJSON properties are the fields of
+    IssueImportSerializer; GeoJSON takes the location from Point geometries.
+    """
+    help = 'Bulk import issues from CSV, JSON, NDJSON or GeoJSON'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Input file, or '-' for standard input")
+        parser.add_argument('--format', choices=sorted(READERS),
+                            help='Input format (default: from the file extension)')
+        parser.add_argument('--reporter', required=True,
+                            help='Username recorded as the reporter of imported issues')
+        parser.add_argument('--batch-size', type=int, default=settings.ISSUE_IMPORT_BATCH_SIZE,
+                            help='Rows validated and inserted per transaction')
+    
+    def handle(self, *args, **options):
+        try:
+            reporter = User.objects.get(username=options['reporter'])
+        except User.DoesNotExist:
+            raise CommandError(f"User '{options['reporter']}' does not exist.")
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1.')
+        
+        path = options['path']
+        input_format = options['format'] or EXTENSION_FORMATS.get(os.path.splitext(path)[1].lower())
+        if input_format is None:
+            raise CommandError('Cannot tell the input format, pass --format.')
+        
+        stream = sys.stdin if path == '-' else open(path, encoding='utf-8', newline='')
+        try:
+            rows = READERS[input_format](stream)
+            created, errors = import_issues(rows, reporter, options['batch_size'])
+        except ValueError as error:
+            raise CommandError(f'Invalid {input_format} input: {error}')
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        
+        for error in errors:
+            self.stderr.write(f"Row {error['row']}: {error['errors']}")
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {created} issues, {len(errors)} rows rejected.'
+        ))
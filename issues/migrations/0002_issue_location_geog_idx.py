@@ -0,0 +1,25 @@
+# Generated by Django 5.2 on 2026-10-18 09:12
+
+import django.contrib.gis.db.models.fields
+import django.contrib.postgres.indexes
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issues', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='issue',
+            name='priority',
+            field=models.CharField(choices=[('HIGH', 'High'), ('NORMAL', 'Normal'), ('LOW', 'Low'), ('NA', 'Not Applicable')], default='NA', max_length=10, verbose_name='Priority'),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=django.contrib.postgres.indexes.GistIndex(django.db.models.functions.comparison.Cast('location', output_field=django.contrib.gis.db.models.fields.PointField(geography=True, srid=4326)), name='issue_location_geog_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2 on 2026-10-18 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issues', '0003_issue_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='issueimage',
+            name='medium',
+            field=models.ImageField(blank=True, upload_to='issue_images/renditions/%Y/%m/%d/', verbose_name='Medium Image'),
+        ),
+        migrations.AddField(
+            model_name='issueimage',
+            name='processed_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Processed At'),
+        ),
+        migrations.AddField(
+            model_name='issueimage',
+            name='thumbnail',
+            field=models.ImageField(blank=True, upload_to='issue_images/renditions/%Y/%m/%d/', verbose_name='Thumbnail'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2 on 2026-10-18 14:20
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issues', '0004_issueimage_renditions'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageUpload',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('filename', models.CharField(max_length=255, verbose_name='Filename')),
+                ('caption', models.CharField(blank=True, max_length=100, verbose_name='Caption')),
+                ('size', models.PositiveBigIntegerField(verbose_name='Size')),
+                ('sha256', models.CharField(max_length=64, verbose_name='SHA-256')),
+                ('received_bytes', models.PositiveBigIntegerField(default=0, verbose_name='Received Bytes')),
+                ('next_chunk', models.PositiveIntegerField(default=0, verbose_name='Next Chunk')),
+                ('last_chunk_sha256', models.CharField(blank=True, max_length=64, verbose_name='Last Chunk SHA-256')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+                ('issue', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='uploads', to='issues.issue', verbose_name='Issue')),
+                ('uploaded_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='image_uploads', to=settings.AUTH_USER_MODEL, verbose_name='Uploaded By')),
+            ],
+            options={
+                'verbose_name': 'Image Upload',
+                'verbose_name_plural': 'Image Uploads',
+                'indexes': [models.Index(fields=['updated_at'], name='imageupload_updated_idx')],
+            },
+        ),
+    ]
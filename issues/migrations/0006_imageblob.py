@@ -0,0 +1,33 @@
+# Generated by Django 5.2 on 2026-10-18 14:40
+
+import issues.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issues', '0005_imageupload'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageBlob',
+            fields=[
+                ('digest', models.CharField(max_length=64, primary_key=True, serialize=False, verbose_name='SHA-256')),
+                ('name', models.CharField(max_length=255, verbose_name='Name')),
+                ('size', models.PositiveBigIntegerField(verbose_name='Size')),
+                ('refcount', models.PositiveIntegerField(default=0, verbose_name='References')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+            ],
+            options={
+                'verbose_name': 'Image Blob',
+                'verbose_name_plural': 'Image Blobs',
+            },
+        ),
+        migrations.AlterField(
+            model_name='issueimage',
+            name='image',
+            field=models.ImageField(max_length=255, storage=issues.storage.get_issue_image_storage, upload_to='issue_images/%Y/%m/%d/', verbose_name='Image'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2 on 2026-10-18 15:10
+
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.conf import settings
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issues', '0006_imageblob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='issue',
+            name='upvotes',
+            field=models.PositiveIntegerField(default=0, verbose_name='Upvotes'),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['title'], name='issue_title_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['description'], name='issue_description_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.CreateModel(
+            name='IssueUpvote',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+                ('issue', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upvote_set', to='issues.issue', verbose_name='Issue')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='issue_upvotes', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Issue Upvote',
+                'verbose_name_plural': 'Issue Upvotes',
+                'constraints': [models.UniqueConstraint(fields=('issue', 'user'), name='issue_upvote_unique_user')],
+            },
+        ),
+    ]
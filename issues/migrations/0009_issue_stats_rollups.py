@@ -0,0 +1,159 @@
+# Generated by Django 5.2 on 2026-10-18 16:20
+
+from django.db import migrations, models
+
+# Upserts the net change of a statement into the rollup tables. {changes}
+# yields issue rows with a delta of +1 (new row) or -1 (old row). The grid
+# size and resolution buckets must match issues.stats.
+ROLLUP_SQL = """
+    INSERT INTO issues_issuecountrollup AS rollup (status, type, priority, cell_x, cell_y, count)
+    SELECT status, type, priority,
+           floor(ST_X(location) / 0.01)::integer, floor(ST_Y(location) / 0.01)::integer, sum(delta)
+    FROM ({changes}) AS changes
+    GROUP BY 1, 2, 3, 4, 5
+    HAVING sum(delta) <> 0
+    ORDER BY 1, 2, 3, 4, 5
+    ON CONFLICT (status, type, priority, cell_x, cell_y)
+    DO UPDATE SET count = rollup.count + EXCLUDED.count;
+
+    INSERT INTO issues_openissuerollup AS rollup (type, priority, created_on, count)
+    SELECT type, priority, (created_at AT TIME ZONE 'UTC')::date, sum(delta)
+    FROM ({changes}) AS changes
+    WHERE status <> 'RESOLVED'
+    GROUP BY 1, 2, 3
+    HAVING sum(delta) <> 0
+    ORDER BY 1, 2, 3
+    ON CONFLICT (type, priority, created_on)
+    DO UPDATE SET count = rollup.count + EXCLUDED.count;
+
+    INSERT INTO issues_issueresolutionrollup AS rollup (type, priority, bucket, count)
+    SELECT type, priority,
+           width_bucket(
+               (extract(epoch FROM resolved_at - created_at) / 3600)::double precision,
+               ARRAY[1, 6, 24, 72, 168, 720]::double precision[]
+           ),
+           sum(delta)
+    FROM ({changes}) AS changes
+    WHERE status = 'RESOLVED' AND resolved_at IS NOT NULL
+    GROUP BY 1, 2, 3
+    HAVING sum(delta) <> 0
+    ORDER BY 1, 2, 3
+    ON CONFLICT (type, priority, bucket)
+    DO UPDATE SET count = rollup.count + EXCLUDED.count;
+"""
+
+# Statement-level triggers see all rows of a bulk insert or update at once
+TRIGGERS = {
+    'insert': ('NEW TABLE AS new_rows', 'SELECT 1 AS delta, * FROM new_rows'),
+    'update': (
+        'OLD TABLE AS old_rows NEW TABLE AS new_rows',
+        'SELECT 1 AS delta, * FROM new_rows UNION ALL SELECT -1, * FROM old_rows'
+    ),
+    'delete': ('OLD TABLE AS old_rows', 'SELECT -1 AS delta, * FROM old_rows'),
+}
+
+CREATE_TRIGGERS = ''.join(
+    f"""
+CREATE FUNCTION issues_issue_stats_{operation}() RETURNS trigger AS $$
+BEGIN
+{ROLLUP_SQL.format(changes=changes)}
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER issues_issue_stats_{operation}
+    AFTER {operation.upper()} ON issues_issue
+    REFERENCING {transition_tables}
+    FOR EACH STATEMENT EXECUTE FUNCTION issues_issue_stats_{operation}();
+"""
+    for operation, (transition_tables, changes) in TRIGGERS.items()
+) + f"""
+CREATE FUNCTION issues_issue_stats_rebuild() RETURNS void AS $$
+BEGIN
+    DELETE FROM issues_issuecountrollup;
+    DELETE FROM issues_openissuerollup;
+    DELETE FROM issues_issueresolutionrollup;
+{ROLLUP_SQL.format(changes='SELECT 1 AS delta, * FROM issues_issue')}
+END
+$$ LANGUAGE plpgsql;
+
+SELECT issues_issue_stats_rebuild();
+"""
+
+DROP_TRIGGERS = ''.join(
+    f"""
+DROP TRIGGER issues_issue_stats_{operation} ON issues_issue;
+DROP FUNCTION issues_issue_stats_{operation}();
+"""
+    for operation in TRIGGERS
+) + """
+DROP FUNCTION issues_issue_stats_rebuild();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issues', '0008_issue_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='issue',
+            name='resolved_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Resolved At'),
+        ),
+        # Best available estimate for issues resolved before resolved_at existed
+        migrations.RunSQL(
+            "UPDATE issues_issue SET resolved_at = updated_at WHERE status = 'RESOLVED'",
+            migrations.RunSQL.noop
+        ),
+        migrations.CreateModel(
+            name='IssueCountRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('ACCEPTED', 'Accepted'), ('IN PROGRESS', 'In Progress'), ('RESOLVED', 'Resolved')], max_length=15, verbose_name='Status')),
+                ('type', models.CharField(choices=[('INFRASTRUCTURE', 'Infrastructure'), ('SERVICES', 'Services'), ('ENCROACHMENT', 'Encroachment'), ('OTHER', 'Other')], max_length=15, verbose_name='Issue Type')),
+                ('priority', models.CharField(choices=[('HIGH', 'High'), ('NORMAL', 'Normal'), ('LOW', 'Low'), ('NA', 'Not Applicable')], max_length=10, verbose_name='Priority')),
+                ('cell_x', models.IntegerField(verbose_name='Cell X')),
+                ('cell_y', models.IntegerField(verbose_name='Cell Y')),
+                ('count', models.BigIntegerField(default=0, verbose_name='Count')),
+            ],
+            options={
+                'verbose_name': 'Issue Count Rollup',
+                'verbose_name_plural': 'Issue Count Rollups',
+                'constraints': [models.UniqueConstraint(fields=('status', 'type', 'priority', 'cell_x', 'cell_y'), name='issuecountrollup_unique_group')],
+            },
+        ),
+        migrations.CreateModel(
+            name='IssueResolutionRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('type', models.CharField(choices=[('INFRASTRUCTURE', 'Infrastructure'), ('SERVICES', 'Services'), ('ENCROACHMENT', 'Encroachment'), ('OTHER', 'Other')], max_length=15, verbose_name='Issue Type')),
+                ('priority', models.CharField(choices=[('HIGH', 'High'), ('NORMAL', 'Normal'), ('LOW', 'Low'), ('NA', 'Not Applicable')], max_length=10, verbose_name='Priority')),
+                ('bucket', models.SmallIntegerField(verbose_name='Bucket')),
+                ('count', models.BigIntegerField(default=0, verbose_name='Count')),
+            ],
+            options={
+                'verbose_name': 'Issue Resolution Rollup',
+                'verbose_name_plural': 'Issue Resolution Rollups',
+                'constraints': [models.UniqueConstraint(fields=('type', 'priority', 'bucket'), name='issueresolutionrollup_unique_group')],
+            },
+        ),
+        migrations.CreateModel(
+            name='OpenIssueRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('type', models.CharField(choices=[('INFRASTRUCTURE', 'Infrastructure'), ('SERVICES', 'Services'), ('ENCROACHMENT', 'Encroachment'), ('OTHER', 'Other')], max_length=15, verbose_name='Issue Type')),
+                ('priority', models.CharField(choices=[('HIGH', 'High'), ('NORMAL', 'Normal'), ('LOW', 'Low'), ('NA', 'Not Applicable')], max_length=10, verbose_name='Priority')),
+                ('created_on', models.DateField(verbose_name='Created On')),
+                ('count', models.BigIntegerField(default=0, verbose_name='Count')),
+            ],
+            options={
+                'verbose_name': 'Open Issue Rollup',
+                'verbose_name_plural': 'Open Issue Rollups',
+                'constraints': [models.UniqueConstraint(fields=('type', 'priority', 'created_on'), name='openissuerollup_unique_group')],
+            },
+        ),
+        migrations.RunSQL(CREATE_TRIGGERS, DROP_TRIGGERS),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2 on 2026-10-18 17:05
+
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issues', '0009_issue_stats_rollups'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IssueStatusEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.CharField(choices=[('PENDING', 'Pending'), ('ACCEPTED', 'Accepted'), ('IN PROGRESS', 'In Progress'), ('RESOLVED', 'Resolved')], max_length=15, verbose_name='From Status')),
+                ('to_status', models.CharField(choices=[('PENDING', 'Pending'), ('ACCEPTED', 'Accepted'), ('IN PROGRESS', 'In Progress'), ('RESOLVED', 'Resolved')], max_length=15, verbose_name='To Status')),
+                ('from_priority', models.CharField(choices=[('HIGH', 'High'), ('NORMAL', 'Normal'), ('LOW', 'Low'), ('NA', 'Not Applicable')], max_length=10, verbose_name='From Priority')),
+                ('to_priority', models.CharField(choices=[('HIGH', 'High'), ('NORMAL', 'Normal'), ('LOW', 'Low'), ('NA', 'Not Applicable')], max_length=10, verbose_name='To Priority')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+                ('changed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='issue_status_events', to=settings.AUTH_USER_MODEL, verbose_name='Changed By')),
+                ('issue', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='status_events', to='issues.issue', verbose_name='Issue')),
+            ],
+            options={
+                'verbose_name': 'Issue Status Event',
+                'verbose_name_plural': 'Issue Status Events',
+                'ordering': ['created_at', 'id'],
+                'indexes': [django.contrib.postgres.indexes.BrinIndex(fields=['created_at'], name='statusevent_created_brin'), models.Index(fields=['issue', 'created_at'], name='statusevent_issue_created_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2 on 2026-10-18 18:30
+
+from django.db import migrations
+
+# Issue.save() keeps resolved_at in step with status, but bulk_create() and
+# QuerySet.update() bypass it. This row trigger does the same for every
+# write, before the statement triggers of 0009 roll the rows up.
+CREATE_TRIGGER = """
+CREATE FUNCTION issues_issue_resolved_at() RETURNS trigger AS $$
+BEGIN
+    IF NEW.status = 'RESOLVED' THEN
+        NEW.resolved_at := COALESCE(NEW.resolved_at, now());
+    ELSE
+        NEW.resolved_at := NULL;
+    END IF;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER issues_issue_resolved_at
+    BEFORE INSERT OR UPDATE OF status, resolved_at ON issues_issue
+    FOR EACH ROW EXECUTE FUNCTION issues_issue_resolved_at();
+
+-- Issues resolved in bulk before the trigger existed
+UPDATE issues_issue SET resolved_at = updated_at WHERE status = 'RESOLVED' AND resolved_at IS NULL;
+"""
+
+DROP_TRIGGER = """
+DROP TRIGGER issues_issue_resolved_at ON issues_issue;
+DROP FUNCTION issues_issue_resolved_at();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issues', '0010_issuestatusevent'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_TRIGGER, DROP_TRIGGER),
+    ]
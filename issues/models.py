@@ -1,7 +1,97 @@
-from django.db import models
+import os
+import uuid
+from datetime import timedelta
+from django.db import models, transaction
+from django.db.models import Aggregate, Avg, Count, F, FloatField, Func, Q, Value
+from django.db.models.functions import Cast, Greatest, Trunc
 from django.contrib.gis.db import models as gis_models
+from django.contrib.gis.db.models.functions import Distance
+from django.contrib.postgres.indexes import BrinIndex, GinIndex, GistIndex
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField, TrigramSimilarity
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
+from .storage import get_issue_image_storage
+
+# Text search configuration of Issue.search_vector, fixed by migration 0008
+SEARCH_CONFIG = 'english'
+
+def geography_point_field():
+    """Output field for casting Issue.location (SRID 4326) to geography"""
+    return gis_models.PointField(geography=True, srid=4326)
+
+def search_query(text):
+    """Parse `text` with web search syntax (quotes, or, -) for Issue.search_vector"""
+    return SearchQuery(text, search_type='websearch', config=SEARCH_CONFIG)
+
+class DWithin(Func):
+    """ST_DWithin(a, b, distance) as a boolean expression usable in filter()"""
+    function = 'ST_DWithin'
+    output_field = models.BooleanField()
+
+class EpochHours(Func):
+    """Length of an interval in hours"""
+    template = 'EXTRACT(EPOCH FROM %(expressions)s)::double precision / 3600'
+    output_field = FloatField()
+
+class PercentileCont(Aggregate):
+    """percentile_cont(fraction) WITHIN GROUP (ORDER BY expression)"""
+    function = 'percentile_cont'
+    template = '%(function)s(%(fraction)s) WITHIN GROUP (ORDER BY %(expressions)s)'
+    output_field = FloatField()
+    
+    def __init__(self, expression, fraction, **extra):
+        super().__init__(expression, fraction=float(fraction), **extra)
+
+class IssueQuerySet(models.QuerySet):
+    def within_distance(self, point, distance):
+        """
+        Issues within `distance` meters of `point`, annotated with their exact
+        `distance` in meters. ST_DWithin on the geography cast of location is
+        answered from issue_location_geog_idx, so the distance is only computed
+        for rows that survive the index prefilter.
+        """
+        location = Cast('location', output_field=geography_point_field())
+        target = Value(point, output_field=geography_point_field())
+        return self.filter(
+            DWithin(location, target, Value(distance))
+        ).annotate(distance=Distance(location, target))
+    
+    def search(self, text):
+        """
+        Issues matching the full-text query `text`, annotated with their
+        `rank`. Matching uses issue_search_vector_idx; titles weigh more than
+        descriptions in the rank.
+        """
+        query = search_query(text)
+        return self.filter(search_vector=query).annotate(rank=SearchRank('search_vector', query))
+    
+    def duplicate_candidates(self, issue_type, point, title, description):
+        """
+        Recent unresolved issues of `issue_type` near `point` whose title or
+        description is similar to the given text, most similar first, each
+        annotated with its `similarity` (0-1) and `distance`. The trigram
+        operator (pg_trgm.similarity_threshold) prefilters on the GIN indexes
+        and within_distance() on the location index; similarity is only
+        computed for the rows that pass both.
+        """
+        since = timezone.now() - timedelta(days=settings.DUPLICATE_SEARCH_DAYS)
+        return self.filter(
+            Q(title__trigram_similar=title) | Q(description__trigram_similar=description),
+            type=issue_type,
+            created_at__gte=since,
+        ).exclude(
+            status=Issue.StatusType.RESOLVED
+        ).within_distance(
+            point, settings.DUPLICATE_SEARCH_DISTANCE
+        ).annotate(
+            similarity=Greatest(
+                TrigramSimilarity('title', title),
+                TrigramSimilarity('description', description)
+            )
+        ).filter(
+            similarity__gte=settings.DUPLICATE_MIN_SIMILARITY
+        ).order_by('-similarity', 'distance')[:settings.DUPLICATE_MAX_RESULTS]
 
 # Create your models here.
 class Issue(models.Model):
@@ -62,17 +152,173 @@ class Issue(models.Model):
         verbose_name=_('Priority')
     )
     
+    # Weighted tsvector of title (A) and description (B), maintained by a
+    # database trigger so bulk inserts and updates are covered too
+    search_vector = SearchVectorField(null=True, editable=False)
+    
+    # Reports merged into this issue as duplicates (see IssueUpvote)
+    upvotes = models.PositiveIntegerField(default=0, verbose_name=_('Upvotes'))
+    
+    # Set when the status becomes RESOLVED, cleared if the issue is reopened
+    resolved_at = models.DateTimeField(null=True, blank=True, editable=False, verbose_name=_('Resolved At'))
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True, verbose_name=_('Created At'))
     updated_at = models.DateTimeField(auto_now=True, verbose_name=_('Updated At'))
     
+    objects = IssueQuerySet.as_manager()
+    
     class Meta:
         verbose_name = _('Issue')
         verbose_name_plural = _('Issues')
         ordering = ['-created_at']
+        indexes = [
+            # Must match the cast in IssueQuerySet.within_distance()
+            GistIndex(
+                Cast('location', output_field=geography_point_field()),
+                name='issue_location_geog_idx'
+            ),
+            # List endpoint: default ordering, per-citizen listing and filterset_fields
+            models.Index(fields=['-created_at'], name='issue_created_idx'),
+            models.Index(fields=['reported_by', '-created_at'], name='issue_reporter_created_idx'),
+            models.Index(fields=['status', '-created_at'], name='issue_status_created_idx'),
+            models.Index(fields=['type', '-created_at'], name='issue_type_created_idx'),
+            models.Index(fields=['priority', '-created_at'], name='issue_priority_created_idx'),
+            # Open (unresolved) issues, the set municipal triage works through
+            models.Index(
+                fields=['-created_at'],
+                name='issue_open_created_idx',
+                condition=~Q(status='RESOLVED')
+            ),
+            models.Index(
+                fields=['type', '-created_at'],
+                name='issue_open_type_idx',
+                condition=~Q(status='RESOLVED')
+            ),
+            # Trigram matching in IssueQuerySet.duplicate_candidates()
+            GinIndex(fields=['title'], name='issue_title_trgm_idx', opclasses=['gin_trgm_ops']),
+            GinIndex(fields=['description'], name='issue_description_trgm_idx', opclasses=['gin_trgm_ops']),
+            # Full-text search in IssueQuerySet.search() and the admin
+            GinIndex(fields=['search_vector'], name='issue_search_vector_idx'),
+        ]
     
     def __str__(self):
         return f"{self.title} ({self.get_status_display()})"
+    
+    def save(self, *args, **kwargs):
+        # A trigger (migration 0011) does the same for bulk writes
+        if self.status == self.StatusType.RESOLVED:
+            if self.resolved_at is None:
+                self.resolved_at = timezone.now()
+        else:
+            self.resolved_at = None
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'status' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'resolved_at'}
+        super().save(*args, **kwargs)
+    
+    def upvote(self, user):
+        """
+        Record a duplicate report of this issue by `user`. Each user counts
+        once; returns whether the upvote was new.
+        """
+        with transaction.atomic():
+            _, created = IssueUpvote.objects.get_or_create(issue=self, user=user)
+            if created:
+                self.upvotes = F('upvotes') + 1
+                self.save(update_fields=['upvotes'])
+                self.refresh_from_db(fields=['upvotes'])
+        return created
+
+class IssueUpvote(models.Model):
+    """
+    Model for a duplicate report merged into an existing issue.
+    """
+    issue = models.ForeignKey(
+        Issue,
+        on_delete=models.CASCADE,
+        related_name='upvote_set',
+        verbose_name=_('Issue')
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='issue_upvotes',
+        verbose_name=_('User')
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name=_('Created At'))
+    
+    class Meta:
+        verbose_name = _('Issue Upvote')
+        verbose_name_plural = _('Issue Upvotes')
+        constraints = [
+            models.UniqueConstraint(fields=['issue', 'user'], name='issue_upvote_unique_user'),
+        ]
+    
+    def __str__(self):
+        return f"Upvote of {self.issue.title} by {self.user}"
+
+class IssueCountRollup(models.Model):
+    """
+    Number of issues per status, type, priority and grid cell.
+    Maintained by database triggers on Issue (see issues.stats).
+    """
+    status = models.CharField(max_length=15, choices=Issue.StatusType.choices, verbose_name=_('Status'))
+    type = models.CharField(max_length=15, choices=Issue.IssueType.choices, verbose_name=_('Issue Type'))
+    priority = models.CharField(max_length=10, choices=Issue.PriorityType.choices, verbose_name=_('Priority'))
+    cell_x = models.IntegerField(verbose_name=_('Cell X'))
+    cell_y = models.IntegerField(verbose_name=_('Cell Y'))
+    count = models.BigIntegerField(default=0, verbose_name=_('Count'))
+    
+    class Meta:
+        verbose_name = _('Issue Count Rollup')
+        verbose_name_plural = _('Issue Count Rollups')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['status', 'type', 'priority', 'cell_x', 'cell_y'],
+                name='issuecountrollup_unique_group'
+            ),
+        ]
+
+class OpenIssueRollup(models.Model):
+    """
+    Number of unresolved issues per type, priority and day of creation.
+    Maintained by database triggers on Issue (see issues.stats).
+    """
+    type = models.CharField(max_length=15, choices=Issue.IssueType.choices, verbose_name=_('Issue Type'))
+    priority = models.CharField(max_length=10, choices=Issue.PriorityType.choices, verbose_name=_('Priority'))
+    created_on = models.DateField(verbose_name=_('Created On'))
+    count = models.BigIntegerField(default=0, verbose_name=_('Count'))
+    
+    class Meta:
+        verbose_name = _('Open Issue Rollup')
+        verbose_name_plural = _('Open Issue Rollups')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['type', 'priority', 'created_on'],
+                name='openissuerollup_unique_group'
+            ),
+        ]
+
+class IssueResolutionRollup(models.Model):
+    """
+    Number of resolved issues per type, priority and resolution time bucket.
+    Maintained by database triggers on Issue (see issues.stats).
+    """
+    type = models.CharField(max_length=15, choices=Issue.IssueType.choices, verbose_name=_('Issue Type'))
+    priority = models.CharField(max_length=10, choices=Issue.PriorityType.choices, verbose_name=_('Priority'))
+    bucket = models.SmallIntegerField(verbose_name=_('Bucket'))
+    count = models.BigIntegerField(default=0, verbose_name=_('Count'))
+    
+    class Meta:
+        verbose_name = _('Issue Resolution Rollup')
+        verbose_name_plural = _('Issue Resolution Rollups')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['type', 'priority', 'bucket'],
+                name='issueresolutionrollup_unique_group'
+            ),
+        ]
 
 class IssueImage(models.Model):
     """
@@ -84,10 +330,29 @@ class IssueImage(models.Model):
         related_name='images',
         verbose_name=_('Issue')
     )
+    # Deduplicated: identical uploads share one file (see issues.storage)
     image = models.ImageField(
         upload_to='issue_images/%Y/%m/%d/',
+        storage=get_issue_image_storage,
+        max_length=255,
         verbose_name=_('Image')
     )
+    # WebP renditions, filled in by issues.processing after upload
+    thumbnail = models.ImageField(
+        upload_to='issue_images/renditions/%Y/%m/%d/',
+        blank=True,
+        verbose_name=_('Thumbnail')
+    )
+    medium = models.ImageField(
+        upload_to='issue_images/renditions/%Y/%m/%d/',
+        blank=True,
+        verbose_name=_('Medium Image')
+    )
+    processed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_('Processed At')
+    )
     caption = models.CharField(
         max_length=100,
         blank=True,
@@ -104,4 +369,134 @@ class IssueImage(models.Model):
         ordering = ['uploaded_at']
     
     def __str__(self):
-        return f"Image for {self.issue.title}"
\ No newline at end of file
+        return f"Image for {self.issue.title}"
+
+class ImageUpload(models.Model):
+    """
+    Model for a resumable, chunked image upload in progress.
+    Chunks are appended in order to a part file under IMAGE_UPLOAD_TEMP_DIR
+    until the upload is completed and attached to the issue as an IssueImage.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    issue = models.ForeignKey(
+        Issue,
+        on_delete=models.CASCADE,
+        related_name='uploads',
+        verbose_name=_('Issue')
+    )
+    uploaded_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='image_uploads',
+        verbose_name=_('Uploaded By')
+    )
+    filename = models.CharField(max_length=255, verbose_name=_('Filename'))
+    caption = models.CharField(max_length=100, blank=True, verbose_name=_('Caption'))
+    size = models.PositiveBigIntegerField(verbose_name=_('Size'))
+    sha256 = models.CharField(max_length=64, verbose_name=_('SHA-256'))
+    
+    # Progress, advanced by each accepted chunk
+    received_bytes = models.PositiveBigIntegerField(default=0, verbose_name=_('Received Bytes'))
+    next_chunk = models.PositiveIntegerField(default=0, verbose_name=_('Next Chunk'))
+    last_chunk_sha256 = models.CharField(max_length=64, blank=True, verbose_name=_('Last Chunk SHA-256'))
+    
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name=_('Created At'))
+    updated_at = models.DateTimeField(auto_now=True, verbose_name=_('Updated At'))
+    
+    class Meta:
+        verbose_name = _('Image Upload')
+        verbose_name_plural = _('Image Uploads')
+        indexes = [
+            # Garbage collection of abandoned uploads
+            models.Index(fields=['updated_at'], name='imageupload_updated_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Upload of {self.filename} ({self.received_bytes}/{self.size} bytes)"
+    
+    @property
+    def part_path(self):
+        return os.path.join(settings.IMAGE_UPLOAD_TEMP_DIR, f'{self.id}.part')
+
+class ImageBlob(models.Model):
+    """
+    Model for a file in content-addressed image storage, keyed by the SHA-256
+    of its content and counting the image fields that reference it.
+    """
+    digest = models.CharField(max_length=64, primary_key=True, verbose_name=_('SHA-256'))
+    name = models.CharField(max_length=255, verbose_name=_('Name'))
+    size = models.PositiveBigIntegerField(verbose_name=_('Size'))
+    refcount = models.PositiveIntegerField(default=0, verbose_name=_('References'))
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name=_('Created At'))
+    
+    class Meta:
+        verbose_name = _('Image Blob')
+        verbose_name_plural = _('Image Blobs')
+    
+    def __str__(self):
+        return f"{self.name} ({self.refcount} references)"
+
+class IssueStatusEventQuerySet(models.QuerySet):
+    def resolution_times(self, period, group_by=None):
+        """
+        Hours from report to resolution of the issues resolved in each
+        `period` ('day', 'week' or 'month'), optionally also grouped by the
+        issue field `group_by`: count, mean and percentiles in one grouped
+        query. A reopened issue counts again each time it is resolved.
+        """
+        groups = {'period': Trunc('created_at', period)}
+        if group_by:
+            groups[group_by] = F(f'issue__{group_by}')
+        hours = EpochHours(F('created_at') - F('issue__created_at'))
+        return self.filter(
+            to_status=Issue.StatusType.RESOLVED
+        ).values(**groups).annotate(
+            count=Count('id'),
+            mean_hours=Avg(hours),
+            p50_hours=PercentileCont(hours, 0.5),
+            p90_hours=PercentileCont(hours, 0.9),
+        ).order_by(*groups)
+
+class IssueStatusEvent(models.Model):
+    """
+    Model for an append-only record of a change to an issue's status or
+    priority. Rows arrive in time order, so created_at is BRIN-indexed.
+    """
+    # Covered by statusevent_issue_created_idx; one index less to write
+    issue = models.ForeignKey(
+        Issue,
+        on_delete=models.CASCADE,
+        related_name='status_events',
+        db_index=False,
+        verbose_name=_('Issue')
+    )
+    # Empty for events reconstructed by backfill_status_events
+    changed_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='issue_status_events',
+        verbose_name=_('Changed By')
+    )
+    from_status = models.CharField(max_length=15, choices=Issue.StatusType.choices, verbose_name=_('From Status'))
+    to_status = models.CharField(max_length=15, choices=Issue.StatusType.choices, verbose_name=_('To Status'))
+    from_priority = models.CharField(max_length=10, choices=Issue.PriorityType.choices, verbose_name=_('From Priority'))
+    to_priority = models.CharField(max_length=10, choices=Issue.PriorityType.choices, verbose_name=_('To Priority'))
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name=_('Created At'))
+    
+    objects = IssueStatusEventQuerySet.as_manager()
+    
+    class Meta:
+        verbose_name = _('Issue Status Event')
+        verbose_name_plural = _('Issue Status Events')
+        ordering = ['created_at', 'id']
+        indexes = [
+            # City-wide time range scans; a fraction of the size of a B-tree
+            BrinIndex(fields=['created_at'], name='statusevent_created_brin'),
+            # Per-issue timelines
+            models.Index(fields=['issue', 'created_at'], name='statusevent_issue_created_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.issue.title}: {self.from_status} -> {self.to_status}"
@@ -0,0 +1,30 @@
+from rest_framework.pagination import PageNumberPagination
+from nagarkranti.pagination import KeysetPagination
+
+class IssueCursorPagination(KeysetPagination):
+    """
+    Newest-first keyset pagination for the issue list, keyed on (created_at, id).
+    Requests with a `page` parameter keep the old page-number format.
+    """
+    ordering = ('-created_at', '-id')
+    page_number_class = PageNumberPagination
+
+class NearbyCursorPagination(KeysetPagination):
+    """
+    Keyset pagination for distance-ordered nearby results, keyed on
+    (distance, id). The queryset must be annotated with `distance`.
+    """
+    ordering = ('distance', 'id')
+    
+    def get_position_value(self, instance, name):
+        if name == 'distance':
+            # repr() of the float round-trips through JSON exactly
+            return instance.distance.m
+        return super().get_position_value(instance, name)
+
+class SearchCursorPagination(KeysetPagination):
+    """
+    Keyset pagination for ranked search results, keyed on (rank, id).
+    The queryset must be annotated with `rank`.
+    """
+    ordering = ('-rank', 'id')
@@ -0,0 +1,16 @@
+import codecs
+from django.conf import settings
+from rest_framework.parsers import BaseParser
+from .importers import iter_ndjson
+
+class NDJSONParser(BaseParser):
+    """
+    Parses newline-delimited JSON into a lazy iterator of rows.
+    The request body is read line by line as the rows are consumed.
+    """
+    media_type = 'application/x-ndjson'
+    
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        return iter_ndjson(codecs.getreader(encoding)(stream))
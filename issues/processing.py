@@ -0,0 +1,129 @@
+"""
+Background processing of uploaded issue images.
+After an IssueImage is committed, a worker thread loads the upload,
+normalizes its EXIF orientation, strips EXIF metadata (GPS included) from
+the original and records WebP thumbnail and medium renditions on the model.
+No external broker is needed: work runs on an in-process thread pool, and
+with IMAGE_PROCESSING_BACKEND = 'process' the Pillow work itself moves to a
+process pool so large photos don't compete for the GIL.
+"""
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from io import BytesIO
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Rendition field name -> longest side in pixels
+RENDITIONS = {
+    'thumbnail': 320,
+    'medium': 1280,
+}
+
+# Formats Pillow reads but should be written back as plain JPEG
+SAVE_FORMATS = {'MPO': 'JPEG'}
+
+_thread_pool = None
+_process_pool = None
+
+def get_thread_pool():
+    global _thread_pool
+    if _thread_pool is None:
+        _thread_pool = ThreadPoolExecutor(
+            max_workers=settings.IMAGE_PROCESSING_WORKERS,
+            thread_name_prefix='issue-images'
+        )
+    return _thread_pool
+
+def get_process_pool():
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=settings.IMAGE_PROCESSING_WORKERS)
+    return _process_pool
+
+def render_renditions(data, sizes, quality):
+    """
+    Render WebP renditions of the image in `data`, bounded by `sizes`.
+    Returns (original, renditions): `original` is the re-encoded upload with
+    orientation applied and EXIF removed, or None if it carried no EXIF.
+    Pure Pillow work with no Django access, so it can run in another process.
+    """
+    with Image.open(BytesIO(data)) as source:
+        original_format = SAVE_FORMATS.get(source.format, source.format)
+        has_exif = bool(source.getexif())
+        icc_profile = source.info.get('icc_profile')
+        image = ImageOps.exif_transpose(source)
+    
+    original = None
+    if has_exif:
+        buffer = BytesIO()
+        # EXIF is only written when passed explicitly, so this drops it
+        image.save(buffer, format=original_format, quality=90, icc_profile=icc_profile)
+        original = buffer.getvalue()
+    
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if image.has_transparency_data else 'RGB')
+    renditions = {}
+    for name, size in sizes.items():
+        rendition = image.copy()
+        rendition.thumbnail((size, size), Image.Resampling.LANCZOS)
+        buffer = BytesIO()
+        rendition.save(buffer, format='WEBP', quality=quality, icc_profile=icc_profile)
+        renditions[name] = buffer.getvalue()
+    return original, renditions
+
+def process_image(image_id):
+    """Normalize the original of IssueImage `image_id` and store its renditions"""
+    from .models import IssueImage
+    
+    try:
+        image = IssueImage.objects.get(pk=image_id)
+    except IssueImage.DoesNotExist:
+        return
+    if not image.image or not image.image.storage.exists(image.image.name):
+        return
+    
+    with image.image.open('rb') as upload:
+        data = upload.read()
+    args = (data, RENDITIONS, settings.IMAGE_RENDITION_QUALITY)
+    if settings.IMAGE_PROCESSING_BACKEND == 'process':
+        original, renditions = get_process_pool().submit(render_renditions, *args).result()
+    else:
+        original, renditions = render_renditions(*args)
+    
+    update_fields = list(RENDITIONS) + ['processed_at']
+    if original is not None:
+        old_name = image.image.name
+        image.image.save(os.path.basename(old_name), ContentFile(original), save=False)
+        image.image.storage.delete(old_name)
+        update_fields.append('image')
+    
+    stem = os.path.splitext(os.path.basename(image.image.name))[0]
+    for name, rendition in renditions.items():
+        getattr(image, name).save(f'{stem}_{name}.webp', ContentFile(rendition), save=False)
+    image.processed_at = timezone.now()
+    image.save(update_fields=update_fields)
+
+def process_image_in_worker(image_id):
+    try:
+        process_image(image_id)
+    except Exception:
+        logger.exception('Processing issue image %s failed', image_id)
+    finally:
+        # Worker threads hold their own connection; don't leave it open
+        connection.close()
+
+def schedule_image_processing(image_id):
+    """
+    Queue IssueImage `image_id` for processing once the current transaction
+    commits. With IMAGE_PROCESSING_BACKEND = 'sync' it is processed right away.
+    """
+    if settings.IMAGE_PROCESSING_BACKEND == 'sync':
+        process_image(image_id)
+        return
+    transaction.on_commit(lambda: get_thread_pool().submit(process_image_in_worker, image_id))
@@ -1,15 +1,33 @@
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.gis.geos import Point
-from .models import Issue, IssueImage
+from django.db import transaction
+from nagarkranti.metrics import MeasuredSerializerMixin
+from .models import ImageUpload, Issue, IssueImage, IssueStatusEvent
+from .processing import schedule_image_processing
 
-class IssueImageSerializer(serializers.ModelSerializer):
-    """Serializer for issue images"""
+class IssueImageSerializer(MeasuredSerializerMixin, serializers.ModelSerializer):
+    """Serializer for issue images, with the full-size image and its renditions"""
     class Meta:
         model = IssueImage
-        fields = ['id', 'image', 'caption', 'uploaded_at']
-        read_only_fields = ['uploaded_at']
+        fields = ['id', 'image', 'medium', 'thumbnail', 'caption', 'uploaded_at']
+        read_only_fields = ['medium', 'thumbnail', 'uploaded_at']
 
-class IssueSerializer(serializers.ModelSerializer):
+class IssueImageThumbnailSerializer(MeasuredSerializerMixin, serializers.ModelSerializer):
+    """Compact serializer for issue images in list responses"""
+    thumbnail = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = IssueImage
+        fields = ['id', 'thumbnail', 'caption', 'uploaded_at']
+    
+    def get_thumbnail(self, obj):
+        # Fall back to the original until the thumbnail has been generated
+        url = (obj.thumbnail or obj.image).url
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+class IssueSerializer(MeasuredSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for issues with nested image serializer.
     Used for read operations (list and retrieve).
@@ -30,10 +48,10 @@ class IssueSerializer(serializers.ModelSerializer):
             'id', 'title', 'description', 'type', 'type_display',
             'status', 'status_display', 'priority', 'priority_display',
             'reported_by', 'reported_by_username', 'location', 
-            'latitude', 'longitude', 'images',
+            'latitude', 'longitude', 'images', 'upvotes',
             'created_at', 'updated_at'
         ]
-        read_only_fields = ['reported_by', 'created_at', 'updated_at']
+        read_only_fields = ['reported_by', 'upvotes', 'created_at', 'updated_at']
     
     def get_latitude(self, obj):
         return obj.location.y if obj.location else None
@@ -41,9 +59,38 @@ class IssueSerializer(serializers.ModelSerializer):
     def get_longitude(self, obj):
         return obj.location.x if obj.location else None
 
+class IssueListSerializer(IssueSerializer):
+    """
+    Serializer for issues in list responses.
+    Images are represented by their thumbnails only.
+    """
+    images = IssueImageThumbnailSerializer(many=True, read_only=True)
+
+class DuplicateIssueSerializer(serializers.ModelSerializer):
+    """
+    Serializer for likely duplicates of a new report.
+    Duplicates may belong to other citizens, so only a summary is shown.
+    """
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    similarity = serializers.FloatField(read_only=True)
+    distance = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = Issue
+        fields = [
+            'id', 'title', 'type', 'status', 'status_display',
+            'upvotes', 'similarity', 'distance', 'created_at'
+        ]
+    
+    def get_distance(self, obj):
+        return round(obj.distance.m, 1)
+
 class IssueCreateSerializer(serializers.ModelSerializer):
     """
     Serializer for creating issues with location data and images.
+    Likely duplicates of the report are returned with the new issue, or with
+    on_duplicate=merge the report upvotes the best match instead. The match
+    may belong to another citizen, so the view only returns its summary.
     """
     images = serializers.ListField(
         child=serializers.ImageField(),
@@ -52,12 +99,19 @@ class IssueCreateSerializer(serializers.ModelSerializer):
     )
     latitude = serializers.FloatField(write_only=True, required=True)
     longitude = serializers.FloatField(write_only=True, required=True)
+    on_duplicate = serializers.ChoiceField(
+        choices=['create', 'merge'],
+        default='create',
+        write_only=True
+    )
+    duplicates = serializers.SerializerMethodField()
+    merged = serializers.SerializerMethodField()
     
     class Meta:
         model = Issue
         fields = [
-            'title', 'description', 'type', 'latitude', 'longitude',
-            'images'
+            'id', 'title', 'description', 'type', 'latitude', 'longitude',
+            'images', 'on_duplicate', 'duplicates', 'merged'
         ]
     
     def validate(self, data):
@@ -68,9 +122,16 @@ class IssueCreateSerializer(serializers.ModelSerializer):
             )
         return data
     
+    def get_duplicates(self, obj):
+        return DuplicateIssueSerializer(getattr(obj, 'duplicates', []), many=True).data
+    
+    def get_merged(self, obj):
+        return getattr(obj, 'merged', False)
+    
     def create(self, validated_data):
         # Extract and remove images from validated data
         images_data = validated_data.pop('images', [])
+        on_duplicate = validated_data.pop('on_duplicate')
         
         # Extract and remove coordinates to create Point object
         latitude = validated_data.pop('latitude')
@@ -81,15 +142,58 @@ class IssueCreateSerializer(serializers.ModelSerializer):
         validated_data['location'] = location
         validated_data['reported_by'] = self.context['request'].user
         
-        # Create issue instance
-        issue = Issue.objects.create(**validated_data)
+        duplicates = list(Issue.objects.duplicate_candidates(
+            validated_data.get('type', Issue.IssueType.OTHER),
+            location,
+            validated_data['title'],
+            validated_data['description']
+        ))
+        merged = on_duplicate == 'merge' and bool(duplicates)
+        if merged and images_data and duplicates[0].reported_by_id != validated_data['reported_by'].pk:
+            # Citizens may only add images to their own issues
+            raise serializers.ValidationError({
+                'images': ["Images can't be added to another citizen's issue. "
+                           "Report with on_duplicate=create to attach them."]
+            })
         
-        # Create issue images
-        for image_data in images_data:
-            IssueImage.objects.create(issue=issue, image=image_data)
+        # Create the issue (or upvote the duplicate) and all of its images in one transaction
+        with transaction.atomic():
+            if merged:
+                issue = duplicates[0]
+                issue.upvote(validated_data['reported_by'])
+            else:
+                issue = Issue.objects.create(**validated_data)
+            images = IssueImage.objects.bulk_create(
+                IssueImage(issue=issue, image=image_data) for image_data in images_data
+            )
+            # bulk_create sends no post_save signals
+            for image in images:
+                schedule_image_processing(image.pk)
         
+        issue.duplicates = duplicates
+        issue.merged = merged
         return issue
 
+class IssueImportSerializer(serializers.ModelSerializer):
+    """
+    Serializer for one row of a bulk import.
+    Validates a row and builds an unsaved Issue for bulk_create.
+    """
+    latitude = serializers.FloatField(write_only=True, min_value=-90, max_value=90)
+    longitude = serializers.FloatField(write_only=True, min_value=-180, max_value=180)
+    
+    class Meta:
+        model = Issue
+        fields = [
+            'title', 'description', 'type', 'status', 'priority',
+            'latitude', 'longitude'
+        ]
+    
+    def to_issue(self, reported_by):
+        data = dict(self.validated_data)
+        location = Point(data.pop('longitude'), data.pop('latitude'), srid=4326)
+        return Issue(reported_by=reported_by, location=location, **data)
+
 class IssueUpdateSerializer(serializers.ModelSerializer):
     """
     Serializer for updating issue status and priority.
@@ -109,6 +213,44 @@ class IssueUpdateSerializer(serializers.ModelSerializer):
                 {"status": "Only municipal officers can update issue status."}
             )
         return data
+    
+    def update(self, instance, validated_data):
+        """Save the change and append a status event if status or priority moved"""
+        previous_status, previous_priority = instance.status, instance.priority
+        with transaction.atomic():
+            issue = super().update(instance, validated_data)
+            if (issue.status, issue.priority) != (previous_status, previous_priority):
+                IssueStatusEvent.objects.create(
+                    issue=issue,
+                    changed_by=self.context['request'].user,
+                    from_status=previous_status,
+                    to_status=issue.status,
+                    from_priority=previous_priority,
+                    to_priority=issue.priority
+                )
+        return issue
+
+class IssueStatusEventSerializer(MeasuredSerializerMixin, serializers.ModelSerializer):
+    """
+    Serializer for entries of an issue's status timeline.
+    """
+    changed_by_username = serializers.CharField(source='changed_by.username', read_only=True, default=None)
+    
+    class Meta:
+        model = IssueStatusEvent
+        fields = [
+            'id', 'from_status', 'to_status', 'from_priority', 'to_priority',
+            'changed_by', 'changed_by_username', 'created_at'
+        ]
+
+class ResolutionTimesSerializer(serializers.Serializer):
+    """
+    Serializer for the query parameters of the time-to-resolution report.
+    """
+    period = serializers.ChoiceField(choices=['day', 'week', 'month'], default='week')
+    group_by = serializers.ChoiceField(choices=['type', 'priority'], required=False)
+    since = serializers.DateTimeField(required=False)
+    until = serializers.DateTimeField(required=False)
 
 class AddIssueImageSerializer(serializers.ModelSerializer):
     """
@@ -125,10 +267,42 @@ class AddIssueImageSerializer(serializers.ModelSerializer):
         validated_data['issue_id'] = issue_id
         return IssueImage.objects.create(**validated_data)
 
+class ImageUploadSerializer(serializers.ModelSerializer):
+    """
+    Serializer for resumable image uploads.
+    Clients initiate an upload with the file's size and SHA-256 and resume
+    from next_chunk / received_bytes.
+    """
+    size = serializers.IntegerField(min_value=1, max_value=settings.IMAGE_UPLOAD_MAX_SIZE)
+    sha256 = serializers.RegexField(r'^[0-9a-f]{64}$')
+    chunk_size = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = ImageUpload
+        fields = [
+            'id', 'filename', 'caption', 'size', 'sha256', 'chunk_size',
+            'received_bytes', 'next_chunk', 'created_at', 'updated_at'
+        ]
+        read_only_fields = ['received_bytes', 'next_chunk', 'created_at', 'updated_at']
+    
+    def get_chunk_size(self, obj):
+        return settings.IMAGE_UPLOAD_CHUNK_SIZE
+
 class NearbyIssueSerializer(serializers.Serializer):
     """
     Serializer for finding issues near a specific location.
     """
     latitude = serializers.FloatField(required=True)
     longitude = serializers.FloatField(required=True)
-    distance = serializers.IntegerField(required=False, default=5000)  # Default 5km
\ No newline at end of file
+    distance = serializers.IntegerField(
+        required=False,
+        default=5000,  # Default 5km
+        min_value=1,
+        max_value=settings.NEARBY_MAX_DISTANCE
+    )
+    limit = serializers.IntegerField(
+        required=False,
+        min_value=1,
+        max_value=settings.NEARBY_MAX_RESULTS
+    )
+    stream = serializers.BooleanField(required=False, default=False)
\ No newline at end of file
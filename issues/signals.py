@@ -0,0 +1,51 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .cache import invalidate_reporter
+from .events import event_payload, get_broker
+from .models import Issue, IssueImage, IssueStatusEvent
+from .processing import schedule_image_processing
+
+@receiver([post_save, post_delete], sender=Issue)
+def invalidate_issue_responses(sender, instance, **kwargs):
+    """Drop cached reads that may include this issue"""
+    invalidate_reporter(instance.reported_by_id)
+
+@receiver([post_save, post_delete], sender=IssueImage)
+def invalidate_image_responses(sender, instance, **kwargs):
+    """Drop cached reads that may include the image's issue"""
+    try:
+        invalidate_reporter(instance.issue.reported_by_id)
+    except Issue.DoesNotExist:
+        # The issue itself was deleted and has invalidated already
+        pass
+
+
+@receiver(post_save, sender=IssueImage)
+def process_new_image(sender, instance, created, **kwargs):
+    """Queue renditions for newly uploaded images"""
+    if created:
+        schedule_image_processing(instance.pk)
+
+
+@receiver(post_delete, sender=IssueImage)
+def release_image_files(sender, instance, **kwargs):
+    """
+    Once the delete commits, drop the image's reference to its deduplicated
+    blob, which is removed along with the last one, and delete its renditions
+    """
+    files = [file for file in (instance.image, instance.thumbnail, instance.medium) if file]
+    
+    def release():
+        for file in files:
+            file.delete(save=False)
+    
+    transaction.on_commit(release)
+
+
+@receiver(post_save, sender=IssueStatusEvent)
+def push_status_event(sender, instance, created, **kwargs):
+    """Push new status changes to connected event streams once committed"""
+    if created:
+        payload = event_payload(instance)
+        transaction.on_commit(lambda: get_broker().publish(payload))
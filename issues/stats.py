@@ -0,0 +1,121 @@
+"""
+Aggregate issue statistics for municipal dashboards.
+Counts are read from rollup tables that statement-level triggers on
+issues_issue keep up to date (migration 0009), so a dashboard read costs
+one pass over the rollup groups however many issues there are. After
+bulk repairs the rollups can be rebuilt with `manage.py rebuild_issue_stats`.
+"""
+import math
+from collections import defaultdict
+from django.utils import timezone
+from .models import Issue, IssueCountRollup, IssueResolutionRollup, OpenIssueRollup
+
+# Size of the grid cells in degrees (about 1.1 km north-south), as in the triggers
+GRID_SIZE = 0.01
+
+# Upper bounds in hours of the resolution time buckets, as in the triggers.
+# Bucket i holds resolution times below RESOLUTION_BUCKETS[i]; the last
+# bucket holds everything slower.
+RESOLUTION_BUCKETS = (1, 6, 24, 72, 168, 720)
+
+AGE_PERCENTILES = (50, 90, 99)
+
+def resolution_bucket_labels():
+    bounds = (0,) + RESOLUTION_BUCKETS
+    labels = [f'{low}-{high}h' for low, high in zip(bounds, RESOLUTION_BUCKETS)]
+    return labels + [f'{RESOLUTION_BUCKETS[-1]}h+']
+
+def histogram_percentiles(histogram, percentiles):
+    """Nearest-rank percentiles of a {value: count} histogram"""
+    total = sum(histogram.values())
+    if not total:
+        return {f'p{pct}': None for pct in percentiles}
+    result = {}
+    ordered = sorted(histogram.items())
+    for pct in percentiles:
+        rank = max(1, math.ceil(pct / 100 * total))
+        seen = 0
+        for value, count in ordered:
+            seen += count
+            if seen >= rank:
+                result[f'p{pct}'] = value
+                break
+    return result
+
+def count_stats():
+    totals = {'status': defaultdict(int), 'type': defaultdict(int), 'priority': defaultdict(int)}
+    cells = {}
+    for row in IssueCountRollup.objects.filter(count__gt=0).values(
+        'status', 'type', 'priority', 'cell_x', 'cell_y', 'count'
+    ).iterator():
+        for field, counts in totals.items():
+            counts[row[field]] += row['count']
+        cell = cells.setdefault((row['cell_x'], row['cell_y']), {'count': 0, 'open': 0})
+        cell['count'] += row['count']
+        if row['status'] != Issue.StatusType.RESOLVED:
+            cell['open'] += row['count']
+    
+    return {
+        'total': sum(totals['status'].values()),
+        'by_status': dict(totals['status']),
+        'by_type': dict(totals['type']),
+        'by_priority': dict(totals['priority']),
+        'cells': [
+            {
+                'cell': [x, y],
+                # west, south, east, north
+                'bounds': [x * GRID_SIZE, y * GRID_SIZE, (x + 1) * GRID_SIZE, (y + 1) * GRID_SIZE],
+                **counts,
+            }
+            for (x, y), counts in sorted(cells.items())
+        ],
+    }
+
+def open_age_stats():
+    """Age percentiles, in whole days, of unresolved issues"""
+    today = timezone.now().date()
+    overall = defaultdict(int)
+    grouped = {'type': defaultdict(lambda: defaultdict(int)), 'priority': defaultdict(lambda: defaultdict(int))}
+    for row in OpenIssueRollup.objects.filter(count__gt=0).values(
+        'type', 'priority', 'created_on', 'count'
+    ).iterator():
+        age = (today - row['created_on']).days
+        overall[age] += row['count']
+        for field, histograms in grouped.items():
+            histograms[row[field]][age] += row['count']
+    
+    def summary(histogram):
+        return {'count': sum(histogram.values()), **histogram_percentiles(histogram, AGE_PERCENTILES)}
+    
+    return {
+        **summary(overall),
+        'by_type': {value: summary(histogram) for value, histogram in grouped['type'].items()},
+        'by_priority': {value: summary(histogram) for value, histogram in grouped['priority'].items()},
+    }
+
+def resolution_stats():
+    """Distribution of resolved issues over the resolution time buckets"""
+    size = len(RESOLUTION_BUCKETS) + 1
+    overall = [0] * size
+    grouped = {'type': defaultdict(lambda: [0] * size), 'priority': defaultdict(lambda: [0] * size)}
+    for row in IssueResolutionRollup.objects.filter(count__gt=0).values(
+        'type', 'priority', 'bucket', 'count'
+    ):
+        overall[row['bucket']] += row['count']
+        for field, distributions in grouped.items():
+            distributions[row[field]][row['bucket']] += row['count']
+    
+    return {
+        'buckets': resolution_bucket_labels(),
+        'counts': overall,
+        'by_type': dict(grouped['type']),
+        'by_priority': dict(grouped['priority']),
+    }
+
+def issue_stats():
+    """Dashboard statistics over all issues, built from the rollup tables"""
+    return {
+        **count_stats(),
+        'open_age_days': open_age_stats(),
+        'resolution_hours': resolution_stats(),
+    }
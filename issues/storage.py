@@ -0,0 +1,90 @@
+"""
+Content-addressed storage for issue images.
+Uploads are hashed with SHA-256 as they are written and kept once under
+their digest, so a photo attached to several complaints, or uploaded again,
+is stored a single time. An ImageBlob row per digest counts the files that
+reference the blob; delete() drops one reference and only removes the blob
+together with the last one.
+"""
+import hashlib
+import os
+import tempfile
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+
+class ContentAddressedStorage(FileSystemStorage):
+    """FileSystemStorage that stores each distinct file once, under its digest"""
+    prefix = 'issue_images/blobs'
+    
+    def blob_name(self, digest, ext):
+        return f'{self.prefix}/{digest[:2]}/{digest}{ext}'
+    
+    def is_blob(self, name):
+        return name.startswith(f'{self.prefix}/')
+    
+    def get_available_name(self, name, max_length=None):
+        # The stored name is derived from the content in _save(), not from this
+        return name
+    
+    def _save(self, name, content):
+        directory = self.path(self.prefix)
+        os.makedirs(directory, exist_ok=True)
+        digest = hashlib.sha256()
+        with tempfile.NamedTemporaryFile(dir=directory, suffix='.tmp', delete=False) as temp:
+            for chunk in content.chunks():
+                digest.update(chunk)
+                temp.write(chunk)
+        try:
+            return self.add_reference(temp.name, digest.hexdigest(), os.path.splitext(name)[1].lower())
+        finally:
+            # Still there unless it became the blob
+            if os.path.exists(temp.name):
+                os.remove(temp.name)
+    
+    def add_reference(self, path, digest, ext, count=1):
+        """
+        Record `count` new references to the blob with `digest` and return its
+        name. The file at `path` is moved into place if the blob isn't stored
+        yet, otherwise it is left for the caller to remove.
+        """
+        from .models import ImageBlob
+        
+        with transaction.atomic():
+            # The row lock serializes saves and deletes of the same content
+            blob, _ = ImageBlob.objects.select_for_update().get_or_create(
+                digest=digest,
+                defaults={'name': self.blob_name(digest, ext), 'size': os.path.getsize(path)}
+            )
+            if not self.exists(blob.name):
+                blob_path = self.path(blob.name)
+                os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                os.replace(path, blob_path)
+                if self.file_permissions_mode is not None:
+                    os.chmod(blob_path, self.file_permissions_mode)
+            blob.refcount += count
+            blob.save(update_fields=['refcount'])
+        return blob.name
+    
+    def delete(self, name):
+        """Drop a reference to the blob `name`, removing it with the last one"""
+        from .models import ImageBlob
+        
+        if not self.is_blob(name):
+            # Stored before deduplication (see the dedupe_images command)
+            return super().delete(name)
+        
+        digest = os.path.splitext(os.path.basename(name))[0]
+        with transaction.atomic():
+            blob = ImageBlob.objects.select_for_update().filter(digest=digest).first()
+            if blob is not None and blob.refcount > 1:
+                blob.refcount -= 1
+                blob.save(update_fields=['refcount'])
+                return
+            if blob is not None:
+                blob.delete()
+            super().delete(name)
+
+issue_image_storage = ContentAddressedStorage()
+
+def get_issue_image_storage():
+    return issue_image_storage
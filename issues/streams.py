@@ -0,0 +1,173 @@
+"""
+Server-sent event stream of issue status changes, served straight from
+ASGI. Django's handler runs every request in a thread of its own and would
+hold one per open stream, so /api/issues/events/ is routed past it (see
+nagarkranti/asgi.py) and an idle stream costs one coroutine and a queue.
+
+Citizens receive the changes to their own issues, municipal users those to
+every issue. Clients authenticate with the usual JWT, as a Bearer header or,
+since EventSource can't set headers, an `access_token` query parameter. A
+reconnecting client sends Last-Event-ID and first receives the events it
+missed, up to ISSUE_EVENTS_REPLAY_LIMIT. Streams are closed when their
+access token expires, so that the client reconnects with a current one and
+deactivated users or revoked tokens lose access within a token's lifetime.
+"""
+import asyncio
+import json
+import time
+from urllib.parse import parse_qs
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from users.authentication import CachedJWTAuthentication
+from .events import encode, event_payload, get_broker
+from .models import IssueStatusEvent
+
+EVENTS_PATH = '/api/issues/events/'
+
+# Sent before the first event: how long browsers wait before reconnecting
+RETRY_MS = 5000
+
+def authenticate(headers, query_string):
+    """Return the active user for the request's access token and its expiry time, or None"""
+    authentication = CachedJWTAuthentication()
+    raw_token = None
+    header = headers.get(b'authorization')
+    if header:
+        raw_token = authentication.get_raw_token(header)
+    if raw_token is None:
+        raw_token = parse_qs(query_string.decode('latin-1')).get('access_token', [None])[0]
+    if raw_token is None:
+        return None
+    try:
+        validated_token = authentication.get_validated_token(raw_token)
+        user = authentication.get_user(validated_token)
+    except (InvalidToken, AuthenticationFailed):
+        return None
+    finally:
+        close_old_connections()
+    return user, validated_token['exp']
+
+def missed_events(user, last_event_id):
+    """Events after `last_event_id` the user may see, oldest first"""
+    try:
+        last_event_id = int(last_event_id)
+    except (TypeError, ValueError):
+        return []
+    events = IssueStatusEvent.objects.filter(id__gt=last_event_id).select_related('issue')
+    if user.type != user.UserType.MUNICIPAL:
+        events = events.filter(issue__reported_by=user)
+    try:
+        return [event_payload(event) for event in events.order_by('id')[:settings.ISSUE_EVENTS_REPLAY_LIMIT]]
+    finally:
+        close_old_connections()
+
+def format_event(payload):
+    return f"id: {payload['id']}\nevent: issue.status\ndata: {encode(payload)}\n\n".encode()
+
+class IssueEventStream:
+    """ASGI application for the issue status event stream"""
+    async def __call__(self, scope, receive, send):
+        if scope['method'] == 'OPTIONS':
+            await self.respond(send, 204)
+            return
+        if scope['method'] != 'GET':
+            await self.respond(send, 405, {'detail': f'Method "{scope["method"]}" not allowed.'})
+            return
+        headers = dict(scope['headers'])
+        # Each call runs in a fresh thread: the event loop must not wait for
+        # the single thread Django's own sync code shares.
+        authenticated = await sync_to_async(authenticate, thread_sensitive=False)(headers, scope['query_string'])
+        if authenticated is None:
+            await self.respond(send, 401, {'detail': 'Authentication credentials were not provided.'})
+            return
+        user, expires = authenticated
+        
+        broker = get_broker()
+        subscription = broker.subscribe(user.id, user.type == user.UserType.MUNICIPAL)
+        try:
+            # Subscribed first, so nothing committed meanwhile is lost; the
+            # ids seen in the replay are skipped when they arrive live too
+            replayed = await sync_to_async(missed_events, thread_sensitive=False)(
+                user, headers.get(b'last-event-id', b'').decode('latin-1') or None
+            )
+            await send({
+                'type': 'http.response.start',
+                'status': 200,
+                'headers': self.headers([
+                    (b'content-type', b'text/event-stream'),
+                    (b'cache-control', b'no-cache'),
+                    (b'x-accel-buffering', b'no'),
+                ]),
+            })
+            await self.write(send, f'retry: {RETRY_MS}\n\n'.encode())
+            for payload in replayed:
+                await self.write(send, format_event(payload))
+            
+            watcher = asyncio.create_task(self.wait_for_disconnect(receive, subscription))
+            try:
+                await self.stream(send, subscription, {payload['id'] for payload in replayed}, expires)
+            finally:
+                watcher.cancel()
+        finally:
+            broker.unsubscribe(subscription)
+        await send({'type': 'http.response.body', 'body': b''})
+    
+    async def stream(self, send, subscription, replayed_ids, expires):
+        """Write events until the client leaves or the token expires at `expires`"""
+        while True:
+            remaining = expires - time.time()
+            if remaining <= 0:
+                return
+            try:
+                payload = await asyncio.wait_for(
+                    subscription.get(), min(settings.ISSUE_EVENTS_HEARTBEAT, remaining)
+                )
+            except asyncio.TimeoutError:
+                if expires <= time.time():
+                    return
+                # A comment keeps proxies from closing an idle connection
+                await self.write(send, b': keep-alive\n\n')
+                continue
+            if payload is None:
+                return
+            if payload['id'] in replayed_ids:
+                continue
+            await self.write(send, format_event(payload))
+    
+    async def wait_for_disconnect(self, receive, subscription):
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+        subscription.close()
+    
+    async def write(self, send, body):
+        await send({'type': 'http.response.body', 'body': body, 'more_body': True})
+    
+    async def respond(self, send, status, data=None):
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': self.headers([(b'content-type', b'application/json')] if data is not None else []),
+        })
+        await send({'type': 'http.response.body', 'body': json.dumps(data).encode() if data is not None else b''})
+    
+    def headers(self, headers):
+        # Bypasses django-cors-headers, so mirror its policy for this path
+        if settings.CORS_ALLOW_ALL_ORIGINS:
+            headers += [
+                (b'access-control-allow-origin', b'*'),
+                (b'access-control-allow-headers', b'authorization, last-event-id'),
+            ]
+        return headers
+
+def with_event_stream(application):
+    """Route the issue event stream past the Django ASGI `application`"""
+    stream = IssueEventStream()
+    
+    async def router(scope, receive, send):
+        if scope['type'] == 'http' and scope['path'] == EVENTS_PATH:
+            return await stream(scope, receive, send)
+        return await application(scope, receive, send)
+    
+    return router
@@ -1,8 +1,15 @@
+import json
+import math
+from io import BytesIO
+from PIL import Image
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.urls import reverse
 from rest_framework.test import APITestCase
 from rest_framework import status
 from django.contrib.auth import get_user_model
-from issues.models import Issue
+from issues.models import Issue, IssueImage
+from issues.stats import histogram_percentiles
 from django.contrib.gis.geos import Point
 
 User = get_user_model()
@@ -75,4 +82,599 @@ class IssueCreateAPITest(APITestCase):
             
             # Verify location was saved correctly
             self.assertAlmostEqual(new_issue.location.x, 78.9629)  # longitude
-            self.assertAlmostEqual(new_issue.location.y, 20.5937)  # latitude
\ No newline at end of file
+            self.assertAlmostEqual(new_issue.location.y, 20.5937)  # latitude
+
+class NearbyIssueAPITest(APITestCase):
+    """Test case for the paginated and streaming nearby API"""
+    
+    def setUp(self):
+        self.municipal_user = User.objects.create_user(
+            username='testmunicipal',
+            email='municipal@example.com',
+            password='test1234',
+            type=User.UserType.MUNICIPAL
+        )
+        
+        # Issues spaced roughly 100m apart heading east from the search point
+        for i in range(5):
+            Issue.objects.create(
+                reported_by=self.municipal_user,
+                title=f'Nearby Issue {i}',
+                description='Issue near the search point',
+                type=Issue.IssueType.INFRASTRUCTURE,
+                location=Point(78.9629 + i * 0.001, 20.5937)
+            )
+        
+        self.nearby_url = reverse('issue-nearby')
+        self.nearby_data = {'latitude': 20.5937, 'longitude': 78.9629, 'distance': 5000}
+        self.client.force_authenticate(user=self.municipal_user)
+    
+    def test_nearby_cursor_pagination(self):
+        """Test that following the cursor returns every issue nearest first"""
+        titles = []
+        url = self.nearby_url
+        while url:
+            response = self.client.post(url, {**self.nearby_data, 'limit': 2}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data['results']), 2)
+            titles.extend(issue['title'] for issue in response.data['results'])
+            url = response.data['next']
+        
+        self.assertEqual(titles, [f'Nearby Issue {i}' for i in range(5)])
+    
+    def test_nearby_limits_are_enforced(self):
+        """Test that radius and result limits above the server maximum are rejected"""
+        response = self.client.post(
+            self.nearby_url,
+            {**self.nearby_data, 'distance': settings.NEARBY_MAX_DISTANCE + 1},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        
+        response = self.client.post(
+            self.nearby_url,
+            {**self.nearby_data, 'limit': settings.NEARBY_MAX_RESULTS + 1},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    def test_nearby_stream(self):
+        """Test that stream mode returns one JSON issue per line"""
+        response = self.client.post(
+            self.nearby_url,
+            {**self.nearby_data, 'stream': True, 'limit': 3},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        
+        lines = b''.join(response.streaming_content).splitlines()
+        titles = [json.loads(line)['title'] for line in lines]
+        self.assertEqual(titles, ['Nearby Issue 0', 'Nearby Issue 1', 'Nearby Issue 2'])
+
+
+class IssueListPaginationAPITest(APITestCase):
+    """Test case for cursor and page-number pagination of the issue list"""
+    
+    def setUp(self):
+        self.municipal_user = User.objects.create_user(
+            username='testmunicipal',
+            email='municipal@example.com',
+            password='test1234',
+            type=User.UserType.MUNICIPAL
+        )
+        
+        self.issues = [
+            Issue.objects.create(
+                reported_by=self.municipal_user,
+                title=f'Issue {i}',
+                description='Pagination test issue',
+                location=Point(78.9629, 20.5937)
+            )
+            for i in range(25)
+        ]
+        
+        self.issues_list_url = reverse('issue-list')
+        self.client.force_authenticate(user=self.municipal_user)
+    
+    def test_cursor_pagination(self):
+        """Test that following the cursor walks every issue newest first"""
+        ids = []
+        url = self.issues_list_url
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            ids.extend(issue['id'] for issue in response.data['results'])
+            url = response.data['next']
+        
+        expected = Issue.objects.order_by('-created_at', '-id').values_list('id', flat=True)
+        self.assertEqual(ids, list(expected))
+    
+    def test_approximate_count_header(self):
+        """Test that count=approximate adds the planner estimate header"""
+        response = self.client.get(self.issues_list_url, {'count': 'approximate'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertGreaterEqual(int(response['X-Approximate-Count']), 0)
+    
+    def test_page_number_fallback(self):
+        """Test that the page parameter keeps the page-number format"""
+        response = self.client.get(self.issues_list_url, {'page': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 25)
+        self.assertEqual(len(response.data['results']), 10)
+        self.assertIsNotNone(response.data['previous'])
+
+
+class IssueTileAPITest(APITestCase):
+    """Test case for the vector tile API"""
+    
+    def setUp(self):
+        self.municipal_user = User.objects.create_user(
+            username='testmunicipal',
+            email='municipal@example.com',
+            password='test1234',
+            type=User.UserType.MUNICIPAL
+        )
+        
+        Issue.objects.create(
+            reported_by=self.municipal_user,
+            title='Tile Issue',
+            description='Issue inside the requested tile',
+            location=Point(78.9629, 20.5937)
+        )
+        self.client.force_authenticate(user=self.municipal_user)
+    
+    def tile_url(self, z, longitude=78.9629, latitude=20.5937):
+        """URL of the tile at zoom z containing the given point"""
+        n = 2 ** z
+        x = int((longitude + 180) / 360 * n)
+        lat = math.radians(latitude)
+        y = int((1 - math.asinh(math.tan(lat)) / math.pi) / 2 * n)
+        return reverse('issue-tiles', kwargs={'z': z, 'x': x, 'y': y})
+    
+    def test_tiles_with_etag(self):
+        """Test that tiles are returned with an ETag and revalidate with 304"""
+        for z in (5, 16):  # clustered and individual points
+            response = self.client.get(self.tile_url(z))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response['Content-Type'], 'application/vnd.mapbox-vector-tile')
+            self.assertTrue(response.content)
+            
+            etag = response['ETag']
+            response = self.client.get(self.tile_url(z), HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        
+        # Changing an issue in the tile changes the ETag
+        issue = Issue.objects.get()
+        issue.status = Issue.StatusType.RESOLVED
+        issue.save()
+        response = self.client.get(self.tile_url(16), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+    
+    def test_invalid_tile(self):
+        """Test that tile coordinates outside the zoom level are rejected"""
+        response = self.client.get(reverse('issue-tiles', kwargs={'z': 2, 'x': 4, 'y': 0}))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class IssueGeoJSONAPITest(APITestCase):
+    """Test case for the GeoJSON export API"""
+    
+    def setUp(self):
+        self.citizen_user = User.objects.create_user(
+            username='testcitizen',
+            email='citizen@example.com',
+            password='test1234',
+            type=User.UserType.CITIZEN
+        )
+        
+        self.another_citizen = User.objects.create_user(
+            username='anothercitizen',
+            email='another@example.com',
+            password='test1234',
+            type=User.UserType.CITIZEN
+        )
+        
+        for user, issue_type in ((self.citizen_user, Issue.IssueType.SERVICES),
+                                 (self.citizen_user, Issue.IssueType.OTHER),
+                                 (self.another_citizen, Issue.IssueType.SERVICES)):
+            Issue.objects.create(
+                reported_by=user,
+                title=f'{user.username} issue',
+                description='GeoJSON export test issue',
+                type=issue_type,
+                location=Point(78.9629, 20.5937)
+            )
+        
+        self.geojson_url = reverse('issue-geojson')
+    
+    def test_geojson_export(self):
+        """Test that the export is a FeatureCollection of visible, filtered issues"""
+        self.client.force_authenticate(user=self.citizen_user)
+        response = self.client.get(self.geojson_url, {'type': 'SERVICES'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        collection = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(collection['type'], 'FeatureCollection')
+        self.assertEqual(len(collection['features']), 1)
+        
+        feature = collection['features'][0]
+        self.assertEqual(feature['geometry']['type'], 'Point')
+        self.assertAlmostEqual(feature['geometry']['coordinates'][0], 78.9629)
+        self.assertEqual(feature['properties']['reported_by'], self.citizen_user.id)
+        self.assertEqual(feature['properties']['type'], 'SERVICES')
+
+
+class IssueBulkAPITest(APITestCase):
+    """Test case for the bulk issue import API"""
+    
+    def setUp(self):
+        self.citizen_user = User.objects.create_user(
+            username='testcitizen',
+            email='citizen@example.com',
+            password='test1234',
+            type=User.UserType.CITIZEN
+        )
+        
+        self.municipal_user = User.objects.create_user(
+            username='testmunicipal',
+            email='municipal@example.com',
+            password='test1234',
+            type=User.UserType.MUNICIPAL
+        )
+        
+        self.bulk_url = reverse('issue-bulk')
+        self.rows = [
+            {'title': 'Broken streetlight', 'description': 'Dark at night',
+             'type': 'SERVICES', 'latitude': 28.6139, 'longitude': 77.2090},
+            {'title': 'Missing coordinates', 'description': 'No location'},
+            {'title': 'Garbage dump', 'description': 'Not collected',
+             'status': 'ACCEPTED', 'latitude': 28.62, 'longitude': 77.21},
+        ]
+    
+    def test_bulk_import_json(self):
+        """Test that valid rows are imported and invalid ones reported"""
+        self.client.force_authenticate(user=self.municipal_user)
+        response = self.client.post(self.bulk_url + '?batch_size=2', self.rows, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual([error['row'] for error in response.data['errors']], [2])
+        self.assertIn('latitude', response.data['errors'][0]['errors'])
+        self.assertEqual(Issue.objects.get(title='Garbage dump').status, Issue.StatusType.ACCEPTED)
+    
+    def test_bulk_import_ndjson(self):
+        """Test that NDJSON bodies are imported line by line"""
+        self.client.force_authenticate(user=self.municipal_user)
+        body = '\n'.join(json.dumps(row) for row in self.rows) + '\nnot json\n'
+        response = self.client.post(self.bulk_url, body, content_type='application/x-ndjson')
+        
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual([error['row'] for error in response.data['errors']], [2, 4])
+    
+    def test_bulk_import_requires_municipal_user(self):
+        """Test that citizens cannot bulk import"""
+        self.client.force_authenticate(user=self.citizen_user)
+        response = self.client.post(self.bulk_url, self.rows, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class DuplicateDetectionAPITest(APITestCase):
+    """Test case for duplicate detection when issues are reported"""
+    
+    def setUp(self):
+        self.citizen_user = User.objects.create_user(
+            username='testcitizen',
+            email='citizen@example.com',
+            password='test1234',
+            type=User.UserType.CITIZEN
+        )
+        self.another_citizen = User.objects.create_user(
+            username='anothercitizen',
+            email='another@example.com',
+            password='test1234',
+            type=User.UserType.CITIZEN
+        )
+        self.existing = Issue.objects.create(
+            reported_by=self.another_citizen,
+            title='Pothole on Main Street',
+            description='Large pothole near the bus stop',
+            type=Issue.IssueType.INFRASTRUCTURE,
+            location=Point(77.2090, 28.6139)
+        )
+        self.report = {
+            'title': 'Big pothole on Main Street',
+            'description': 'Large pothole near bus stop',
+            'issue_type': 'INFRASTRUCTURE',
+            # About 10 meters from the existing issue
+            'location': {'coordinates': [77.2091, 28.6139]}
+        }
+        self.client.force_authenticate(user=self.citizen_user)
+    
+    def test_duplicates_are_returned(self):
+        """Test that a similar report nearby lists the existing issue"""
+        response = self.client.post(reverse('issue-list'), self.report, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(response.data['merged'])
+        self.assertEqual([d['id'] for d in response.data['duplicates']], [self.existing.id])
+        self.assertLess(response.data['duplicates'][0]['distance'], 50)
+        self.assertEqual(Issue.objects.count(), 2)
+    
+    def test_unrelated_reports_are_not_duplicates(self):
+        """Test that other types, resolved issues and far away issues are ignored"""
+        reports = [
+            dict(self.report, issue_type='SERVICES'),
+            dict(self.report, location={'coordinates': [77.2190, 28.6139]}),
+        ]
+        for report in reports:
+            response = self.client.post(reverse('issue-list'), report, format='json')
+            self.assertEqual(response.data['duplicates'], [])
+        
+        Issue.objects.exclude(pk=self.existing.pk).delete()
+        self.existing.status = Issue.StatusType.RESOLVED
+        self.existing.save()
+        response = self.client.post(reverse('issue-list'), self.report, format='json')
+        self.assertEqual(response.data['duplicates'], [])
+    
+    def test_merge_into_duplicate(self):
+        """Test that on_duplicate=merge upvotes the existing issue once per user"""
+        report = dict(self.report, on_duplicate='merge')
+        for _ in range(2):
+            response = self.client.post(reverse('issue-list'), report, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertTrue(response.data['merged'])
+            self.assertEqual(response.data['id'], self.existing.id)
+            # Only a summary of the other citizen's issue is returned
+            self.assertNotIn('description', response.data)
+        
+        self.existing.refresh_from_db()
+        self.assertEqual(self.existing.upvotes, 1)
+        self.assertEqual(Issue.objects.count(), 1)
+    
+    def test_merge_rejects_images(self):
+        """Test that a merged report can't add images to another citizen's issue"""
+        buffer = BytesIO()
+        Image.new('RGB', (10, 10), 'gray').save(buffer, format='JPEG')
+        response = self.client.post(reverse('issue-list'), {
+            'title': self.report['title'],
+            'description': self.report['description'],
+            'type': 'INFRASTRUCTURE',
+            'longitude': 77.2091,
+            'latitude': 28.6139,
+            'on_duplicate': 'merge',
+            'images': [SimpleUploadedFile('pothole.jpg', buffer.getvalue(), content_type='image/jpeg')],
+        }, format='multipart')
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('images', response.data)
+        self.existing.refresh_from_db()
+        self.assertEqual(self.existing.upvotes, 0)
+        self.assertFalse(IssueImage.objects.exists())
+
+
+class SearchAPITest(APITestCase):
+    """Test case for full-text issue search"""
+    
+    def setUp(self):
+        self.citizen_user = User.objects.create_user(
+            username='testcitizen',
+            email='citizen@example.com',
+            password='test1234',
+            type=User.UserType.CITIZEN
+        )
+        self.municipal_user = User.objects.create_user(
+            username='testmunicipal',
+            email='municipal@example.com',
+            password='test1234',
+            type=User.UserType.MUNICIPAL
+        )
+        location = Point(77.2090, 28.6139)
+        self.in_title = Issue.objects.create(
+            reported_by=self.citizen_user, title='Potholes on Ring Road',
+            description='Several deep holes', type=Issue.IssueType.INFRASTRUCTURE, location=location
+        )
+        self.in_description = Issue.objects.create(
+            reported_by=self.municipal_user, title='Road damage',
+            description='A pothole has opened near the school', type=Issue.IssueType.OTHER, location=location
+        )
+        Issue.objects.create(
+            reported_by=self.citizen_user, title='Streetlight out',
+            description='Dark street at night', location=location
+        )
+        self.search_url = reverse('issue-search')
+    
+    def test_search_is_ranked(self):
+        """Test that matches are stemmed and title matches rank first"""
+        self.client.force_authenticate(user=self.municipal_user)
+        response = self.client.get(self.search_url, {'q': 'pothole'})
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        ids = [issue['id'] for issue in response.data['results']]
+        self.assertEqual(ids, [self.in_title.id, self.in_description.id])
+    
+    def test_search_honours_filters_and_visibility(self):
+        """Test that search applies filterset_fields and the citizen's scope"""
+        self.client.force_authenticate(user=self.municipal_user)
+        response = self.client.get(self.search_url, {'q': 'pothole', 'type': 'OTHER'})
+        self.assertEqual([issue['id'] for issue in response.data['results']], [self.in_description.id])
+        
+        self.client.force_authenticate(user=self.citizen_user)
+        response = self.client.get(self.search_url, {'q': 'pothole'})
+        self.assertEqual([issue['id'] for issue in response.data['results']], [self.in_title.id])
+    
+    def test_search_vector_follows_updates(self):
+        """Test that the search vector is maintained for updates and bulk inserts"""
+        self.in_title.title = 'Waterlogging on Ring Road'
+        self.in_title.description = 'Standing water'
+        self.in_title.save()
+        Issue.objects.bulk_create([
+            Issue(reported_by=self.citizen_user, title='Waterlogged underpass',
+                  description='Flooded after rain', location=Point(77.2090, 28.6139))
+        ])
+        
+        self.assertEqual(Issue.objects.search('pothole').get(), self.in_description)
+        self.assertEqual(Issue.objects.search('waterlogging').count(), 2)
+    
+    def test_search_requires_query(self):
+        """Test that an empty query is rejected"""
+        self.client.force_authenticate(user=self.municipal_user)
+        response = self.client.get(self.search_url, {'q': ' '})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class StatsAPITest(APITestCase):
+    """Test case for the municipal dashboard statistics"""
+    
+    def setUp(self):
+        self.citizen_user = User.objects.create_user(
+            username='testcitizen',
+            email='citizen@example.com',
+            password='test1234',
+            type=User.UserType.CITIZEN
+        )
+        self.municipal_user = User.objects.create_user(
+            username='testmunicipal',
+            email='municipal@example.com',
+            password='test1234',
+            type=User.UserType.MUNICIPAL
+        )
+        self.issues = [
+            Issue.objects.create(
+                reported_by=self.citizen_user,
+                title=f'Issue {i}',
+                description='Issue for the dashboard',
+                type=issue_type,
+                location=Point(77.2050 + i * 0.02, 28.6150)
+            )
+            for i, issue_type in enumerate([Issue.IssueType.INFRASTRUCTURE, Issue.IssueType.SERVICES])
+        ]
+        self.stats_url = reverse('issue-stats')
+    
+    def test_stats_follow_changes(self):
+        """Test that the rollups follow inserts, status changes and deletes"""
+        resolved = self.issues[0]
+        resolved.status = Issue.StatusType.RESOLVED
+        resolved.save()
+        Issue.objects.bulk_create([
+            Issue(reported_by=self.citizen_user, title='Imported', description='Bulk import',
+                  location=Point(77.2050, 28.6150))
+        ])
+        Issue.objects.filter(type=Issue.IssueType.SERVICES).delete()
+        
+        self.client.force_authenticate(user=self.municipal_user)
+        response = self.client.get(self.stats_url)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.data
+        self.assertEqual(data['total'], 2)
+        self.assertEqual(data['by_status'], {'RESOLVED': 1, 'PENDING': 1})
+        self.assertEqual(data['by_type'], {'INFRASTRUCTURE': 1, 'OTHER': 1})
+        self.assertEqual(len(data['cells']), 1)
+        self.assertEqual(data['cells'][0]['count'], 2)
+        self.assertEqual(data['cells'][0]['open'], 1)
+        self.assertEqual(data['open_age_days']['count'], 1)
+        self.assertEqual(data['open_age_days']['p50'], 0)
+        # Resolved within the first hour
+        self.assertEqual(data['resolution_hours']['counts'][0], 1)
+        self.assertEqual(sum(data['resolution_hours']['counts']), 1)
+    
+    def test_bulk_resolutions_counted(self):
+        """Test that issues resolved by queryset updates and bulk inserts get resolved_at"""
+        Issue.objects.filter(pk=self.issues[0].pk).update(status=Issue.StatusType.RESOLVED)
+        Issue.objects.bulk_create([
+            Issue(reported_by=self.citizen_user, title='Imported', description='Bulk import',
+                  status=Issue.StatusType.RESOLVED, location=Point(77.2050, 28.6150))
+        ])
+        self.assertFalse(Issue.objects.filter(status=Issue.StatusType.RESOLVED, resolved_at=None).exists())
+        
+        self.client.force_authenticate(user=self.municipal_user)
+        response = self.client.get(self.stats_url)
+        self.assertEqual(sum(response.data['resolution_hours']['counts']), 2)
+        
+        # Reopening clears it again
+        Issue.objects.filter(pk=self.issues[0].pk).update(status=Issue.StatusType.PENDING)
+        self.assertIsNone(Issue.objects.get(pk=self.issues[0].pk).resolved_at)
+    
+    def test_histogram_percentiles(self):
+        """Test that percentiles take the nearest rank, rounding the rank up"""
+        histogram = {1: 1, 2: 1, 3: 1, 4: 1, 5: 1}
+        self.assertEqual(histogram_percentiles(histogram, (50, 90)), {'p50': 3, 'p90': 5})
+        self.assertEqual(histogram_percentiles({0: 2, 7: 3}, (50,)), {'p50': 7})
+        self.assertEqual(histogram_percentiles({}, (50,)), {'p50': None})
+    
+    def test_stats_require_municipal_user(self):
+        """Test that citizens cannot read the dashboard statistics"""
+        self.client.force_authenticate(user=self.citizen_user)
+        response = self.client.get(self.stats_url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class StatusHistoryAPITest(APITestCase):
+    """Test case for issue status timelines and resolution times"""
+    
+    def setUp(self):
+        self.citizen_user = User.objects.create_user(
+            username='testcitizen',
+            email='citizen@example.com',
+            password='test1234',
+            type=User.UserType.CITIZEN
+        )
+        self.another_citizen = User.objects.create_user(
+            username='anothercitizen',
+            email='another@example.com',
+            password='test1234',
+            type=User.UserType.CITIZEN
+        )
+        self.municipal_user = User.objects.create_user(
+            username='testmunicipal',
+            email='municipal@example.com',
+            password='test1234',
+            type=User.UserType.MUNICIPAL
+        )
+        self.issue = Issue.objects.create(
+            reported_by=self.citizen_user,
+            title='Broken streetlight',
+            description='Dark corner at night',
+            type=Issue.IssueType.SERVICES,
+            location=Point(77.2090, 28.6139)
+        )
+        
+        self.client.force_authenticate(user=self.municipal_user)
+        url = reverse('issue-detail', kwargs={'pk': self.issue.pk})
+        for change in ({'status': 'ACCEPTED'}, {'priority': 'NA'}, {'status': 'RESOLVED', 'priority': 'HIGH'}):
+            response = self.client.patch(url, change, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+    
+    def test_timeline(self):
+        """Test that each effective change is recorded, oldest first"""
+        self.client.force_authenticate(user=self.citizen_user)
+        response = self.client.get(reverse('issue-timeline', kwargs={'pk': self.issue.pk}))
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        events = response.data['events']
+        # Setting the priority to its current value is not a change
+        self.assertEqual([(e['from_status'], e['to_status']) for e in events],
+                         [('PENDING', 'ACCEPTED'), ('ACCEPTED', 'RESOLVED')])
+        self.assertEqual(events[1]['to_priority'], 'HIGH')
+        self.assertEqual(events[1]['changed_by_username'], 'testmunicipal')
+        
+        self.client.force_authenticate(user=self.another_citizen)
+        response = self.client.get(reverse('issue-timeline', kwargs={'pk': self.issue.pk}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+    
+    def test_resolution_times(self):
+        """Test the grouped time-to-resolution report"""
+        response = self.client.get(reverse('issue-resolution-times'), {'period': 'day', 'group_by': 'type'})
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        [row] = response.data['results']
+        self.assertEqual(row['type'], Issue.IssueType.SERVICES)
+        self.assertEqual(row['count'], 1)
+        self.assertLess(row['p50_hours'], 1)
+        
+        self.client.force_authenticate(user=self.citizen_user)
+        response = self.client.get(reverse('issue-resolution-times'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,136 @@
+import json
+from asgiref.sync import sync_to_async
+from django.test import AsyncClient, TestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import Point
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from issues.models import Issue
+
+User = get_user_model()
+
+class AsyncReadPathTest(TestCase):
+    """Test case for the async reads served under ASGI"""
+    
+    def setUp(self):
+        self.citizen_user = User.objects.create_user(
+            username='testcitizen',
+            email='citizen@example.com',
+            password='test1234',
+            type=User.UserType.CITIZEN
+        )
+        self.another_citizen = User.objects.create_user(
+            username='anothercitizen',
+            email='another@example.com',
+            password='test1234',
+            type=User.UserType.CITIZEN
+        )
+        self.municipal_user = User.objects.create_user(
+            username='testmunicipal',
+            email='municipal@example.com',
+            password='test1234',
+            type=User.UserType.MUNICIPAL
+        )
+        for i in range(12):
+            self.issue = Issue.objects.create(
+                reported_by=self.citizen_user,
+                title=f'Pothole {i}',
+                description='Deep pothole on the main road',
+                type=Issue.IssueType.INFRASTRUCTURE if i % 2 else Issue.IssueType.OTHER,
+                location=Point(77.2090 + i * 0.0001, 28.6139)
+            )
+        self.other_issue = Issue.objects.create(
+            reported_by=self.another_citizen,
+            title='Broken streetlight',
+            description='Dark corner at night',
+            type=Issue.IssueType.SERVICES,
+            location=Point(77.2090, 28.6139)
+        )
+    
+    def auth_headers(self, user):
+        return {'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+    
+    def sync_get(self, user, url):
+        """The same request through the DRF views"""
+        client = APIClient()
+        client.force_authenticate(user=user)
+        return client.get(url)
+    
+    async def test_list_matches_sync_path(self):
+        """Test that the async list returns what the DRF view returns"""
+        url = reverse('issue-list') + '?type=INFRASTRUCTURE'
+        response = await AsyncClient().get(url, headers=self.auth_headers(self.citizen_user))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual(len(data['results']), 6)
+        self.assertTrue(all(issue['type'] == 'INFRASTRUCTURE' for issue in data['results']))
+        
+        expected = await sync_to_async(self.sync_get)(self.citizen_user, url)
+        self.assertEqual(data, expected.json())
+    
+    async def test_list_paginates(self):
+        """Test that the async list follows the keyset cursor"""
+        client = AsyncClient()
+        headers = self.auth_headers(self.citizen_user)
+        first = (await client.get(reverse('issue-list'), headers=headers)).json()
+        self.assertEqual(len(first['results']), 10)
+        second = (await client.get(first['next'], headers=headers)).json()
+        self.assertEqual(len(second['results']), 2)
+        self.assertIsNone(second['next'])
+    
+    async def test_retrieve(self):
+        """Test that citizens retrieve their own issues only"""
+        client = AsyncClient()
+        headers = self.auth_headers(self.citizen_user)
+        response = await client.get(reverse('issue-detail', kwargs={'pk': self.issue.pk}), headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['id'], self.issue.pk)
+        self.assertEqual(response.json()['reported_by_username'], 'testcitizen')
+        
+        response = await client.get(reverse('issue-detail', kwargs={'pk': self.other_issue.pk}), headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+    
+    async def test_requires_authentication(self):
+        """Test that the async views reject missing and invalid tokens"""
+        client = AsyncClient()
+        response = await client.get(reverse('issue-list'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn('WWW-Authenticate', response)
+        
+        response = await client.get(reverse('user-me'), headers={'Authorization': 'Bearer invalid'})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+    
+    async def test_nearby(self):
+        """Test that the async nearby search returns the closest issues first"""
+        response = await AsyncClient().post(
+            reverse('issue-nearby'),
+            json.dumps({'latitude': 28.6139, 'longitude': 77.2090, 'distance': 1000, 'limit': 3}),
+            content_type='application/json',
+            headers=self.auth_headers(self.municipal_user)
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        titles = [issue['title'] for issue in response.json()['results']]
+        self.assertEqual(len(titles), 3)
+        self.assertIn('Pothole 0', titles[:2])
+        self.assertIn('Broken streetlight', titles[:2])
+    
+    async def test_nearby_validates_input(self):
+        """Test that invalid nearby searches are rejected"""
+        response = await AsyncClient().post(
+            reverse('issue-nearby'),
+            json.dumps({'latitude': 28.6139}),
+            content_type='application/json',
+            headers=self.auth_headers(self.citizen_user)
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('longitude', response.json())
+    
+    async def test_me(self):
+        """Test that users/me returns the authenticated user"""
+        response = await AsyncClient().get(reverse('user-me'), headers=self.auth_headers(self.municipal_user))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['username'], 'testmunicipal')
+        self.assertEqual(response.json()['type'], User.UserType.MUNICIPAL)
+
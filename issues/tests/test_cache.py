@@ -0,0 +1,117 @@
+from django.conf import settings
+from django.urls import reverse
+from django.core.cache import caches
+from django.test import override_settings
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from issues.cache import etag_matches
+from issues.models import Issue, IssueImage
+from django.contrib.gis.geos import Point
+
+User = get_user_model()
+
+@override_settings(CACHES={
+    **settings.CACHES,
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'issues': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'issues-test'},
+})
+class IssueResponseCacheTest(APITestCase):
+    """Test case for the issue response cache"""
+    
+    def setUp(self):
+        caches['issues'].clear()
+        
+        self.citizen_user = User.objects.create_user(
+            username='testcitizen',
+            email='citizen@example.com',
+            password='test1234',
+            type=User.UserType.CITIZEN
+        )
+        
+        self.municipal_user = User.objects.create_user(
+            username='testmunicipal',
+            email='municipal@example.com',
+            password='test1234',
+            type=User.UserType.MUNICIPAL
+        )
+        
+        self.issue = Issue.objects.create(
+            reported_by=self.citizen_user,
+            title='Cached Issue',
+            description='Response cache test issue',
+            location=Point(78.9629, 20.5937)
+        )
+        
+        self.issues_list_url = reverse('issue-list')
+        self.issue_url = reverse('issue-detail', kwargs={'pk': self.issue.pk})
+    
+    def test_cache_hit_and_conditional_get(self):
+        """Test that repeated reads hit the cache and If-None-Match returns 304"""
+        self.client.force_authenticate(user=self.citizen_user)
+        
+        response = self.client.get(self.issue_url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        etag = response['ETag']
+        
+        with self.assertNumQueries(0):
+            response = self.client.get(self.issue_url)
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response.data['title'], 'Cached Issue')
+        
+        response = self.client.get(self.issue_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+    
+    def test_etag_matching(self):
+        """Test that If-None-Match is parsed into ETags and compared exactly"""
+        self.assertTrue(etag_matches('"abc"', '"xyz", W/"abc"'))
+        self.assertTrue(etag_matches('"abc"', '*'))
+        self.assertFalse(etag_matches('"abc"', '"abcd"'))
+        self.assertFalse(etag_matches('"abc"', 'abc'))
+        self.assertFalse(etag_matches('"abc"', ''))
+    
+    @override_settings(ALLOWED_HOSTS=['testserver', 'other.example'])
+    def test_cache_keyed_by_host(self):
+        """Test that responses cached via one host aren't replayed to another"""
+        self.client.force_authenticate(user=self.citizen_user)
+        response = self.client.get(self.issues_list_url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        
+        response = self.client.get(self.issues_list_url, HTTP_HOST='other.example')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get(self.issues_list_url)['X-Cache'], 'HIT')
+    
+    def test_writes_invalidate_citizen_and_municipal_scopes(self):
+        """Test that issue and image writes invalidate the affected namespaces"""
+        for user in (self.citizen_user, self.municipal_user):
+            self.client.force_authenticate(user=user)
+            self.client.get(self.issues_list_url)
+        
+        self.issue.title = 'Updated Issue'
+        self.issue.save()
+        
+        for user in (self.citizen_user, self.municipal_user):
+            self.client.force_authenticate(user=user)
+            response = self.client.get(self.issues_list_url)
+            self.assertEqual(response['X-Cache'], 'MISS')
+            self.assertEqual(response.data['results'][0]['title'], 'Updated Issue')
+        
+        IssueImage.objects.create(issue=self.issue, image='issue_images/test.gif')
+        response = self.client.get(self.issues_list_url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(len(response.data['results'][0]['images']), 1)
+    
+    def test_cache_stats(self):
+        """Test that hit/miss counters are exposed to municipal users only"""
+        self.client.force_authenticate(user=self.citizen_user)
+        self.client.get(self.issue_url)
+        self.client.get(self.issue_url)
+        
+        response = self.client.get(reverse('issue-cache-stats'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        
+        self.client.force_authenticate(user=self.municipal_user)
+        response = self.client.get(reverse('issue-cache-stats'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['hits'], 1)
+        self.assertEqual(response.data['misses'], 1)
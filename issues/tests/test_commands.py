@@ -0,0 +1,191 @@
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import Point
+from issues.models import ImageBlob, ImageUpload, Issue, IssueCountRollup, IssueImage, IssueStatusEvent
+from issues.stats import issue_stats
+from issues.uploads import create_part_file
+
+User = get_user_model()
+
+class ImportIssuesCommandTest(TestCase):
+    """Test cases for the import_issues management command"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='importer',
+            email='importer@example.com',
+            password='test1234',
+            type=User.UserType.MUNICIPAL
+        )
+    
+    def import_file(self, suffix, content, **options):
+        with tempfile.NamedTemporaryFile('w', suffix=suffix, delete=False) as handle:
+            handle.write(content)
+        self.addCleanup(os.remove, handle.name)
+        stdout, stderr = StringIO(), StringIO()
+        call_command('import_issues', handle.name, reporter='importer',
+                     stdout=stdout, stderr=stderr, **options)
+        return stdout.getvalue(), stderr.getvalue()
+    
+    def test_import_csv(self):
+        """Test importing CSV rows with per-row errors"""
+        stdout, stderr = self.import_file('.csv', (
+            'title,description,type,latitude,longitude\n'
+            'Pothole,Deep pothole,INFRASTRUCTURE,28.61,77.20\n'
+            'Bad row,No latitude,OTHER,,77.20\n'
+            'Leak,Water leak,,28.62,77.21\n'
+        ), batch_size=1)
+        
+        self.assertIn('Imported 2 issues, 1 rows rejected.', stdout)
+        self.assertIn('Row 2:', stderr)
+        self.assertEqual(Issue.objects.get(title='Leak').type, Issue.IssueType.OTHER)
+    
+    def test_import_geojson(self):
+        """Test importing a GeoJSON FeatureCollection"""
+        stdout, _ = self.import_file('.geojson', '''{
+            "type": "FeatureCollection",
+            "features": [
+                {"type": "Feature",
+                 "geometry": {"type": "Point", "coordinates": [77.2090, 28.6139]},
+                 "properties": {"title": "Encroached footpath", "description": "Stalls",
+                                "type": "ENCROACHMENT"}}
+            ]
+        }''')
+        
+        self.assertIn('Imported 1 issues', stdout)
+        issue = Issue.objects.get()
+        self.assertEqual(issue.reported_by, self.user)
+        self.assertAlmostEqual(issue.location.x, 77.2090)
+
+
+class GarbageCollectUploadsCommandTest(TestCase):
+    """Test cases for the gc_uploads management command"""
+    
+    def test_abandoned_uploads_are_deleted(self):
+        """Test that stale uploads and their part files are removed"""
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        
+        user = User.objects.create_user(username='uploader', password='test1234')
+        issue = Issue.objects.create(
+            reported_by=user,
+            title='Upload Issue',
+            description='Issue with abandoned uploads',
+            location=Point(78.9629, 20.5937)
+        )
+        
+        with override_settings(IMAGE_UPLOAD_TEMP_DIR=temp_dir):
+            stale, fresh = [
+                ImageUpload.objects.create(
+                    issue=issue, uploaded_by=user, filename='photo.jpg', size=10, sha256='0' * 64
+                )
+                for _ in range(2)
+            ]
+            for upload in (stale, fresh):
+                create_part_file(upload)
+            ImageUpload.objects.filter(pk=stale.pk).update(
+                updated_at=timezone.now() - timedelta(days=2)
+            )
+            
+            stdout = StringIO()
+            call_command('gc_uploads', stdout=stdout)
+            
+            self.assertIn('Deleted 1 abandoned uploads', stdout.getvalue())
+            self.assertEqual(list(ImageUpload.objects.all()), [fresh])
+            self.assertFalse(os.path.exists(stale.part_path))
+            self.assertTrue(os.path.exists(fresh.part_path))
+
+
+class DedupeImagesCommandTest(TestCase):
+    """Test cases for the dedupe_images management command"""
+    
+    def test_legacy_images_are_deduplicated(self):
+        """Test that copies of the same file collapse into one blob"""
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        
+        user = User.objects.create_user(username='reporter', password='test1234')
+        issue = Issue.objects.create(
+            reported_by=user,
+            title='Photo Issue',
+            description='Issue with re-uploaded photos',
+            location=Point(78.9629, 20.5937)
+        )
+        
+        with override_settings(MEDIA_ROOT=media_root):
+            os.makedirs(os.path.join(media_root, 'issue_images', '2025', '04'))
+            names = [f'issue_images/2025/04/photo_{n}.jpg' for n in range(2)]
+            for name in names:
+                with open(os.path.join(media_root, name), 'wb') as legacy:
+                    legacy.write(b'same bytes')
+            # Stored names as-is: the files are already on disk
+            IssueImage.objects.bulk_create(IssueImage(issue=issue, image=name) for name in names)
+            
+            stdout = StringIO()
+            call_command('dedupe_images', stdout=stdout)
+            
+            self.assertIn('Migrated 2 files, 1 duplicates', stdout.getvalue())
+            blob = ImageBlob.objects.get()
+            self.assertEqual(blob.refcount, 2)
+            self.assertEqual(set(IssueImage.objects.values_list('image', flat=True)), {blob.name})
+            self.assertTrue(os.path.exists(os.path.join(media_root, blob.name)))
+            for name in names:
+                self.assertFalse(os.path.exists(os.path.join(media_root, name)))
+
+
+class RebuildIssueStatsCommandTest(TestCase):
+    """Test cases for the rebuild_issue_stats management command"""
+    
+    def test_rebuild_matches_incremental_rollups(self):
+        """Test that a full rebuild gives the counts the triggers maintained"""
+        user = User.objects.create_user(username='reporter', password='test1234')
+        issues = [
+            Issue.objects.create(
+                reported_by=user,
+                title=f'Issue {i}',
+                description='Issue for the rollups',
+                location=Point(77.2090 + i * 0.05, 28.6139)
+            )
+            for i in range(3)
+        ]
+        issues[0].status = Issue.StatusType.RESOLVED
+        issues[0].save()
+        incremental = issue_stats()
+        
+        IssueCountRollup.objects.all().delete()
+        call_command('rebuild_issue_stats', stdout=StringIO())
+        
+        self.assertEqual(issue_stats(), incremental)
+        self.assertEqual(issue_stats()['total'], 3)
+
+
+class BackfillStatusEventsCommandTest(TestCase):
+    """Test cases for the backfill_status_events management command"""
+    
+    def test_backfill_is_idempotent(self):
+        """Test that issues past PENDING get one event, once"""
+        user = User.objects.create_user(username='reporter', password='test1234')
+        for issue_status in (Issue.StatusType.PENDING, Issue.StatusType.IN_PROGRESS, Issue.StatusType.RESOLVED):
+            Issue.objects.create(
+                reported_by=user,
+                title=f'{issue_status} issue',
+                description='Issue from before status events',
+                status=issue_status,
+                location=Point(77.2090, 28.6139)
+            )
+        
+        for expected in ('Backfilled 2 status events.', 'Backfilled 0 status events.'):
+            stdout = StringIO()
+            call_command('backfill_status_events', stdout=stdout)
+            self.assertIn(expected, stdout.getvalue())
+        
+        event = IssueStatusEvent.objects.get(to_status=Issue.StatusType.RESOLVED)
+        self.assertEqual(event.from_status, Issue.StatusType.PENDING)
+        self.assertEqual(event.created_at, event.issue.resolved_at)
@@ -0,0 +1,94 @@
+import re
+from itertools import combinations
+from django.urls import reverse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from issues.models import Issue
+from issues.views import IssueViewSet
+from issues.management.commands._bench import seed_issues
+
+User = get_user_model()
+
+INDEX_SCAN = re.compile(r'(Index Scan|Index Only Scan|Bitmap Heap Scan)( Backward)?( using \w+)? on issues_issue\b')
+
+class IssueIndexUsageTest(APITestCase):
+    """
+    EXPLAIN-based checks that every list/filter combination exposed by
+    IssueViewSet is answered from an index on a large dataset.
+    """
+    
+    # One representative value per filterset field
+    filter_values = {
+        'type': Issue.IssueType.INFRASTRUCTURE,
+        'status': Issue.StatusType.PENDING,
+        'priority': Issue.PriorityType.HIGH,
+    }
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.citizens = [
+            User.objects.create_user(
+                username=f'citizen{i}',
+                email=f'citizen{i}@example.com',
+                password='test1234',
+                type=User.UserType.CITIZEN
+            )
+            for i in range(50)
+        ]
+        cls.municipal_user = User.objects.create_user(
+            username='testmunicipal',
+            email='municipal@example.com',
+            password='test1234',
+            type=User.UserType.MUNICIPAL
+        )
+        seed_issues(20000, reporters=cls.citizens)
+    
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN ' + sql)
+            return '\n'.join(row[0] for row in cursor.fetchall())
+    
+    def list_plans(self, user, params):
+        """EXPLAIN the page query the list endpoint runs for `params`"""
+        self.client.force_authenticate(user=user)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('issue-list'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [
+            self.explain(query['sql'])
+            for query in context.captured_queries
+            if 'FROM "issues_issue"' in query['sql'] and 'ORDER BY' in query['sql']
+        ]
+    
+    def assertUsesIndex(self, plan):
+        self.assertNotIn('Seq Scan on issues_issue', plan)
+        self.assertRegex(plan, INDEX_SCAN)
+    
+    def test_list_filter_combinations_use_indexes(self):
+        """Test that list queries for all filter combinations use an index scan"""
+        fields = IssueViewSet.filterset_fields
+        for user in (self.citizens[0], self.municipal_user):
+            for size in range(len(fields) + 1):
+                for combination in combinations(fields, size):
+                    params = {field: self.filter_values[field] for field in combination}
+                    with self.subTest(user=user.username, filters=params):
+                        plans = self.list_plans(user, params)
+                        self.assertTrue(plans)
+                        for plan in plans:
+                            self.assertUsesIndex(plan)
+    
+    def test_open_issue_queries_use_partial_indexes(self):
+        """Test that recent open issue queries use the partial indexes"""
+        # Which index serves a small table is up to the planner; take the
+        # sequential scan out of the running so only the choice of index is tested
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE issues_issue')
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        open_issues = Issue.objects.exclude(status=Issue.StatusType.RESOLVED)
+        for queryset in (open_issues, open_issues.filter(type=Issue.IssueType.SERVICES)):
+            plan = queryset.order_by('-created_at')[:10].explain()
+            self.assertUsesIndex(plan)
+            self.assertIn('issue_open_', plan)
@@ -0,0 +1,81 @@
+import json
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import Point
+from issues.models import Issue
+
+User = get_user_model()
+
+class RequestMetricsTest(APITestCase):
+    """Test case for the per-request metrics"""
+    
+    def setUp(self):
+        self.citizen_user = User.objects.create_user(
+            username='testcitizen',
+            email='citizen@example.com',
+            password='test1234',
+            type=User.UserType.CITIZEN
+        )
+        for i in range(3):
+            Issue.objects.create(
+                reported_by=self.citizen_user,
+                title=f'Pothole {i}',
+                description='Deep pothole on the main road',
+                type=Issue.IssueType.INFRASTRUCTURE,
+                location=Point(77.2090, 28.6139)
+            )
+        self.client.force_authenticate(user=self.citizen_user)
+    
+    def timings(self, response):
+        return {
+            entry.split(';')[0].strip(): entry
+            for entry in response['Server-Timing'].split(',')
+        }
+    
+    def test_server_timing(self):
+        """Test that responses report their SQL, serializer and total time"""
+        response = self.client.get(reverse('issue-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        timings = self.timings(response)
+        self.assertEqual(set(timings), {'db', 'serialize', 'total'})
+        self.assertRegex(timings['db'], r'db;dur=[\d.]+;desc="[1-9]\d* queries"')
+    
+    def test_log_line(self):
+        """Test that each request is logged as one JSON line"""
+        with self.assertLogs('nagarkranti.metrics', 'INFO') as logs:
+            response = self.client.get(reverse('issue-list'))
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['view'], 'issue-list')
+        self.assertEqual(record['status'], 200)
+        self.assertGreater(record['db_queries'], 0)
+        self.assertEqual(record['response_bytes'], len(response.content))
+        self.assertIn('serialize_ms', record)
+    
+    @override_settings(METRICS_TOKEN='scrape-secret')
+    def test_metrics_endpoint(self):
+        """Test that /metrics exposes per-view histograms to the scraper"""
+        self.client.get(reverse('issue-list'))
+        
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer scrape-secret')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        self.assertIn('# TYPE nagarkranti_request_duration_seconds histogram', body)
+        self.assertRegex(body, r'nagarkranti_request_duration_seconds_bucket\{view="issue-list",method="GET",pid="\d+",le="\+Inf"\} [1-9]')
+        self.assertRegex(body, r'nagarkranti_db_queries_total\{view="issue-list",method="GET",pid="\d+"\} [1-9]')
+        self.assertNotIn('view="metrics"', body)
+    
+    @override_settings(METRICS_TOKEN='scrape-secret')
+    def test_metrics_requires_token(self):
+        """Test that /metrics rejects requests without the token"""
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer wrong')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+    
+    def test_metrics_disabled_without_token(self):
+        """Test that /metrics isn't served unless a token is configured"""
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer ')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
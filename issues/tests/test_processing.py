@@ -0,0 +1,73 @@
+import shutil
+import tempfile
+from io import BytesIO
+from PIL import Image
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import Point
+from django.core.files.uploadedfile import SimpleUploadedFile
+from issues.models import Issue, IssueImage
+from issues.serializers import IssueListSerializer, IssueSerializer
+
+User = get_user_model()
+
+class IssueImageProcessingTest(TestCase):
+    """Test cases for issue image renditions"""
+    
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root, IMAGE_PROCESSING_BACKEND='sync')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='test1234',
+            type=User.UserType.CITIZEN
+        )
+        self.issue = Issue.objects.create(
+            reported_by=self.user,
+            title='Test Issue',
+            description='Issue with a phone photo',
+            location=Point(78.9629, 20.5937)
+        )
+    
+    def phone_photo(self):
+        """A landscape JPEG with GPS-like EXIF and a rotate-90 orientation tag"""
+        photo = Image.new('RGB', (2000, 1000), 'gray')
+        exif = photo.getexif()
+        exif[0x0112] = 6  # Orientation: rotate 90 CW
+        exif[0x010f] = 'PhoneMaker'
+        buffer = BytesIO()
+        photo.save(buffer, format='JPEG', exif=exif)
+        return SimpleUploadedFile('pothole.jpg', buffer.getvalue(), content_type='image/jpeg')
+    
+    def test_renditions_are_generated(self):
+        """Test that uploads get oriented WebP renditions and lose their EXIF"""
+        image = IssueImage.objects.create(issue=self.issue, image=self.phone_photo())
+        image.refresh_from_db()
+        
+        self.assertIsNotNone(image.processed_at)
+        with Image.open(image.image.path) as original:
+            self.assertEqual(original.size, (1000, 2000))
+            self.assertFalse(original.getexif())
+        with Image.open(image.thumbnail.path) as thumbnail:
+            self.assertEqual(thumbnail.format, 'WEBP')
+            self.assertEqual(thumbnail.size, (160, 320))
+        with Image.open(image.medium.path) as medium:
+            self.assertEqual(medium.size, (640, 1280))
+    
+    def test_list_serializer_uses_thumbnails(self):
+        """Test that list responses carry thumbnails and detail the full image"""
+        image = IssueImage.objects.create(issue=self.issue, image=self.phone_photo())
+        image.refresh_from_db()
+        
+        list_data = IssueListSerializer(self.issue).data['images'][0]
+        self.assertEqual(list_data['thumbnail'], image.thumbnail.url)
+        self.assertNotIn('image', list_data)
+        
+        detail_data = IssueSerializer(self.issue).data['images'][0]
+        self.assertEqual(detail_data['image'], image.image.url)
+        self.assertEqual(detail_data['medium'], image.medium.url)
@@ -0,0 +1,92 @@
+from django.urls import reverse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from issues.models import Issue, IssueImage
+from django.contrib.gis.geos import Point
+
+User = get_user_model()
+
+class IssueQueryCountTest(APITestCase):
+    """Query-count regression tests for issue read endpoints"""
+    
+    def setUp(self):
+        self.citizen_user = User.objects.create_user(
+            username='testcitizen',
+            email='citizen@example.com',
+            password='test1234',
+            type=User.UserType.CITIZEN
+        )
+        
+        self.municipal_user = User.objects.create_user(
+            username='testmunicipal',
+            email='municipal@example.com',
+            password='test1234',
+            type=User.UserType.MUNICIPAL
+        )
+        
+        self.issues_list_url = reverse('issue-list')
+        self.nearby_url = reverse('issue-nearby')
+        self.nearby_data = {'latitude': 20.5937, 'longitude': 78.9629, 'distance': 5000}
+    
+    def create_issues(self, count, images_per_issue=2):
+        """Create issues near the nearby_data point, each with a few images"""
+        issues = []
+        for i in range(count):
+            issue = Issue.objects.create(
+                reported_by=self.citizen_user,
+                title=f'Issue {i}',
+                description='Query count test issue',
+                type=Issue.IssueType.INFRASTRUCTURE,
+                location=Point(78.9629 + i * 0.0001, 20.5937)
+            )
+            for j in range(images_per_issue):
+                # Only the stored name is needed for serialization
+                IssueImage.objects.create(issue=issue, image=f'issue_images/test_{i}_{j}.gif')
+            issues.append(issue)
+        return issues
+    
+    def count_queries(self, method, url, data=None):
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(self.client, method)(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(context.captured_queries)
+    
+    def test_list_query_count_is_constant(self):
+        """Test that listing issues does not issue a query per row or image"""
+        for user in (self.citizen_user, self.municipal_user):
+            self.client.force_authenticate(user=user)
+            
+            self.create_issues(1, images_per_issue=1)
+            baseline = self.count_queries('get', self.issues_list_url)
+            
+            self.create_issues(9, images_per_issue=3)
+            self.assertEqual(self.count_queries('get', self.issues_list_url), baseline)
+            
+            # page + images prefetch; cursor pagination runs no COUNT(*)
+            self.assertEqual(baseline, 2)
+            Issue.objects.all().delete()
+    
+    def test_retrieve_query_count_is_constant(self):
+        """Test that retrieving an issue loads its reporter and images up front"""
+        self.client.force_authenticate(user=self.citizen_user)
+        issue = self.create_issues(1, images_per_issue=1)[0]
+        detail_url = reverse('issue-detail', kwargs={'pk': issue.pk})
+        baseline = self.count_queries('get', detail_url)
+        
+        for j in range(5):
+            IssueImage.objects.create(issue=issue, image=f'issue_images/extra_{j}.gif')
+        self.assertEqual(self.count_queries('get', detail_url), baseline)
+        self.assertEqual(baseline, 2)
+    
+    def test_nearby_query_count_is_constant(self):
+        """Test that nearby does not issue a query per matching issue"""
+        self.client.force_authenticate(user=self.municipal_user)
+        
+        self.create_issues(1, images_per_issue=1)
+        baseline = self.count_queries('post', self.nearby_url, self.nearby_data)
+        
+        self.create_issues(20, images_per_issue=3)
+        self.assertEqual(self.count_queries('post', self.nearby_url, self.nearby_data), baseline)
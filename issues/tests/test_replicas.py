@@ -0,0 +1,126 @@
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import Point
+from issues.models import Issue
+
+User = get_user_model()
+
+# 'replica' is a separate test database, so rows written to it alone show
+# which database a read was routed to
+@override_settings(DATABASE_REPLICAS=['replica'], REPLICA_STICKY_CACHE_ALIAS='default')
+class ReplicaRoutingTest(APITestCase):
+    """Test case for routing reads to read replicas"""
+    databases = {'default', 'replica'}
+    
+    def setUp(self):
+        cache.clear()
+        # Create on the primary last so the test keeps its instances
+        for database in ('replica', 'default'):
+            self.citizen_user = User.objects.db_manager(database).create_user(
+                id=1001,
+                username='testcitizen',
+                email='citizen@example.com',
+                password='test1234',
+                type=User.UserType.CITIZEN
+            )
+            self.municipal_user = User.objects.db_manager(database).create_user(
+                id=1002,
+                username='testmunicipal',
+                email='municipal@example.com',
+                password='test1234',
+                type=User.UserType.MUNICIPAL
+            )
+            Issue.objects.using(database).create(
+                reported_by=self.citizen_user,
+                title=f'Pothole seen on {database}',
+                description='Deep pothole on the main road',
+                type=Issue.IssueType.INFRASTRUCTURE,
+                location=Point(77.2090, 28.6139)
+            )
+    
+    def list_titles(self):
+        response = self.client.get(reverse('issue-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [issue['title'] for issue in response.data['results']]
+    
+    def test_reads_use_replica(self):
+        """Test that safe-method requests read from the replica"""
+        self.client.force_authenticate(user=self.citizen_user)
+        self.assertEqual(self.list_titles(), ['Pothole seen on replica'])
+        
+        response = self.client.post(
+            reverse('issue-nearby'),
+            {'latitude': 28.6139, 'longitude': 77.2090, 'distance': 100},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([issue['title'] for issue in response.data['results']], ['Pothole seen on replica'])
+    
+    def test_user_reads_use_replica(self):
+        """Test that user listings read from the replica"""
+        User.objects.db_manager('replica').create_user(
+            username='replicaonly',
+            email='replica@example.com',
+            password='test1234',
+            type=User.UserType.CITIZEN
+        )
+        self.client.force_authenticate(user=self.municipal_user)
+        response = self.client.get(reverse('user-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('replicaonly', [user['username'] for user in response.data['results']])
+    
+    def test_writes_use_primary_and_stick(self):
+        """Test that writes go to the primary and the writer reads from it afterwards"""
+        self.client.force_authenticate(user=self.citizen_user)
+        response = self.client.post(reverse('issue-list'), {
+            'title': 'Broken streetlight',
+            'description': 'Dark corner at night',
+            'type': 'SERVICES',
+            'location': {'coordinates': [77.3, 28.7]},
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(Issue.objects.using('default').filter(title='Broken streetlight').exists())
+        self.assertFalse(Issue.objects.using('replica').filter(title='Broken streetlight').exists())
+        
+        self.assertEqual(self.list_titles(), ['Broken streetlight', 'Pothole seen on default'])
+        
+        # Other users aren't affected by the citizen's write
+        self.client.force_authenticate(user=self.municipal_user)
+        self.assertEqual(self.list_titles(), ['Pothole seen on replica'])
+    
+    @override_settings(REPLICA_STICKY_SECONDS=0)
+    def test_sticky_window_expires(self):
+        """Test that reads return to the replica once the sticky window has passed"""
+        issue = Issue.objects.get(title='Pothole seen on default')
+        self.client.force_authenticate(user=self.municipal_user)
+        response = self.client.patch(
+            reverse('issue-detail', kwargs={'pk': issue.pk}), {'status': 'ACCEPTED'}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.list_titles(), ['Pothole seen on replica'])
+    
+    @override_settings(ISSUE_CACHE_ALIAS='default', REPLICA_STICKY_SECONDS=0)
+    def test_replica_reads_cached_for_sticky_window(self):
+        """Test that responses read from a replica are cached no longer than the sticky window"""
+        self.client.force_authenticate(user=self.municipal_user)
+        for _ in range(2):
+            response = self.client.get(reverse('issue-list'))
+            self.assertEqual(response['X-Cache'], 'MISS')
+            self.assertEqual([issue['title'] for issue in response.data['results']], ['Pothole seen on replica'])
+    
+    @override_settings(ISSUE_CACHE_ALIAS='default', DATABASE_REPLICAS=[])
+    def test_primary_reads_cached(self):
+        """Test that responses read from the primary are cached as usual"""
+        self.client.force_authenticate(user=self.municipal_user)
+        self.assertEqual(self.client.get(reverse('issue-list'))['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get(reverse('issue-list'))['X-Cache'], 'HIT')
+    
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas(self):
+        """Test that everything uses the primary without replicas"""
+        self.client.force_authenticate(user=self.citizen_user)
+        self.assertEqual(self.list_titles(), ['Pothole seen on default'])
@@ -0,0 +1,73 @@
+import os
+import shutil
+import tempfile
+from io import BytesIO
+from PIL import Image
+from django.urls import reverse
+from django.test import override_settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import Point
+from issues.models import ImageBlob, Issue, IssueImage
+
+User = get_user_model()
+
+class DeduplicatedImageStorageTest(APITestCase):
+    """Test cases for content-addressed storage of issue images"""
+    
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        
+        self.citizen_user = User.objects.create_user(
+            username='testcitizen',
+            email='citizen@example.com',
+            password='test1234',
+            type=User.UserType.CITIZEN
+        )
+        self.issues = [
+            Issue.objects.create(
+                reported_by=self.citizen_user,
+                title=f'Issue {n}',
+                description='Issue sharing a photo',
+                location=Point(78.9629, 20.5937)
+            )
+            for n in range(2)
+        ]
+        
+        buffer = BytesIO()
+        Image.new('RGB', (32, 32), 'gray').save(buffer, format='PNG')
+        self.photo = buffer.getvalue()
+        self.client.force_authenticate(user=self.citizen_user)
+    
+    def attach_photo(self, issue):
+        return IssueImage.objects.create(
+            issue=issue, image=SimpleUploadedFile('pothole.png', self.photo, content_type='image/png')
+        )
+    
+    def test_identical_uploads_share_a_blob(self):
+        """Test that the same photo is stored once and removed with its last reference"""
+        first, second = [self.attach_photo(issue) for issue in self.issues]
+        
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertTrue(first.image.name.startswith('issue_images/blobs/'))
+        blob = ImageBlob.objects.get()
+        self.assertEqual(blob.refcount, 2)
+        self.assertEqual(blob.size, len(self.photo))
+        path = first.image.path
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(reverse('issueimage-detail', kwargs={'pk': first.pk}))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertTrue(os.path.exists(path))
+        self.assertEqual(ImageBlob.objects.get().refcount, 1)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(reverse('issueimage-detail', kwargs={'pk': second.pk}))
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(ImageBlob.objects.exists())
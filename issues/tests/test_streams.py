@@ -0,0 +1,146 @@
+import json
+from datetime import timedelta
+from asgiref.sync import sync_to_async
+from asgiref.testing import ApplicationCommunicator
+from django.test import TransactionTestCase
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import Point
+from rest_framework_simplejwt.tokens import AccessToken
+from issues.models import Issue, IssueStatusEvent
+from issues.streams import EVENTS_PATH, IssueEventStream
+
+User = get_user_model()
+
+# TransactionTestCase: events are published on commit and the stream reads
+# the database from other threads
+class IssueEventStreamTest(TransactionTestCase):
+    """Test case for the issue status event stream"""
+    
+    def setUp(self):
+        self.citizen_user = User.objects.create_user(
+            username='testcitizen',
+            email='citizen@example.com',
+            password='test1234',
+            type=User.UserType.CITIZEN
+        )
+        self.another_citizen = User.objects.create_user(
+            username='anothercitizen',
+            email='another@example.com',
+            password='test1234',
+            type=User.UserType.CITIZEN
+        )
+        self.municipal_user = User.objects.create_user(
+            username='testmunicipal',
+            email='municipal@example.com',
+            password='test1234',
+            type=User.UserType.MUNICIPAL
+        )
+        self.issue = Issue.objects.create(
+            reported_by=self.citizen_user,
+            title='Broken streetlight',
+            description='Dark corner at night',
+            type=Issue.IssueType.SERVICES,
+            location=Point(77.2090, 28.6139)
+        )
+    
+    def change_status(self, to_status):
+        return IssueStatusEvent.objects.create(
+            issue=self.issue,
+            changed_by=self.municipal_user,
+            from_status=self.issue.status,
+            to_status=to_status,
+            from_priority=self.issue.priority,
+            to_priority=self.issue.priority
+        )
+    
+    async def open_stream(self, user=None, last_event_id=None, token=None):
+        headers = []
+        if user is not None:
+            token = token or AccessToken.for_user(user)
+            headers.append((b'authorization', f'Bearer {token}'.encode()))
+        if last_event_id is not None:
+            headers.append((b'last-event-id', str(last_event_id).encode()))
+        communicator = ApplicationCommunicator(IssueEventStream(), {
+            'type': 'http',
+            'method': 'GET',
+            'path': EVENTS_PATH,
+            'query_string': b'',
+            'headers': headers,
+        })
+        await communicator.send_input({'type': 'http.request', 'body': b''})
+        return communicator
+    
+    async def read_events(self, communicator):
+        """Parse the events in the next body message"""
+        message = await communicator.receive_output(timeout=5)
+        events = []
+        for frame in message['body'].decode().split('\n\n'):
+            fields = dict(line.split(': ', 1) for line in frame.splitlines() if line.startswith(('id:', 'data:')))
+            if 'data' in fields:
+                events.append(json.loads(fields['data']))
+        return events
+    
+    async def test_requires_authentication(self):
+        """Test that a stream without a valid token is refused"""
+        communicator = await self.open_stream()
+        start = await communicator.receive_output(timeout=5)
+        self.assertEqual(start['status'], 401)
+    
+    async def test_pushes_status_changes(self):
+        """Test that the reporter and municipal users receive status changes"""
+        streams = [await self.open_stream(self.citizen_user), await self.open_stream(self.municipal_user)]
+        for communicator in streams:
+            start = await communicator.receive_output(timeout=5)
+            self.assertEqual(start['status'], 200)
+            self.assertIn((b'content-type', b'text/event-stream'), start['headers'])
+            self.assertEqual((await communicator.receive_output(timeout=5))['body'], b'retry: 5000\n\n')
+        
+        event = await sync_to_async(self.change_status)(Issue.StatusType.ACCEPTED)
+        
+        for communicator in streams:
+            events = await self.read_events(communicator)
+            self.assertEqual(len(events), 1)
+            self.assertEqual(events[0]['id'], event.id)
+            self.assertEqual(events[0]['issue'], self.issue.id)
+            self.assertEqual(events[0]['to_status'], Issue.StatusType.ACCEPTED)
+            await communicator.send_input({'type': 'http.disconnect'})
+            await communicator.wait(timeout=5)
+    
+    async def test_other_citizens_issues_not_pushed(self):
+        """Test that citizens don't receive changes to others' issues"""
+        communicator = await self.open_stream(self.another_citizen)
+        await communicator.receive_output(timeout=5)
+        await communicator.receive_output(timeout=5)
+        
+        await sync_to_async(self.change_status)(Issue.StatusType.ACCEPTED)
+        
+        self.assertTrue(await communicator.receive_nothing(timeout=0.5))
+        await communicator.send_input({'type': 'http.disconnect'})
+        await communicator.wait(timeout=5)
+    
+    async def test_replays_missed_events(self):
+        """Test that a reconnecting client first receives the events it missed"""
+        seen = await sync_to_async(self.change_status)(Issue.StatusType.ACCEPTED)
+        missed = await sync_to_async(self.change_status)(Issue.StatusType.RESOLVED)
+        
+        communicator = await self.open_stream(self.citizen_user, last_event_id=seen.id)
+        await communicator.receive_output(timeout=5)
+        await communicator.receive_output(timeout=5)
+        events = await self.read_events(communicator)
+        self.assertEqual([event['id'] for event in events], [missed.id])
+        await communicator.send_input({'type': 'http.disconnect'})
+        await communicator.wait(timeout=5)
+    
+    async def test_closes_when_token_expires(self):
+        """Test that the stream ends when its access token expires"""
+        token = AccessToken.for_user(self.citizen_user)
+        token.set_exp(lifetime=timedelta(seconds=1))
+        communicator = await self.open_stream(self.citizen_user, token=token)
+        self.assertEqual((await communicator.receive_output(timeout=5))['status'], 200)
+        await communicator.receive_output(timeout=5)
+        
+        end = await communicator.receive_output(timeout=5)
+        self.assertEqual(end['body'], b'')
+        self.assertFalse(end.get('more_body', False))
+        await communicator.send_input({'type': 'http.disconnect'})
+        await communicator.wait(timeout=5)
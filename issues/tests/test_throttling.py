@@ -0,0 +1,147 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from nagarkranti.admission import query_latency
+from nagarkranti.throttling import take_token
+
+User = get_user_model()
+
+THROTTLED = {
+    **settings.REST_FRAMEWORK,
+    'DEFAULT_THROTTLE_RATES': {
+        'issue_nearby_citizen': '2/min',
+        'issue_nearby_municipal': '10/min',
+        'issue_nearby_ip': '5/min',
+        'register_ip': '1/hour',
+    },
+}
+
+@override_settings(REST_FRAMEWORK=THROTTLED)
+class ThrottlingTest(APITestCase):
+    """Test case for the token bucket rate limits"""
+    
+    def setUp(self):
+        cache.clear()
+        self.citizen_user = User.objects.create_user(
+            username='testcitizen',
+            email='citizen@example.com',
+            password='test1234',
+            type=User.UserType.CITIZEN
+        )
+        self.municipal_user = User.objects.create_user(
+            username='testmunicipal',
+            email='municipal@example.com',
+            password='test1234',
+            type=User.UserType.MUNICIPAL
+        )
+        self.nearby_url = reverse('issue-nearby')
+        self.nearby_data = {'latitude': 20.5937, 'longitude': 78.9629, 'distance': 5000}
+    
+    def nearby(self, user):
+        self.client.force_authenticate(user=user)
+        return self.client.post(self.nearby_url, self.nearby_data, format='json')
+    
+    def test_user_buckets_by_role(self):
+        """Test that citizens and municipal users have their own rates"""
+        for _ in range(2):
+            self.assertEqual(self.nearby(self.citizen_user).status_code, status.HTTP_200_OK)
+        response = self.nearby(self.citizen_user)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response['Retry-After'], '30')
+        
+        self.assertEqual(self.nearby(self.municipal_user).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.nearby(self.municipal_user).status_code, status.HTTP_200_OK)
+    
+    def test_address_bucket(self):
+        """Test that one address is limited across users"""
+        for user in (self.citizen_user, self.municipal_user, self.municipal_user,
+                     self.citizen_user, self.municipal_user):
+            self.assertEqual(self.nearby(user).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.nearby(self.municipal_user).status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        
+        # Other addresses are counted separately
+        response = self.client.post(self.nearby_url, self.nearby_data, format='json', REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+    
+    def test_register_limited_per_address(self):
+        """Test that registrations are limited per address"""
+        url = reverse('register')
+        for i, expected in enumerate((status.HTTP_201_CREATED, status.HTTP_429_TOO_MANY_REQUESTS)):
+            response = self.client.post(url, {
+                'username': f'newcitizen{i}',
+                'email': f'newcitizen{i}@example.com',
+                'password': 'StrongPass123!',
+                'password2': 'StrongPass123!',
+                'type': User.UserType.CITIZEN,
+            }, format='json')
+            self.assertEqual(response.status_code, expected)
+    
+    def test_unscoped_actions_unlimited(self):
+        """Test that actions without a scope aren't limited"""
+        self.client.force_authenticate(user=self.citizen_user)
+        for _ in range(5):
+            self.assertEqual(self.client.get(reverse('issue-list')).status_code, status.HTTP_200_OK)
+    
+    def test_locked_bucket(self):
+        """Test that a request can't spend a token while another holds the bucket"""
+        cache.add(f'throttle:issue_nearby_citizen:{self.citizen_user.pk}:lock', True)
+        response = self.nearby(self.citizen_user)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        
+        # The bucket wasn't touched
+        cache.delete(f'throttle:issue_nearby_citizen:{self.citizen_user.pk}:lock')
+        for _ in range(2):
+            self.assertEqual(self.nearby(self.citizen_user).status_code, status.HTTP_200_OK)
+    
+    def test_token_bucket(self):
+        """Test that buckets allow bursts and refill at the average rate"""
+        state = None
+        for _ in range(3):
+            allowed, state, wait = take_token(state, 3, 0.5, 100)
+            self.assertTrue(allowed)
+        allowed, state, wait = take_token(state, 3, 0.5, 100)
+        self.assertFalse(allowed)
+        self.assertEqual(wait, 2)
+        
+        allowed, state, wait = take_token(state, 3, 0.5, 102)
+        self.assertTrue(allowed)
+        self.assertFalse(take_token(state, 3, 0.5, 103)[0])
+        
+        # A full bucket doesn't grow past its capacity
+        allowed, state, wait = take_token(state, 3, 0.5, 1000)
+        self.assertEqual(state, (2, 1000))
+
+class AdmissionControlTest(APITestCase):
+    """Test case for shedding requests while the database is slow"""
+    
+    def setUp(self):
+        self.citizen_user = User.objects.create_user(
+            username='testcitizen',
+            email='citizen@example.com',
+            password='test1234',
+            type=User.UserType.CITIZEN
+        )
+        self.client.force_authenticate(user=self.citizen_user)
+    
+    def tearDown(self):
+        query_latency.average = 0.0
+    
+    @override_settings(ADMISSION_DEGRADED_CONCURRENCY=0, ADMISSION_LATENCY_THRESHOLD=100)
+    def test_sheds_when_database_is_slow(self):
+        """Test that requests get 503 with Retry-After over the degraded cap"""
+        self.assertEqual(self.client.get(reverse('issue-list')).status_code, status.HTTP_200_OK)
+        
+        query_latency.average = 150.0
+        response = self.client.get(reverse('issue-list'))
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response['Retry-After'], str(settings.ADMISSION_RETRY_AFTER))
+    
+    @override_settings(ADMISSION_MAX_CONCURRENCY=0)
+    def test_concurrency_cap(self):
+        """Test that requests over the cap are shed"""
+        response = self.client.get(reverse('issue-list'))
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
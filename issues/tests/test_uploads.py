@@ -0,0 +1,120 @@
+import hashlib
+import shutil
+import tempfile
+from io import BytesIO
+from PIL import Image
+from django.urls import reverse
+from django.test import override_settings
+from rest_framework.exceptions import NotFound
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from issues.models import ImageUpload, Issue, IssueImage
+from issues.uploads import complete_upload
+from django.contrib.gis.geos import Point
+
+User = get_user_model()
+
+class ResumableUploadAPITest(APITestCase):
+    """Test case for the chunked, resumable image upload API"""
+    
+    def setUp(self):
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        settings_override = override_settings(
+            MEDIA_ROOT=f'{temp_dir}/media',
+            IMAGE_UPLOAD_TEMP_DIR=f'{temp_dir}/uploads',
+            IMAGE_UPLOAD_CHUNK_SIZE=1024
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        
+        self.citizen_user = User.objects.create_user(
+            username='testcitizen',
+            email='citizen@example.com',
+            password='test1234',
+            type=User.UserType.CITIZEN
+        )
+        self.issue = Issue.objects.create(
+            reported_by=self.citizen_user,
+            title='Upload Issue',
+            description='Issue receiving a chunked upload',
+            location=Point(78.9629, 20.5937)
+        )
+        
+        buffer = BytesIO()
+        Image.effect_noise((64, 64), 50).save(buffer, format='PNG')
+        self.photo = buffer.getvalue()
+        self.chunks = [self.photo[i:i + 1024] for i in range(0, len(self.photo), 1024)]
+        self.client.force_authenticate(user=self.citizen_user)
+    
+    def put_chunk(self, upload_id, index, chunk, checksum=None):
+        url = reverse('issue-upload-chunk', kwargs={
+            'pk': self.issue.pk, 'upload_id': upload_id, 'index': index
+        })
+        return self.client.put(
+            url, chunk, content_type='application/octet-stream',
+            HTTP_X_CHUNK_SHA256=checksum or hashlib.sha256(chunk).hexdigest()
+        )
+    
+    def test_chunked_upload(self):
+        """Test initiating, resuming and completing an upload"""
+        response = self.client.post(
+            reverse('issue-start-upload', kwargs={'pk': self.issue.pk}),
+            {
+                'filename': 'pothole.png',
+                'size': len(self.photo),
+                'sha256': hashlib.sha256(self.photo).hexdigest(),
+                'caption': 'Chunked',
+            },
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        upload_id = response.data['id']
+        
+        # A corrupted chunk is rejected and nothing is kept
+        response = self.put_chunk(upload_id, 0, self.chunks[0], checksum='0' * 64)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(ImageUpload.objects.get().received_bytes, 0)
+        
+        # Chunks out of order are refused
+        response = self.put_chunk(upload_id, 1, self.chunks[1])
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        
+        for index, chunk in enumerate(self.chunks):
+            response = self.put_chunk(upload_id, index, chunk)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        # Retrying the last chunk is harmless
+        response = self.put_chunk(upload_id, len(self.chunks) - 1, self.chunks[-1])
+        self.assertEqual(response.data['received_bytes'], len(self.photo))
+        
+        response = self.client.post(reverse('issue-finish-upload', kwargs={
+            'pk': self.issue.pk, 'upload_id': upload_id
+        }))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        
+        image = IssueImage.objects.get(issue=self.issue)
+        self.assertEqual(image.caption, 'Chunked')
+        self.assertFalse(ImageUpload.objects.exists())
+    
+    def test_complete_once(self):
+        """Test that a completion racing with another finds the upload gone"""
+        response = self.client.post(
+            reverse('issue-start-upload', kwargs={'pk': self.issue.pk}),
+            {
+                'filename': 'pothole.png',
+                'size': len(self.photo),
+                'sha256': hashlib.sha256(self.photo).hexdigest(),
+            },
+            format='json'
+        )
+        upload_id = response.data['id']
+        for index, chunk in enumerate(self.chunks):
+            self.put_chunk(upload_id, index, chunk)
+        
+        # Both requests passed the view's lookup before either completed
+        complete_upload(upload_id)
+        with self.assertRaises(NotFound):
+            complete_upload(upload_id)
+        self.assertEqual(IssueImage.objects.filter(issue=self.issue).count(), 1)
@@ -0,0 +1,96 @@
+"""
+Mapbox vector tiles for issues, rendered in PostGIS.
+Tiles up to TILE_CLUSTER_MAX_ZOOM hold a `clusters` layer of issues snapped
+to a grid; deeper tiles hold an `issues` layer of individual points.
+"""
+import hashlib
+import json
+from math import atan, degrees, pi, sinh
+from django.conf import settings
+from django.contrib.gis.geos import Polygon
+from django.db import connection
+from django.db.models import Count, Max
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+# Width of the EPSG:3857 world in meters
+WEB_MERCATOR_EXTENT = 2 * 20037508.342789244
+
+POINTS_SQL = """
+SELECT ST_AsMVT(tile, 'issues', 4096, 'geom') FROM (
+    SELECT ST_AsMVTGeom(ST_Transform(i.location, 3857), ST_TileEnvelope(%s, %s, %s)) AS geom,
+           i.id, i.type, i.status, i.priority
+    FROM ({issues}) AS i
+) AS tile
+"""
+
+CLUSTERS_SQL = """
+SELECT ST_AsMVT(tile, 'clusters', 4096, 'geom') FROM (
+    SELECT ST_AsMVTGeom(ST_Centroid(ST_Collect(g.geom)), ST_TileEnvelope(%s, %s, %s)) AS geom,
+           count(*) AS count,
+           count(*) FILTER (WHERE g.status <> 'RESOLVED') AS open
+    FROM (
+        SELECT ST_Transform(i.location, 3857) AS geom, i.status
+        FROM ({issues}) AS i
+    ) AS g
+    GROUP BY ST_SnapToGrid(g.geom, %s)
+) AS tile
+"""
+
+class MVTRenderer(BaseRenderer):
+    """Lets clients request tiles with Accept: application/vnd.mapbox-vector-tile"""
+    media_type = 'application/vnd.mapbox-vector-tile'
+    format = 'mvt'
+    charset = None
+    render_style = 'binary'
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, bytes):
+            return data
+        # Errors raised before the view runs are still rendered as JSON
+        return JSONRenderer().render(data)
+
+def is_valid_tile(z, x, y):
+    return 0 <= z <= settings.TILE_MAX_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z
+
+def tile_envelope(z, x, y):
+    """Bounding box of tile z/x/y as an SRID 4326 polygon"""
+    n = 2 ** z
+    west = x / n * 360 - 180
+    east = (x + 1) / n * 360 - 180
+    north = degrees(atan(sinh(pi * (1 - 2 * y / n))))
+    south = degrees(atan(sinh(pi * (1 - 2 * (y + 1) / n))))
+    envelope = Polygon.from_bbox((west, south, east, north))
+    envelope.srid = 4326
+    return envelope
+
+def tile_etag(queryset, z, x, y):
+    """
+    ETag for a tile of `queryset`, which must already be limited to the tile.
+    It covers the query itself (visibility scope and filters), the tile and the
+    latest updated_at and row count inside it, so any edit, insert or delete
+    in the tile changes it.
+    """
+    state = queryset.aggregate(latest=Max('updated_at'), total=Count('id'))
+    sql, params = queryset.query.sql_with_params()
+    key = json.dumps([sql, [str(param) for param in params], z, x, y,
+                      str(state['latest']), state['total']])
+    return '"%s"' % hashlib.md5(key.encode()).hexdigest()
+
+def build_tile(queryset, z, x, y):
+    """Render the vector tile for `queryset` at z/x/y"""
+    issues_sql, params = queryset.values(
+        'id', 'location', 'type', 'status', 'priority'
+    ).order_by().query.sql_with_params()
+    
+    if z <= settings.TILE_CLUSTER_MAX_ZOOM:
+        grid_size = WEB_MERCATOR_EXTENT / 2 ** z / settings.TILE_CLUSTER_GRID
+        sql = CLUSTERS_SQL.format(issues=issues_sql)
+        params = [z, x, y, *params, grid_size]
+    else:
+        sql = POINTS_SQL.format(issues=issues_sql)
+        params = [z, x, y, *params]
+    
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        tile = cursor.fetchone()[0]
+    return bytes(tile) if tile is not None else b''
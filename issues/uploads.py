@@ -0,0 +1,124 @@
+"""
+Resumable chunked uploads of issue images.
+An upload is initiated with the final size and SHA-256 of the file, then
+its chunks are sent in order, each with its own SHA-256, and appended to a
+part file straight from the request stream. Completing the upload verifies
+the whole file and attaches it to the issue as an IssueImage.
+"""
+import hashlib
+import os
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from PIL import Image
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotFound, ValidationError
+from .models import ImageUpload, IssueImage
+
+READ_SIZE = 64 * 1024
+
+class UploadConflict(APIException):
+    """Raised for chunks sent out of order; the client should resume from next_chunk"""
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'Chunk out of order.'
+    default_code = 'conflict'
+
+def create_part_file(upload):
+    os.makedirs(settings.IMAGE_UPLOAD_TEMP_DIR, exist_ok=True)
+    open(upload.part_path, 'wb').close()
+
+def delete_part_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as part:
+        for block in iter(lambda: part.read(READ_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def append_chunk(upload_id, index, stream, length, checksum):
+    """
+    Append chunk `index` of `length` bytes read from `stream` to the upload.
+    The chunk is written as it is read and cut off again if it comes up short
+    or doesn't match `checksum`. Re-sending the last accepted chunk is a no-op,
+    so clients can retry a chunk whose response they never saw.
+    """
+    with transaction.atomic():
+        # Serializes concurrent requests for the same upload
+        upload = ImageUpload.objects.select_for_update().get(pk=upload_id)
+        
+        if index == upload.next_chunk - 1 and checksum == upload.last_chunk_sha256:
+            return upload
+        if index != upload.next_chunk:
+            raise UploadConflict(f'Expected chunk {upload.next_chunk}.')
+        if not 0 < length <= settings.IMAGE_UPLOAD_CHUNK_SIZE:
+            raise ValidationError(
+                {'chunk': [f'Chunks must be 1 to {settings.IMAGE_UPLOAD_CHUNK_SIZE} bytes.']}
+            )
+        if upload.received_bytes + length > upload.size:
+            raise ValidationError({'chunk': ['Chunk runs past the declared upload size.']})
+        
+        offset = upload.received_bytes
+        digest = hashlib.sha256()
+        with open(upload.part_path, 'r+b') as part:
+            # Drop anything left behind by an earlier failed attempt
+            part.seek(offset)
+            part.truncate()
+            remaining = length
+            while remaining:
+                block = stream.read(min(READ_SIZE, remaining))
+                if not block:
+                    break
+                digest.update(block)
+                part.write(block)
+                remaining -= len(block)
+            
+            if remaining or digest.hexdigest() != checksum:
+                part.truncate(offset)
+                raise ValidationError({'chunk': ['Chunk is incomplete or its checksum does not match.']})
+        
+        upload.received_bytes += length
+        upload.next_chunk += 1
+        upload.last_chunk_sha256 = checksum
+        upload.save(update_fields=['received_bytes', 'next_chunk', 'last_chunk_sha256', 'updated_at'])
+        return upload
+
+def complete_upload(upload_id):
+    """
+    Verify the assembled file and attach it to the issue as an IssueImage.
+    The upload row stays locked from the checks until the image row is
+    created and the upload row removed, so concurrent completions of the
+    same upload can't both succeed; the part file is deleted once that commits.
+    """
+    with transaction.atomic():
+        # Serializes concurrent completions; a later one finds the row gone
+        upload = ImageUpload.objects.select_for_update().filter(pk=upload_id).first()
+        if upload is None:
+            raise NotFound('Upload not found or already completed.')
+        if upload.received_bytes != upload.size:
+            raise ValidationError({'detail': f'Received {upload.received_bytes} of {upload.size} bytes.'})
+        if file_sha256(upload.part_path) != upload.sha256:
+            raise ValidationError({'detail': 'Uploaded file does not match its checksum.'})
+        try:
+            with Image.open(upload.part_path) as image:
+                image.verify()
+        except Exception:
+            raise ValidationError({'detail': 'Uploaded file is not a valid image.'})
+        
+        part_path = upload.part_path
+        image = IssueImage(issue_id=upload.issue_id, caption=upload.caption)
+        with open(part_path, 'rb') as part:
+            image.image.save(upload.filename, File(part), save=False)
+        try:
+            with transaction.atomic():
+                image.save()
+                upload.delete()
+        except Exception:
+            image.image.delete(save=False)
+            raise
+        transaction.on_commit(lambda: delete_part_file(part_path))
+    return image
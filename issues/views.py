@@ -1,24 +1,86 @@
+from datetime import timedelta
+from django.conf import settings
 from django.contrib.gis.geos import Point
-from django.contrib.gis.db.models.functions import Distance
+from django.core.cache import cache
 from django.db.models import Q
+from django.shortcuts import get_object_or_404
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
 from rest_framework import viewsets, status, mixins
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Issue, IssueImage
+from .models import ImageUpload, Issue, IssueImage, IssueStatusEvent
+from .cache import cache_stats, cached_response, etag_matches
+from .geojson import GeoJSONRenderer, feature_collection_chunks
+from .importers import import_issues
+from .pagination import IssueCursorPagination, NearbyCursorPagination, SearchCursorPagination
+from .parsers import NDJSONParser
+from .stats import issue_stats
+from .tiles import MVTRenderer, build_tile, is_valid_tile, tile_envelope, tile_etag
+from .uploads import append_chunk, complete_upload, create_part_file, delete_part_file
 from .serializers import (
     IssueSerializer, 
+    IssueListSerializer,
     IssueCreateSerializer,
+    DuplicateIssueSerializer,
     IssueUpdateSerializer, 
     IssueImageSerializer,
     AddIssueImageSerializer,
-    NearbyIssueSerializer
+    ImageUploadSerializer,
+    IssueStatusEventSerializer,
+    NearbyIssueSerializer,
+    ResolutionTimesSerializer
 )
+from nagarkranti.routers import ReplicaReadMixin
+from nagarkranti.throttling import AddressBucketThrottle, UserBucketThrottle
 from users.permissions import IsMunicipalUser, IsOwnerOrMunicipal
 
-class IssueViewSet(viewsets.ModelViewSet):
+class IssueQuerysetMixin:
+    """
+    Issues visible to the requesting user, eager-loaded for the current
+    action. Shared by IssueViewSet and the async read views.
+    """
+    # Relations read by each action's serializer and object permission check,
+    # as (select_related, prefetch_related). Keeps list/retrieve/nearby at a
+    # constant number of queries regardless of page size or image count.
+    queryset_plans = {
+        'list': (['reported_by'], ['images']),
+        'retrieve': (['reported_by'], ['images']),
+        'nearby': (['reported_by'], ['images']),
+        'search': (['reported_by'], ['images']),
+        'update': (['reported_by'], []),
+        'partial_update': (['reported_by'], []),
+    }
+    
+    def get_queryset(self):
+        """
+        Filter queryset based on user type:
+        - Municipal users can see all issues
+        - Citizens can only see their own issues
+        """
+        user = self.request.user
+        if user.is_municipal_user():
+            queryset = Issue.objects.all()
+        else:
+            queryset = Issue.objects.filter(reported_by=user)
+        return self.plan_queryset(queryset)
+    
+    def plan_queryset(self, queryset):
+        """Eager-load the relations the current action will touch"""
+        select_related, prefetch_related = self.queryset_plans.get(self.action, ([], []))
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        return queryset
+
+class IssueViewSet(ReplicaReadMixin, IssueQuerysetMixin, viewsets.ModelViewSet):
     """
     API endpoint for issue management.
     Supports CRUD operations with different permissions based on user type:
@@ -28,20 +90,19 @@ class IssueViewSet(viewsets.ModelViewSet):
     queryset = Issue.objects.all()
     serializer_class = IssueSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = IssueCursorPagination
     parser_classes = [JSONParser, MultiPartParser, FormParser]  # Added JSONParser
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['type', 'status', 'priority']
-    
-    def get_queryset(self):
-        """
-        Filter queryset based on user type:
-        - Municipal users can see all issues
-        - Citizens can only see their own issues
-        """
-        user = self.request.user
-        if user.is_municipal_user():
-            return Issue.objects.all()
-        return Issue.objects.filter(reported_by=user)
+    # Read from a replica like GET requests; nearby only takes its input by POST
+    replica_read_actions = ['nearby']
+    throttle_classes = [UserBucketThrottle, AddressBucketThrottle]
+    throttle_scopes = {
+        'create': 'issue_create',
+        'add_image': 'issue_image',
+        'start_upload': 'issue_image',
+        'nearby': 'issue_nearby',
+    }
     
     def get_serializer_class(self):
         """Return appropriate serializer based on action"""
@@ -51,24 +112,34 @@ class IssueViewSet(viewsets.ModelViewSet):
             return IssueUpdateSerializer
         elif self.action == 'nearby':
             return NearbyIssueSerializer
+        elif self.action in ['list', 'search']:
+            return IssueListSerializer
         return IssueSerializer
     
     def get_permissions(self):
         """
         Override permissions based on the action:
         - create: any authenticated user can create issues
-        - list/retrieve: owner or municipal users
+        - list/retrieve/timeline: owner or municipal users
         - update/partial_update: owner (only status) or municipal users (all fields)
-        - destroy: only municipal users
+        - destroy/bulk/cache_stats/stats/resolution_times: only municipal users
         """
-        if self.action in ['retrieve', 'list', 'create', 'update', 'partial_update']:
+        if self.action in ['retrieve', 'list', 'create', 'update', 'partial_update', 'timeline']:
             permission_classes = [IsAuthenticated, IsOwnerOrMunicipal]
-        elif self.action == 'destroy':
+        elif self.action in ['destroy', 'bulk', 'cache_stats', 'stats', 'resolution_times']:
             permission_classes = [IsAuthenticated, IsMunicipalUser]
         else:
             permission_classes = [IsAuthenticated]
         return [permission() for permission in permission_classes]
     
+    def list(self, request, *args, **kwargs):
+        """List issues, served from the per-user-scope response cache"""
+        return cached_response(request, super().list, *args, **kwargs)
+    
+    def retrieve(self, request, *args, **kwargs):
+        """Retrieve an issue, served from the per-user-scope response cache"""
+        return cached_response(request, super().retrieve, *args, **kwargs)
+    
     def create(self, request, *args, **kwargs):
         """
         method to handle both JSON and form data
@@ -91,20 +162,60 @@ class IssueViewSet(viewsets.ModelViewSet):
                 serializer_data['longitude'] = location['coordinates'][0]
                 serializer_data['latitude'] = location['coordinates'][1]
             
+            if 'on_duplicate' in data:
+                serializer_data['on_duplicate'] = data['on_duplicate']
             serializer = self.get_serializer(data=serializer_data)
-            serializer.is_valid(raise_exception=True)
-            self.perform_create(serializer)
-            headers = self.get_success_headers(serializer.data)
-            return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
         else:
             # Proceed with standard form data handling
-            return super().create(request, *args, **kwargs)
+            serializer = self.get_serializer(data=request.data)
+        
+        serializer.is_valid(raise_exception=True)
+        self.perform_create(serializer)
+        if serializer.instance.merged:
+            # Counted as an upvote of an existing issue, which may be another
+            # citizen's: only its summary is returned
+            summary = DuplicateIssueSerializer(serializer.instance).data
+            return Response({**summary, 'merged': True}, status=status.HTTP_200_OK)
+        headers = self.get_success_headers(serializer.data)
+        return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
+    
+    @action(detail=False, methods=['post'], parser_classes=[JSONParser, NDJSONParser])
+    def bulk(self, request):
+        """
+        Import many issues at once from a JSON array or NDJSON body.
+        Rows are validated and inserted in batches (batch_size query parameter);
+        invalid rows are reported by row number without aborting the import.
+        """
+        rows = request.data
+        if isinstance(rows, dict):
+            return Response(
+                {"detail": "Expected a JSON array or NDJSON rows."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            batch_size = int(request.query_params.get('batch_size', settings.ISSUE_IMPORT_BATCH_SIZE))
+        except ValueError:
+            batch_size = 0
+        if not 1 <= batch_size <= settings.ISSUE_IMPORT_MAX_BATCH_SIZE:
+            return Response(
+                {"batch_size": [f"Must be between 1 and {settings.ISSUE_IMPORT_MAX_BATCH_SIZE}."]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        created, errors = import_issues(rows, request.user, batch_size)
+        return Response(
+            {'created': created, 'errors': errors},
+            status=status.HTTP_201_CREATED if created else status.HTTP_400_BAD_REQUEST
+        )
     
-    @action(detail=False, methods=['post'])
+    @action(detail=False, methods=['post'], pagination_class=NearbyCursorPagination)
     def nearby(self, request):
         """
-        Find issues near a specific location.
-        Accepts latitude, longitude, and optional distance (in meters).
+        Find issues near a specific location, nearest first.
+        Accepts latitude, longitude, optional distance (in meters) and limit.
+        Results are paginated with a (distance, id) cursor; with stream=true
+        every match up to the limit is streamed back as NDJSON instead.
         """
         serializer = self.get_serializer(data=request.data)
         
@@ -112,21 +223,155 @@ class IssueViewSet(viewsets.ModelViewSet):
             latitude = serializer.validated_data['latitude']
             longitude = serializer.validated_data['longitude']
             distance = serializer.validated_data.get('distance', 5000)  # Default 5km
+            limit = serializer.validated_data.get('limit')
             
             # Create point from coordinates
             point = Point(longitude, latitude, srid=4326)
             
-            # Query issues within distance
-            queryset = self.get_queryset().annotate(
-                distance=Distance('location', point)
-            ).filter(distance__lte=distance).order_by('distance')
+            # Query issues within distance; id breaks ties for the cursor
+            queryset = self.get_queryset().within_distance(
+                point, distance
+            ).order_by('distance', 'id')
             
-            # Serialize results
-            issue_serializer = IssueSerializer(queryset, many=True)
-            return Response(issue_serializer.data)
+            if serializer.validated_data['stream']:
+                return self.stream_issues(queryset[:limit or settings.NEARBY_MAX_RESULTS])
+            
+            self.paginator.page_size = limit or api_settings.PAGE_SIZE
+            page = self.paginate_queryset(queryset)
+            issue_serializer = IssueListSerializer(page, many=True)
+            return self.get_paginated_response(issue_serializer.data)
             
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
+    def stream_issues(self, queryset):
+        """
+        Stream serialized issues as NDJSON, one per line.
+        Rows are fetched with a server-side cursor so memory stays constant.
+        """
+        renderer = JSONRenderer()
+        
+        def rows():
+            for issue in queryset.iterator(chunk_size=settings.NEARBY_STREAM_CHUNK_SIZE):
+                yield renderer.render(IssueListSerializer(issue).data) + b'\n'
+        
+        return StreamingHttpResponse(rows(), content_type='application/x-ndjson')
+    
+    @action(detail=False, methods=['get'], pagination_class=SearchCursorPagination)
+    def search(self, request):
+        """
+        Full-text search over the titles and descriptions of the issues visible
+        to the user, best match first. Takes the query in `q` (web search
+        syntax: quoted phrases, or, -word) and honours filterset_fields.
+        """
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response(
+                {"q": ["This query parameter is required."]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        queryset = self.filter_queryset(self.get_queryset()).search(query)
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+    
+    @action(detail=False, methods=['get'], renderer_classes=[JSONRenderer, GeoJSONRenderer])
+    def geojson(self, request):
+        """
+        Export the issues visible to the user as a GeoJSON FeatureCollection,
+        honouring filterset_fields. Streamed in chunks without DRF serializers.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        return StreamingHttpResponse(
+            feature_collection_chunks(queryset, settings.GEOJSON_EXPORT_CHUNK_SIZE),
+            content_type=GeoJSONRenderer.media_type
+        )
+    
+    @action(detail=False, methods=['get'],
+            url_path=r'tiles/(?P<z>\d+)/(?P<x>\d+)/(?P<y>\d+)',
+            renderer_classes=[JSONRenderer, MVTRenderer])
+    def tiles(self, request, z, x, y):
+        """
+        Vector tile of the issues visible to the user, honouring filterset_fields.
+        Low zoom levels return grid clusters, high zoom levels individual points.
+        Responses carry an ETag and are cached server side under it.
+        """
+        z, x, y = int(z), int(x), int(y)
+        if not is_valid_tile(z, x, y):
+            return Response(
+                {"detail": "Invalid tile coordinates."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            location__bboverlaps=tile_envelope(z, x, y)
+        ).order_by()
+        etag = tile_etag(queryset, z, x, y)
+        
+        if etag_matches(etag, request.headers.get('If-None-Match', '')):
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            tile = cache.get_or_set(
+                f'issue-tile:{etag}',
+                lambda: build_tile(queryset, z, x, y),
+                settings.TILE_CACHE_TIMEOUT
+            )
+            response = HttpResponse(tile, content_type=MVTRenderer.media_type)
+        
+        response['ETag'] = etag
+        # Tiles depend on who is asking, so only private caches may keep them
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+    
+    @action(detail=False, methods=['get'])
+    def stats(self, request):
+        """
+        Dashboard statistics over all issues: counts by status, type, priority
+        and grid cell, open issue age percentiles and the distribution of
+        resolution times. Read from the rollup tables, not the issues.
+        """
+        return Response(issue_stats())
+    
+    @action(detail=True, methods=['get'])
+    def timeline(self, request, pk=None):
+        """
+        Status and priority changes of an issue, oldest first.
+        """
+        issue = self.get_object()
+        events = IssueStatusEvent.objects.filter(issue=issue).select_related('changed_by')
+        return Response({
+            'issue': issue.id,
+            'created_at': issue.created_at,
+            'events': IssueStatusEventSerializer(events, many=True).data,
+        })
+    
+    @action(detail=False, methods=['get'])
+    def resolution_times(self, request):
+        """
+        City-wide time from report to resolution per day, week or month
+        (period), optionally per type or priority (group_by), for issues
+        resolved between since and until (default: the last
+        RESOLUTION_REPORT_DAYS days).
+        """
+        serializer = ResolutionTimesSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        since = params.get('since', timezone.now() - timedelta(days=settings.RESOLUTION_REPORT_DAYS))
+        
+        events = IssueStatusEvent.objects.filter(created_at__gte=since)
+        if 'until' in params:
+            events = events.filter(created_at__lt=params['until'])
+        return Response({
+            'period': params['period'],
+            'since': since,
+            'results': list(events.resolution_times(params['period'], params.get('group_by'))),
+        })
+    
+    @action(detail=False, methods=['get'])
+    def cache_stats(self, request):
+        """Hit/miss counters of the issue response cache"""
+        return Response(cache_stats())
+    
     @action(detail=True, methods=['post'])
     def add_image(self, request, pk=None):
         """
@@ -148,6 +393,76 @@ class IssueViewSet(viewsets.ModelViewSet):
             
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=True, methods=['post'], url_path='uploads')
+    def start_upload(self, request, pk=None):
+        """
+        Start a resumable, chunked image upload for an issue.
+        Accepts filename, size, sha256 (hex digest of the whole file) and caption.
+        """
+        issue = self.get_object()
+        serializer = ImageUploadSerializer(data=request.data)
+        
+        if serializer.is_valid():
+            upload = serializer.save(issue=issue, uploaded_by=request.user)
+            create_part_file(upload)
+            return Response(
+                ImageUploadSerializer(upload).data,
+                status=status.HTTP_201_CREATED
+            )
+            
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    def get_upload(self, upload_id):
+        """Return the requesting user's upload for the current issue"""
+        issue = self.get_object()
+        return get_object_or_404(
+            ImageUpload, pk=upload_id, issue=issue, uploaded_by=self.request.user
+        )
+    
+    @action(detail=True, methods=['get', 'delete'],
+            url_path=r'uploads/(?P<upload_id>[0-9a-f-]{36})')
+    def upload_status(self, request, pk=None, upload_id=None):
+        """Show an upload's progress so the client can resume, or abandon it"""
+        upload = self.get_upload(upload_id)
+        if request.method == 'DELETE':
+            part_path = upload.part_path
+            upload.delete()
+            delete_part_file(part_path)
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        return Response(ImageUploadSerializer(upload).data)
+    
+    @action(detail=True, methods=['put'],
+            url_path=r'uploads/(?P<upload_id>[0-9a-f-]{36})/chunks/(?P<index>\d+)')
+    def upload_chunk(self, request, pk=None, upload_id=None, index=None):
+        """
+        Append chunk number `index` (from 0) to an upload.
+        The raw request body is the chunk and the X-Chunk-SHA256 header its
+        hex digest. Chunks must arrive in order.
+        """
+        upload = self.get_upload(upload_id)
+        try:
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            length = 0
+        upload = append_chunk(
+            upload.pk,
+            int(index),
+            request.stream,
+            length,
+            request.headers.get('X-Chunk-SHA256', '').lower()
+        )
+        return Response(ImageUploadSerializer(upload).data)
+    
+    @action(detail=True, methods=['post'],
+            url_path=r'uploads/(?P<upload_id>[0-9a-f-]{36})/complete')
+    def finish_upload(self, request, pk=None, upload_id=None):
+        """Verify a fully received upload and attach it to the issue as an image"""
+        image = complete_upload(self.get_upload(upload_id).pk)
+        return Response(
+            IssueImageSerializer(image).data,
+            status=status.HTTP_201_CREATED
+        )
+
 class IssueImageViewSet(mixins.RetrieveModelMixin,
                         mixins.DestroyModelMixin,
                         viewsets.GenericViewSet):
@@ -155,7 +470,7 @@ class IssueImageViewSet(mixins.RetrieveModelMixin,
     API endpoint for retrieving and deleting issue images.
     Only the issue owner or municipal users can delete images.
     """
-    queryset = IssueImage.objects.all()
+    queryset = IssueImage.objects.select_related('issue__reported_by')
     serializer_class = IssueImageSerializer
     permission_classes = [IsAuthenticated]
     
@@ -0,0 +1,96 @@
+"""
+Admission control. AdmissionControlMiddleware caps the requests each worker
+process handles at once at ADMISSION_MAX_CONCURRENCY. When the database
+slows down, i.e. the moving average of query times exceeds
+ADMISSION_LATENCY_THRESHOLD milliseconds, the cap drops to
+ADMISSION_DEGRADED_CONCURRENCY. Requests over the cap get a 503 with
+Retry-After right away, instead of queueing more work for a database that is
+already behind. The queries of the requests still admitted keep the average
+current, so the cap recovers with the database.
+"""
+import threading
+import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.http import JsonResponse
+
+class QueryLatency:
+    """Exponential moving average of query times, fed by an execute wrapper"""
+    def __init__(self):
+        self.average = 0.0
+        self.lock = threading.Lock()
+    
+    def record(self, milliseconds):
+        with self.lock:
+            self.average += settings.ADMISSION_LATENCY_SMOOTHING * (milliseconds - self.average)
+    
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.record((time.perf_counter() - start) * 1000)
+
+query_latency = QueryLatency()
+
+def track_query_latency(sender, connection, **kwargs):
+    """Time every query on the connection, in whichever thread it runs"""
+    if query_latency not in connection.execute_wrappers:
+        connection.execute_wrappers.append(query_latency)
+
+class AdmissionControlMiddleware:
+    """Shed requests over the concurrency cap with 503 Service Unavailable"""
+    sync_capable = True
+    async_capable = True
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.in_flight = 0
+        self.lock = threading.Lock()
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        connection_created.connect(track_query_latency, dispatch_uid='admission_query_latency')
+    
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.admit():
+            return self.reject()
+        try:
+            return self.get_response(request)
+        finally:
+            self.release()
+    
+    async def __acall__(self, request):
+        if not self.admit():
+            return self.reject()
+        try:
+            return await self.get_response(request)
+        finally:
+            self.release()
+    
+    def get_limit(self):
+        if query_latency.average > settings.ADMISSION_LATENCY_THRESHOLD:
+            return settings.ADMISSION_DEGRADED_CONCURRENCY
+        return settings.ADMISSION_MAX_CONCURRENCY
+    
+    def admit(self):
+        with self.lock:
+            if self.in_flight >= self.get_limit():
+                return False
+            self.in_flight += 1
+            return True
+    
+    def release(self):
+        with self.lock:
+            self.in_flight -= 1
+    
+    def reject(self):
+        response = JsonResponse(
+            {'detail': 'The server is busy. Please retry later.'},
+            status=503
+        )
+        response['Retry-After'] = str(settings.ADMISSION_RETRY_AFTER)
+        return response
@@ -12,5 +12,14 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'nagarkranti.settings')
+# Persistent connections would pile up, one per request thread; set
+# DB_POOL_MODE=pool to reuse connections under ASGI
+os.environ.setdefault('DB_POOL_MODE', 'none')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported once Django is set up: the stream uses the ORM
+from issues.streams import with_event_stream  # noqa: E402
+
+# Issue status events are streamed outside Django's request handling
+application = with_event_stream(django_application)
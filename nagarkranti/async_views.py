@@ -0,0 +1,142 @@
+"""
+Async views for the hot read endpoints when the project is served over ASGI.
+AsyncReadMiddleware hands the matching requests to them in place of the DRF
+viewsets, under the same URLs. They authenticate, check permissions, handle
+errors and render JSON as the viewsets do, but await the database through
+Django's async ORM rather than occupying a worker thread per request.
+Serializers run in the event loop on fully preloaded objects, so they never
+query; Django raises SynchronousOnlyOperation if one tries.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.module_loading import import_string
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
+from rest_framework.permissions import SAFE_METHODS, IsAuthenticated
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import exception_handler
+from users.authentication import AsyncJWTAuthentication
+from .routers import awrote_recently, replica_reads, use_replica
+
+class AsyncAPIView(View):
+    """Minimal async counterpart of DRF's APIView for JSON read endpoints"""
+    authentication_class = AsyncJWTAuthentication
+    permission_classes = [IsAuthenticated]
+    parser_classes = [JSONParser, MultiPartParser, FormParser]
+    renderer = JSONRenderer()
+    throttle_classes = []
+    action = None
+    replica_read_actions = []
+    
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Token authentication only, as for the DRF views
+        return csrf_exempt(super().as_view(**initkwargs))
+    
+    async def dispatch(self, request, *args, **kwargs):
+        self.request = Request(request, parsers=[parser() for parser in self.parser_classes])
+        handler = getattr(self, request.method.lower(), None)
+        with replica_reads():
+            try:
+                if handler is None:
+                    raise exceptions.MethodNotAllowed(request.method)
+                await self.initial(self.request)
+                response = await handler(self.request, *args, **kwargs)
+            except Exception as exc:
+                response = self.handle_exception(exc)
+        return self.finalize_response(response)
+    
+    async def initial(self, request):
+        authenticated = await self.authentication_class().aauthenticate(request._request)
+        request.user, request.auth = authenticated or (AnonymousUser(), None)
+        for permission in self.get_permissions():
+            if not permission.has_permission(request, self):
+                self.permission_denied(request, permission)
+        await self.check_throttles(request)
+        # As ReplicaReadMixin does for the DRF views
+        reads_only = request.method in SAFE_METHODS or self.action in self.replica_read_actions
+        if reads_only and settings.DATABASE_REPLICAS and not await awrote_recently(request.user):
+            use_replica()
+    
+    def get_permissions(self):
+        return [permission() for permission in self.permission_classes]
+    
+    async def check_throttles(self, request):
+        waits = []
+        for throttle in [throttle() for throttle in self.throttle_classes]:
+            if not await throttle.aallow_request(request, self):
+                waits.append(throttle.wait())
+        if waits:
+            raise exceptions.Throttled(max((wait for wait in waits if wait is not None), default=None))
+    
+    def check_object_permissions(self, request, obj):
+        for permission in self.get_permissions():
+            if not permission.has_object_permission(request, self, obj):
+                self.permission_denied(request, permission)
+    
+    def permission_denied(self, request, permission):
+        if request.auth is None:
+            raise exceptions.NotAuthenticated()
+        raise exceptions.PermissionDenied(getattr(permission, 'message', None))
+    
+    def get_serializer_context(self):
+        return {'request': self.request, 'view': self}
+    
+    def handle_exception(self, exc):
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            exc.auth_header = self.authentication_class().authenticate_header(self.request)
+        response = exception_handler(exc, {'view': self, 'request': self.request})
+        if response is None:
+            raise exc
+        return response
+    
+    def finalize_response(self, response):
+        """Render a DRF Response here, rather than in a thread as Django would"""
+        if isinstance(response, Response):
+            rendered = HttpResponse(
+                b'' if response.data is None else self.renderer.render(response.data),
+                status=response.status_code,
+                content_type=f'{self.renderer.media_type}; charset={self.renderer.charset}'
+            )
+            for name, value in response.items():
+                if name.lower() != 'content-type':
+                    rendered[name] = value
+            response = rendered
+        patch_vary_headers(response, ['Accept'])
+        return response
+
+class AsyncReadMiddleware:
+    """
+    Under ASGI, serve the requests listed in settings.ASYNC_READ_VIEWS, keyed
+    by URL name and method, with the async view at the given dotted path
+    instead of the resolved DRF view. Not used under WSGI.
+    """
+    sync_capable = True
+    async_capable = True
+    
+    def __init__(self, get_response):
+        if not iscoroutinefunction(get_response):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.views = {
+            (name, method): import_string(path).as_view()
+            for (name, method), path in settings.ASYNC_READ_VIEWS.items()
+        }
+        markcoroutinefunction(self)
+    
+    async def __call__(self, request):
+        return await self.get_response(request)
+    
+    async def process_view(self, request, view_func, view_args, view_kwargs):
+        view = self.views.get((request.resolver_match.view_name, request.method))
+        if view is not None:
+            return await view(request, *view_args, **view_kwargs)
+        return None
@@ -0,0 +1,218 @@
+"""
+Per-request performance metrics. MetricsMiddleware records, for each
+request, the SQL queries run and their time (through an execute wrapper on
+every connection), the time spent in serializers using MeasuredSerializerMixin
+and the response size. It reports them:
+
+- to the client, in a Server-Timing header;
+- as one JSON log line per request on the 'nagarkranti.metrics' logger;
+- as per-view histograms and counters in the Prometheus text format at
+  /metrics, for scrapers sending `Authorization: Bearer <METRICS_TOKEN>`.
+
+Metrics are aggregated in the worker process; each series carries a `pid`
+label so that scrapes of different workers can be told apart.
+"""
+import bisect
+import hmac
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse, HttpResponseForbidden, HttpResponseNotFound
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the latency histogram buckets, in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# URL name of the endpoint, which isn't counted itself
+METRICS_VIEW = 'metrics'
+
+_current = ContextVar('request_metrics', default=None)
+
+class RequestMetrics:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.timings = {'db': 0.0, 'serialize': 0.0}
+        self.measuring = set()
+    
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+@contextmanager
+def measure(name):
+    """Add the time spent in the block to the current request's `name` timing"""
+    metrics = _current.get()
+    if metrics is None or name in metrics.measuring:
+        # Not in a request, or nested in an outer measurement of the same
+        yield
+        return
+    metrics.measuring.add(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.timings[name] = metrics.timings.get(name, 0.0) + time.perf_counter() - start
+        metrics.measuring.discard(name)
+
+def time_query(execute, sql, params, many, context):
+    """Execute wrapper counting and timing the current request's queries"""
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.timings['db'] += time.perf_counter() - start
+
+def install_query_timer(sender=None, connection=None, **kwargs):
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+class MeasuredSerializerMixin:
+    """Count the serializer's output time as the request's 'serialize' timing"""
+    def to_representation(self, instance):
+        with measure('serialize'):
+            return super().to_representation(instance)
+
+class Registry:
+    """Per-view latency histograms and totals of the other measurements"""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.views = {}
+    
+    def observe(self, labels, seconds, metrics, size):
+        with self.lock:
+            view = self.views.get(labels)
+            if view is None:
+                view = self.views[labels] = {
+                    'buckets': [0] * (len(BUCKETS) + 1),
+                    'count': 0,
+                    'sum': 0.0,
+                    'queries': 0,
+                    'timings': {},
+                    'bytes': 0,
+                }
+            view['buckets'][bisect.bisect_left(BUCKETS, seconds)] += 1
+            view['count'] += 1
+            view['sum'] += seconds
+            view['queries'] += metrics.queries
+            for name, value in metrics.timings.items():
+                view['timings'][name] = view['timings'].get(name, 0.0) + value
+            view['bytes'] += size or 0
+    
+    def render(self):
+        """The metrics in the Prometheus text exposition format"""
+        pid = os.getpid()
+        with self.lock:
+            views = sorted(
+                (labels, {**view, 'buckets': list(view['buckets']), 'timings': dict(view['timings'])})
+                for labels, view in self.views.items()
+            )
+        lines = [
+            '# HELP nagarkranti_request_duration_seconds Request latency by view.',
+            '# TYPE nagarkranti_request_duration_seconds histogram',
+        ]
+        for (name, method), view in views:
+            labels = f'view="{name}",method="{method}",pid="{pid}"'
+            cumulative = 0
+            for bound, count in zip((*BUCKETS, '+Inf'), view['buckets']):
+                cumulative += count
+                lines.append(f'nagarkranti_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'nagarkranti_request_duration_seconds_sum{{{labels}}} {view["sum"]}')
+            lines.append(f'nagarkranti_request_duration_seconds_count{{{labels}}} {view["count"]}')
+        totals = (
+            ('db_queries_total', 'SQL queries run by view.', lambda view: view['queries']),
+            ('db_seconds_total', 'Time spent in SQL queries by view.', lambda view: view['timings'].get('db', 0.0)),
+            ('serialize_seconds_total', 'Time spent in serializers by view.',
+             lambda view: view['timings'].get('serialize', 0.0)),
+            ('response_bytes_total', 'Response body bytes by view, streamed bodies excluded.',
+             lambda view: view['bytes']),
+        )
+        for metric, description, value in totals:
+            lines.append(f'# HELP nagarkranti_{metric} {description}')
+            lines.append(f'# TYPE nagarkranti_{metric} counter')
+            for (name, method), view in views:
+                lines.append(f'nagarkranti_{metric}{{view="{name}",method="{method}",pid="{pid}"}} {value(view)}')
+        return '\n'.join(lines) + '\n'
+
+registry = Registry()
+
+class MetricsMiddleware:
+    """Measure each request, see the module docstring"""
+    sync_capable = True
+    async_capable = True
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        connection_created.connect(install_query_timer, dispatch_uid='metrics_query_timer')
+    
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        # This thread's connections may predate the connection_created receiver
+        for connection in connections.all():
+            install_query_timer(connection=connection)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics)
+    
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics)
+    
+    def finish(self, request, response, metrics):
+        seconds = metrics.elapsed()
+        size = None if response.streaming else len(response.content)
+        match = request.resolver_match
+        view = match.view_name if match else 'unmatched'
+        
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={metrics.timings["db"] * 1000:.1f};desc="{metrics.queries} queries"',
+            *(f'{name};dur={value * 1000:.1f}' for name, value in metrics.timings.items() if name != 'db'),
+            f'total;dur={seconds * 1000:.1f}',
+        ])
+        if view != METRICS_VIEW:
+            registry.observe((view, request.method), seconds, metrics, size)
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'view': view,
+            'status': response.status_code,
+            'duration_ms': round(seconds * 1000, 1),
+            'db_queries': metrics.queries,
+            **{f'{name}_ms': round(value * 1000, 1) for name, value in metrics.timings.items()},
+            'response_bytes': size,
+        }))
+        return response
+
+def metrics_view(request):
+    """GET /metrics, for scrapers presenting METRICS_TOKEN"""
+    if not settings.METRICS_TOKEN:
+        return HttpResponseNotFound()
+    expected = f'Bearer {settings.METRICS_TOKEN}'.encode()
+    if not hmac.compare_digest(request.headers.get('Authorization', '').encode(), expected):
+        return HttpResponseForbidden()
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
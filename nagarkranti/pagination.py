@@ -0,0 +1,163 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+from asgiref.sync import sync_to_async
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+class KeysetPagination(BasePagination):
+    """
+    Forward-only keyset (seek) pagination.
+    Results are ordered by `ordering`, whose last field must be unique, and the
+    cursor holds those values for the last row of the page. Every page is a
+    bounded index range scan rather than an OFFSET scan, and no COUNT(*) runs.
+    
+    Pass count=approximate to receive the planner's row estimate in the
+    X-Approximate-Count header. When `page_number_class` is set, requests that
+    carry its page parameter are paginated by page number instead.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    count_header = 'X-Approximate-Count'
+    page_number_class = None
+    invalid_cursor_message = _('Invalid cursor')
+    
+    def paginate_queryset(self, queryset, request, view=None):
+        paginator = self.get_page_number_paginator(request)
+        if paginator is not None:
+            return paginator.paginate_queryset(queryset, request, view)
+        
+        self.approximate_count = None
+        if request.query_params.get(self.count_query_param) == 'approximate':
+            self.approximate_count = self.estimate_count(queryset)
+        queryset = self.seek_queryset(queryset, request)
+        # Fetch one extra row to find out whether there is a next page
+        return self.set_page(list(queryset[:self.page_size + 1]))
+    
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset() for async views, fetching with the async ORM"""
+        paginator = self.get_page_number_paginator(request)
+        if paginator is not None:
+            return await sync_to_async(paginator.paginate_queryset)(queryset, request, view)
+        
+        self.approximate_count = None
+        if request.query_params.get(self.count_query_param) == 'approximate':
+            self.approximate_count = await sync_to_async(self.estimate_count)(queryset)
+        queryset = self.seek_queryset(queryset, request)
+        return self.set_page([row async for row in queryset[:self.page_size + 1]])
+    
+    def get_page_number_paginator(self, request):
+        self.page_number_paginator = None
+        if self.page_number_class is not None:
+            paginator = self.page_number_class()
+            if paginator.page_query_param in request.query_params:
+                self.page_number_paginator = paginator
+        return self.page_number_paginator
+    
+    def seek_queryset(self, queryset, request):
+        """Order `queryset` and skip to the position of the request's cursor"""
+        self.base_url = request.build_absolute_uri()
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request, queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self.seek_filter(position))
+        return queryset
+    
+    def set_page(self, results):
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        return self.page
+    
+    def get_paginated_response(self, data):
+        if self.page_number_paginator is not None:
+            return self.page_number_paginator.get_paginated_response(data)
+        
+        headers = {}
+        if self.approximate_count is not None:
+            headers[self.count_header] = str(self.approximate_count)
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        }, headers=headers)
+    
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+    
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        position = [self.get_position_value(last, name.lstrip('-')) for name in self.ordering]
+        return self.encode_cursor(position)
+    
+    def get_position_value(self, instance, name):
+        """Return the JSON-safe cursor value of `name` for `instance`"""
+        value = getattr(instance, name)
+        if isinstance(value, datetime):
+            # Full precision; DjangoJSONEncoder would drop microseconds
+            return value.isoformat()
+        return value
+    
+    def seek_filter(self, position):
+        """
+        Build the filter for rows after `position` in `ordering`, i.e.
+        a > x OR (a = x AND b > y) ..., flipped for descending fields.
+        """
+        fields = [(name.lstrip('-'), name.startswith('-')) for name in self.ordering]
+        condition = Q()
+        equal = Q()
+        for (name, descending), value in zip(fields, position):
+            lookup = 'lt' if descending else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        
+        # A plain range on the leading field lets the database seek its index
+        name, descending = fields[0]
+        bound = 'lte' if descending else 'gte'
+        return Q(**{f'{name}__{bound}': position[0]}) & condition
+    
+    def estimate_count(self, queryset):
+        """Row estimate from the query planner, without running COUNT(*)"""
+        plan = json.loads(queryset.explain(format='json'))
+        return int(plan[0]['Plan']['Plan Rows'])
+    
+    def encode_cursor(self, position):
+        token = urlsafe_b64encode(json.dumps(position).encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+    
+    def decode_cursor(self, request, model):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            position = json.loads(urlsafe_b64decode(token.encode()))
+            if not isinstance(position, list) or len(position) != len(self.ordering):
+                raise ValueError(token)
+            return [
+                self.parse_position_value(model, name.lstrip('-'), value)
+                for name, value in zip(self.ordering, position)
+            ]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+    
+    def parse_position_value(self, model, name, value):
+        try:
+            return model._meta.get_field(name).to_python(value)
+        except FieldDoesNotExist:
+            # Annotations such as distance are plain JSON numbers
+            return value
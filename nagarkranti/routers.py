@@ -0,0 +1,118 @@
+"""
+Read-replica routing. Everything goes to the primary ('default') unless a
+request has opted in with replica_reads(), which ReplicaReadMixin does for
+safe-method requests on the issue and user APIs. Within such a request
+reads go to one replica from settings.DATABASE_REPLICAS, until:
+
+- the request writes anything, after which it reads from the primary too,
+  so a response never misses the request's own changes; or
+- use_primary() is entered for reads that must be current.
+
+A user who wrote within REPLICA_STICKY_SECONDS keeps reading from the
+primary, so that e.g. the list fetched right after creating an issue, or
+adding an image, includes it despite replication lag.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.permissions import SAFE_METHODS
+
+PRIMARY = 'default'
+
+class ReplicaState:
+    def __init__(self):
+        self.replica = None
+        self.wrote = False
+
+_state = ContextVar('replica_state', default=None)
+
+class ReplicaRouter:
+    """Routes reads to the current request's replica, writes to the primary"""
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or state.wrote or state.replica not in settings.DATABASE_REPLICAS:
+            return PRIMARY
+        return state.replica
+    
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return PRIMARY
+    
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+@contextmanager
+def replica_reads():
+    """Track the writes of a request; reads stay on the primary until use_replica()"""
+    state = ReplicaState()
+    token = _state.set(state)
+    try:
+        yield state
+    finally:
+        _state.reset(token)
+
+def use_replica():
+    """Send the current request's reads to a replica from now on, if there are any"""
+    state = _state.get()
+    if state is not None and settings.DATABASE_REPLICAS:
+        state.replica = random.choice(settings.DATABASE_REPLICAS)
+
+def reading_from_replica():
+    """Whether the current request's reads go to a replica"""
+    state = _state.get()
+    return state is not None and not state.wrote and state.replica in settings.DATABASE_REPLICAS
+
+@contextmanager
+def use_primary():
+    """Read from the primary inside the block"""
+    state = _state.get()
+    if state is None or state.replica is None:
+        yield
+        return
+    replica, state.replica = state.replica, None
+    try:
+        yield
+    finally:
+        state.replica = replica
+
+def sticky_key(user):
+    return f'replica-sticky:{user.pk}'
+
+def get_sticky_cache():
+    return caches[settings.REPLICA_STICKY_CACHE_ALIAS]
+
+def wrote_recently(user):
+    return user.is_authenticated and get_sticky_cache().get(sticky_key(user)) is not None
+
+async def awrote_recently(user):
+    return user.is_authenticated and await get_sticky_cache().aget(sticky_key(user)) is not None
+
+def remember_write(user):
+    if user.is_authenticated:
+        get_sticky_cache().set(sticky_key(user), True, settings.REPLICA_STICKY_SECONDS)
+
+class ReplicaReadMixin:
+    """
+    Read from a replica for safe-method requests, and for the actions in
+    `replica_read_actions` that only read despite their method, unless the
+    user wrote within the sticky window.
+    """
+    replica_read_actions = []
+    
+    def dispatch(self, request, *args, **kwargs):
+        with replica_reads() as state:
+            response = super().dispatch(request, *args, **kwargs)
+        if state.wrote and settings.DATABASE_REPLICAS:
+            remember_write(request.user)
+        return response
+    
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        reads_only = request.method in SAFE_METHODS or self.action in self.replica_read_actions
+        if reads_only and settings.DATABASE_REPLICAS and not wrote_recently(request.user):
+            use_replica()
@@ -11,8 +11,10 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 from pathlib import Path
+import copy
 import os
 from datetime import timedelta
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -46,6 +48,7 @@ INSTALLED_APPS = [
     'leaflet',
     'djgeojson',
     'django.contrib.gis',
+    'django.contrib.postgres',
     'drf_spectacular',
 
     # Django default apps
@@ -60,6 +63,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'nagarkranti.metrics.MetricsMiddleware',
+    'nagarkranti.admission.AdmissionControlMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -67,6 +72,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'nagarkranti.async_views.AsyncReadMiddleware',
 ]
 
 ROOT_URLCONF = 'nagarkranti.urls'
@@ -104,6 +110,49 @@ DATABASES = {
     }
 }
 
+# Database connection handling, per deployment from the environment:
+# - DB_POOL_MODE=none opens a connection for every request.
+# - DB_POOL_MODE=persistent (default) keeps each worker thread's connection
+#   for DB_CONN_MAX_AGE seconds, checked before reuse. Not for ASGI, which
+#   runs every request's sync code in a new thread.
+# - DB_POOL_MODE=pool borrows from a psycopg 3 pool of DB_POOL_MIN_SIZE to
+#   DB_POOL_MAX_SIZE connections per worker process, waiting up to
+#   DB_POOL_TIMEOUT seconds for one. Needs `pip install "psycopg[binary,pool]"`.
+# Size pools so that workers x DB_POOL_MAX_SIZE stays below max_connections.
+DB_POOL_MODE = os.environ.get('DB_POOL_MODE', 'persistent')
+if DB_POOL_MODE == 'persistent':
+    DATABASES['default']['CONN_MAX_AGE'] = int(os.environ.get('DB_CONN_MAX_AGE', 60))
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+elif DB_POOL_MODE == 'pool':
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+            'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+            'timeout': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        },
+    }
+elif DB_POOL_MODE != 'none':
+    raise ImproperlyConfigured(f'Unknown DB_POOL_MODE {DB_POOL_MODE!r}')
+
+# Read replicas, as DB_REPLICA_HOSTS=host[:port],... with the primary's
+# database name and credentials. Safe-method requests on the issue and user
+# APIs read from one of them, unless the user wrote in the last
+# REPLICA_STICKY_SECONDS (see nagarkranti/routers.py). Sticky marks live in
+# their own cache, shared by the worker processes (see CACHES).
+DATABASE_ROUTERS = ['nagarkranti.routers.ReplicaRouter']
+DATABASE_REPLICAS = []
+for number, address in enumerate(filter(None, os.environ.get('DB_REPLICA_HOSTS', '').split(',')), 1):
+    host, _, port = address.strip().partition(':')
+    DATABASES[f'replica{number}'] = {
+        **copy.deepcopy(DATABASES['default']),
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{number}')
+REPLICA_STICKY_SECONDS = int(os.environ.get('DB_REPLICA_STICKY_SECONDS', 5))
+REPLICA_STICKY_CACHE_ALIAS = 'replica_sticky'
+
 AUTH_USER_MODEL = 'users.User'
 
 # Password validation
@@ -124,11 +173,54 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing. PASSWORD_HASHER picks how new passwords are hashed:
+# 'pbkdf2' (default), 'scrypt' or 'argon2' (pip install argon2-cffi).
+# Hashes made by the others still verify and are upgraded on login, as are
+# hashes made with other PASSWORD_HASHER_OPTIONS. Compare settings with
+# `python manage.py bench_passwords`.
+PASSWORD_HASHER = os.environ.get('PASSWORD_HASHER', 'pbkdf2')
+_password_hashers = {
+    'pbkdf2': 'users.hashers.PBKDF2PasswordHasher',
+    'scrypt': 'users.hashers.ScryptPasswordHasher',
+    'argon2': 'users.hashers.Argon2PasswordHasher',
+}
+if PASSWORD_HASHER not in _password_hashers:
+    raise ImproperlyConfigured(f'PASSWORD_HASHER must be one of {", ".join(_password_hashers)}')
+PASSWORD_HASHERS = [
+    _password_hashers.pop(PASSWORD_HASHER),
+    *_password_hashers.values(),
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]
+# Unset values keep Django's defaults. Argon2 defaults to the OWASP
+# recommendation of 19 MiB, 2 passes and no parallelism, which the process
+# pool provides instead.
+_scrypt_n = 2 ** int(os.environ.get('SCRYPT_LOG_N', 14))
+PASSWORD_HASHER_OPTIONS = {
+    'pbkdf2': {'iterations': int(os.environ['PBKDF2_ITERATIONS'])} if 'PBKDF2_ITERATIONS' in os.environ else {},
+    'scrypt': {
+        'work_factor': _scrypt_n,
+        'block_size': 8,
+        'parallelism': 1,
+        # OpenSSL refuses more than 32 MiB by default; scrypt needs 128 * N * r bytes
+        'maxmem': 2 * 128 * _scrypt_n * 8,
+    },
+    'argon2': {
+        'time_cost': int(os.environ.get('ARGON2_TIME_COST', 2)),
+        'memory_cost': int(os.environ.get('ARGON2_MEMORY_COST', 19456)),  # KiB
+        'parallelism': int(os.environ.get('ARGON2_PARALLELISM', 1)),
+    },
+}
+# 'inline' hashes in the request thread, 'process' in a pool of
+# PASSWORD_HASHING_WORKERS processes per server worker
+PASSWORD_HASHING_BACKEND = os.environ.get('PASSWORD_HASHING_BACKEND', 'inline')
+PASSWORD_HASHING_WORKERS = int(os.environ.get('PASSWORD_HASHING_WORKERS', 2))
+
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS' : 'drf_spectacular.openapi.AutoSchema',
     
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -140,6 +232,53 @@ REST_FRAMEWORK = {
         #'rest_framework.filters.SearchFilter',
         #'rest_framework.filters.OrderingFilter',
     ),
+    # Token buckets for the scopes in nagarkranti/throttling.py: per user by
+    # role, and per client address
+    'DEFAULT_THROTTLE_RATES': {
+        'issue_create_citizen': '20/hour',
+        'issue_create_municipal': '300/hour',
+        'issue_create_ip': '100/hour',
+        'issue_image_citizen': '60/hour',
+        'issue_image_municipal': '600/hour',
+        'issue_image_ip': '200/hour',
+        'issue_nearby_citizen': '60/min',
+        'issue_nearby_municipal': '300/min',
+        'issue_nearby_ip': '300/min',
+        'register_ip': '10/hour',
+    },
+}
+# Where the throttle buckets are kept: the in-process default, or a cache
+# shared by all workers whose add() is atomic (Memcached or Redis)
+THROTTLE_CACHE_ALIAS = 'default'
+
+# Admission control (nagarkranti/admission.py): requests handled at once per
+# worker process, and fewer while queries average over the threshold
+ADMISSION_MAX_CONCURRENCY = 64
+ADMISSION_DEGRADED_CONCURRENCY = 8
+ADMISSION_LATENCY_THRESHOLD = 250  # milliseconds
+ADMISSION_LATENCY_SMOOTHING = 0.05  # weight of each query in the average
+ADMISSION_RETRY_AFTER = 5  # seconds
+
+# Request metrics (nagarkranti/metrics.py). /metrics answers scrapers that
+# send this bearer token, and is disabled without one.
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        # One JSON line per request
+        'nagarkranti.metrics': {
+            'handlers': ['console'],
+            'level': os.environ.get('METRICS_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
 }
 
 SIMPLE_JWT = {
@@ -152,8 +291,20 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
     'USER_ID_FIELD': 'id',
     'USER_ID_CLAIM': 'user_id',
+    'TOKEN_OBTAIN_SERIALIZER': 'users.serializers.UserTokenObtainPairSerializer',
 }
 
+# Users resolved from access tokens are cached per process for this long.
+# Each hit checks the user's stamp in JWT_USER_CACHE_ALIAS, which every save
+# of the user replaces, so changes (deactivation, role, password) apply to
+# the next request in every process that shares the cache. With a cache
+# that isn't shared, other processes see them up to JWT_USER_CACHE_TIMEOUT
+# later; with one that stores nothing or culls stamps, users are loaded
+# again. The stamps have their own cache, sized for the users (see CACHES).
+JWT_USER_CACHE_TIMEOUT = 30  # seconds
+JWT_USER_CACHE_SIZE = 10000  # users per process, 0 disables the cache
+JWT_USER_CACHE_ALIAS = 'user_stamps'
+
 SPECTACULAR_SETTINGS = {
     'TITLE': 'NagarKranti API',
     'DESCRIPTION': 'Citizen Grievance Reporting and Adressal Platform',
@@ -182,6 +333,103 @@ SPECTACULAR_SETTINGS = {
     },
 }
 
+# Caches. Per-user state that every worker must see, the replica sticky
+# marks and the user cache stamps, is kept apart from the response cache,
+# whose entries come and go. Without CACHE_REDIS_URL it is file based, which
+# is only shared by the processes of one host and culls a random third of
+# the entries once full; deployments on several hosts must set
+# CACHE_REDIS_URL (pip install redis).
+CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL')
+
+def _state_cache(name, max_entries):
+    if CACHE_REDIS_URL:
+        return {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_REDIS_URL,
+            'KEY_PREFIX': name,
+        }
+    return {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, '.cache', name),
+        'OPTIONS': {'MAX_ENTRIES': max_entries},
+    }
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Issue read responses. File based so that invalidations made by one
+    # worker process are seen by all of them.
+    'issues': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, '.cache', 'issues'),
+    },
+    # Marks of users who wrote within REPLICA_STICKY_SECONDS
+    'replica_sticky': _state_cache('replica_sticky', 100_000),
+    # One stamp per user signed in; USER_STAMP_CACHE_ENTRIES should exceed
+    # the number of active users
+    'user_stamps': _state_cache('user_stamps', int(os.environ.get('USER_STAMP_CACHE_ENTRIES', 1_000_000))),
+}
+ISSUE_CACHE_ALIAS = 'issues'
+ISSUE_CACHE_TIMEOUT = 300  # seconds
+
+# Nearby issue search limits
+NEARBY_MAX_DISTANCE = 20000  # meters
+NEARBY_MAX_RESULTS = 1000  # per page, or per stream
+NEARBY_STREAM_CHUNK_SIZE = 200
+
+# Duplicate detection when an issue is reported: unresolved issues of the
+# same type, this close and this recent, with similar text. Candidates are
+# prefiltered by pg_trgm.similarity_threshold (0.3 by default), so a lower
+# DUPLICATE_MIN_SIMILARITY has no effect.
+DUPLICATE_SEARCH_DISTANCE = 50  # meters
+DUPLICATE_SEARCH_DAYS = 30
+DUPLICATE_MIN_SIMILARITY = 0.4
+DUPLICATE_MAX_RESULTS = 5
+
+# Default window of the time-to-resolution report
+RESOLUTION_REPORT_DAYS = 90
+
+# Issue status push (server-sent events at /api/issues/events/):
+# 'local' for a single worker, 'postgres' to fan out with LISTEN/NOTIFY
+ISSUE_EVENTS_BACKEND = 'local'
+ISSUE_EVENTS_HEARTBEAT = 15  # seconds between keep-alive comments
+ISSUE_EVENTS_QUEUE_SIZE = 100  # undelivered events before a slow stream is closed
+ISSUE_EVENTS_REPLAY_LIMIT = 100  # missed events resent on reconnect
+
+# Hot reads served by async views under ASGI, by URL name and method
+# (see nagarkranti/async_views.py). Under WSGI the DRF views serve them.
+ASYNC_READ_VIEWS = {
+    ('issue-list', 'GET'): 'issues.async_views.IssueListView',
+    ('issue-detail', 'GET'): 'issues.async_views.IssueDetailView',
+    ('issue-nearby', 'POST'): 'issues.async_views.NearbyIssueView',
+    ('user-me', 'GET'): 'users.async_views.MeView',
+}
+
+# Issue image processing: 'thread' (default), 'process' or 'sync'
+IMAGE_PROCESSING_BACKEND = 'thread'
+IMAGE_PROCESSING_WORKERS = 2
+IMAGE_RENDITION_QUALITY = 80
+
+# Resumable image uploads
+IMAGE_UPLOAD_TEMP_DIR = os.path.join(BASE_DIR, '.uploads')
+IMAGE_UPLOAD_CHUNK_SIZE = 1024 * 1024  # bytes, largest accepted chunk
+IMAGE_UPLOAD_MAX_SIZE = 25 * 1024 * 1024  # bytes
+IMAGE_UPLOAD_EXPIRY_HOURS = 24
+
+# Bulk issue import
+ISSUE_IMPORT_BATCH_SIZE = 1000
+ISSUE_IMPORT_MAX_BATCH_SIZE = 10000
+
+# Features per chunk of the streamed GeoJSON export
+GEOJSON_EXPORT_CHUNK_SIZE = 2000
+
+# Issue map tiles
+TILE_MAX_ZOOM = 22
+TILE_CLUSTER_MAX_ZOOM = 13  # Tiles up to this zoom return clusters
+TILE_CLUSTER_GRID = 64  # Cluster cells per tile side
+TILE_CACHE_TIMEOUT = 300  # seconds
+
 # CORS settings
 CORS_ALLOW_ALL_ORIGINS = True
 # Internationalization
@@ -9,8 +9,19 @@ DATABASES = {
         'PASSWORD': 'sysadmin',
         'HOST': 'localhost',
         'PORT': '5432',
-    }
+    },
+    # A second database standing in for a read replica in the routing tests.
+    # Tests opt in with override_settings(DATABASE_REPLICAS=['replica']).
+    'replica': {
+        'ENGINE': 'django.contrib.gis.db.backends.postgis',
+        'NAME': 'nagarkranti_replica_test',
+        'USER': 'postgres',
+        'PASSWORD': 'sysadmin',
+        'HOST': 'localhost',
+        'PORT': '5432',
+    },
 }
+DATABASE_REPLICAS = []
 
 # Use a faster password hasher for testing
 PASSWORD_HASHERS = [
@@ -24,5 +35,27 @@ REST_FRAMEWORK = {
     'DEFAULT_THROTTLE_RATES': {}
 }
 
+# Don't let cached responses leak between tests; cache tests enable it
+CACHES = {
+    **CACHES,
+    'issues': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    },
+    'replica_sticky': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'replica-sticky',
+    },
+    'user_stamps': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'user-stamps',
+    },
+}
+
+# Process uploaded images inline so tests can check the renditions
+IMAGE_PROCESSING_BACKEND = 'sync'
+
 # Use in-memory file storage for tests to avoid leaving files
 DEFAULT_FILE_STORAGE = 'inmemorystorage.InMemoryStorage'
+
+# Keep the per-request log lines out of the test output
+LOGGING['loggers']['nagarkranti.metrics']['level'] = 'WARNING'
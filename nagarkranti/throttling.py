@@ -0,0 +1,138 @@
+"""
+Token bucket rate limits for the endpoints that write or hit PostGIS hard.
+A view names the scope of each action in `throttle_scopes`, or of all its
+requests in `throttle_scope`, and the rates come from
+REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']:
+
+- `<scope>_citizen` and `<scope>_municipal` per authenticated user, by role;
+- `<scope>_ip` per client address.
+
+A rate of 'N/period' is a bucket of N requests, refilled at N per period, so
+clients may burst up to N and then continue at the average rate. Scopes
+without a rate aren't limited. Buckets are kept in the cache named by
+THROTTLE_CACHE_ALIAS; the in-process default cache limits each worker
+process separately, a shared cache limits all of them together.
+
+Reading and writing back a bucket happens under a lock taken with
+cache.add(), so concurrent requests of one client can't all spend the same
+token. add() is atomic in the local memory, Memcached and Redis caches but
+not in the file-based one. A request that can't get the lock within about
+LOCK_ATTEMPTS * LOCK_WAIT seconds is throttled.
+"""
+import asyncio
+import time
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+DURATIONS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+# Bucket locks expire on their own in case a holder dies
+LOCK_TIMEOUT = 1  # seconds
+LOCK_ATTEMPTS = 10
+LOCK_WAIT = 0.005  # seconds between attempts
+
+def get_throttle_cache():
+    return caches[settings.THROTTLE_CACHE_ALIAS]
+
+def get_throttle_scope(view):
+    scopes = getattr(view, 'throttle_scopes', None)
+    if scopes is not None:
+        return scopes.get(getattr(view, 'action', None))
+    return getattr(view, 'throttle_scope', None)
+
+def parse_rate(rate):
+    """'N/period' as (capacity, tokens per second)"""
+    count, period = rate.split('/')
+    return int(count), int(count) / DURATIONS[period[0]]
+
+def take_token(state, capacity, per_second, now):
+    """
+    Refill the bucket `state`, (tokens, updated), and take a token from it.
+    Returns whether one was available, the new state and, if not, the
+    seconds until there will be.
+    """
+    tokens, updated = state or (capacity, now)
+    tokens = min(capacity, tokens + (now - updated) * per_second)
+    if tokens >= 1:
+        return True, (tokens - 1, now), None
+    return False, (tokens, now), (1 - tokens) / per_second
+
+class TokenBucketThrottle(BaseThrottle):
+    """Base class: subclasses pick the rate and the client to count against"""
+    wait_seconds = None
+    
+    def get_bucket(self, request, scope):
+        """(rate name, client key) for the request, or None to not limit it"""
+        raise NotImplementedError('.get_bucket() must be overridden')
+    
+    def get_limits(self, request, view):
+        """(cache key, capacity, tokens per second), or None to not limit"""
+        scope = get_throttle_scope(view)
+        bucket = scope and self.get_bucket(request, scope)
+        if not bucket:
+            return None
+        name, client = bucket
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(name)
+        if rate is None:
+            return None
+        return (f'throttle:{name}:{client}', *parse_rate(rate))
+    
+    def allow_request(self, request, view):
+        limits = self.get_limits(request, view)
+        if limits is None:
+            return True
+        key, capacity, per_second = limits
+        cache = get_throttle_cache()
+        for _ in range(LOCK_ATTEMPTS):
+            if cache.add(f'{key}:lock', True, LOCK_TIMEOUT):
+                break
+            time.sleep(LOCK_WAIT)
+        else:
+            self.wait_seconds = 1 / per_second
+            return False
+        try:
+            allowed, state, self.wait_seconds = take_token(cache.get(key), capacity, per_second, time.time())
+            cache.set(key, state, capacity / per_second)
+        finally:
+            cache.delete(f'{key}:lock')
+        return allowed
+    
+    async def aallow_request(self, request, view):
+        """allow_request() for async views"""
+        limits = self.get_limits(request, view)
+        if limits is None:
+            return True
+        key, capacity, per_second = limits
+        cache = get_throttle_cache()
+        for _ in range(LOCK_ATTEMPTS):
+            if await cache.aadd(f'{key}:lock', True, LOCK_TIMEOUT):
+                break
+            await asyncio.sleep(LOCK_WAIT)
+        else:
+            self.wait_seconds = 1 / per_second
+            return False
+        try:
+            allowed, state, self.wait_seconds = take_token(await cache.aget(key), capacity, per_second, time.time())
+            await cache.aset(key, state, capacity / per_second)
+        finally:
+            await cache.adelete(f'{key}:lock')
+        return allowed
+    
+    def wait(self):
+        return self.wait_seconds
+
+class UserBucketThrottle(TokenBucketThrottle):
+    """Limits each authenticated user, at the rate for their role"""
+    def get_bucket(self, request, scope):
+        user = request.user
+        if not user or not user.is_authenticated:
+            return None
+        role = 'municipal' if user.is_municipal_user() else 'citizen'
+        return f'{scope}_{role}', user.pk
+
+class AddressBucketThrottle(TokenBucketThrottle):
+    """Limits each client address, whoever is signed in"""
+    def get_bucket(self, request, scope):
+        return f'{scope}_ip', self.get_ident(request)
@@ -22,6 +22,7 @@ from rest_framework import permissions
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
+from .metrics import METRICS_VIEW, metrics_view
 
 
 # API Documentation Setup
@@ -41,6 +42,7 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/users/', include('users.urls')),
     path('api/issues/', include('issues.urls')),
+    path('metrics', metrics_view, name=METRICS_VIEW),
 
     # API Documentation
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),  # OpenAPI schema
@@ -5,5 +5,7 @@ class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
     verbose_name = 'User Management'
-
-    
\ No newline at end of file
+    
+    def ready(self):
+        # Register signal handlers
+        from . import signals  # noqa: F401
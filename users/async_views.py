@@ -0,0 +1,13 @@
+"""
+Async version of users/me, served in place of UserViewSet under ASGI by
+nagarkranti.async_views.AsyncReadMiddleware.
+"""
+from rest_framework.response import Response
+from nagarkranti.async_views import AsyncAPIView
+from .serializers import UserSerializer
+
+class MeView(AsyncAPIView):
+    """GET /api/users/me/"""
+    async def get(self, request):
+        # The user was loaded by authentication; nothing else to query
+        return Response(UserSerializer(request.user, context=self.get_serializer_context()).data)
@@ -0,0 +1,106 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+from .cache import auser_stamp, user_cache, user_stamp
+
+TOKEN_VERSION_CLAIM = 'token_version'
+USER_TYPE_CLAIM = 'type'
+
+def add_user_claims(token, user):
+    """Add the claims CachedJWTAuthentication resolves users by"""
+    token[TOKEN_VERSION_CLAIM] = user.token_version
+    token[USER_TYPE_CLAIM] = user.type
+    return token
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that resolves users from users.cache.user_cache.
+    Tokens issued without the version and type claims load the user every
+    time, as before.
+    """
+    def get_user(self, validated_token):
+        claims = self.get_cache_claims(validated_token)
+        if claims is None:
+            return super().get_user(validated_token)
+        
+        # Read before loading the user, so a change racing with the load outdates it
+        stamp = user_stamp(claims[0])
+        user = user_cache.get(*claims, stamp)
+        if user is None:
+            user = self.check_claims(super().get_user(validated_token), claims)
+            user_cache.set(user, stamp)
+        return user
+    
+    def get_cache_claims(self, validated_token):
+        """(user id, token version, type) if the token carries them, else None"""
+        try:
+            return (
+                validated_token[api_settings.USER_ID_CLAIM],
+                validated_token[TOKEN_VERSION_CLAIM],
+                validated_token[USER_TYPE_CLAIM],
+            )
+        except KeyError:
+            return None
+    
+    def check_claims(self, user, claims):
+        """Reject tokens issued before the user's token_version was bumped"""
+        if (user.token_version, user.type) != claims[1:]:
+            raise AuthenticationFailed(_("Token has been revoked."), code="token_revoked")
+        return user
+
+class AsyncJWTAuthentication(CachedJWTAuthentication):
+    """
+    JWTAuthentication for async views: the token is checked in the event
+    loop and the user loaded with the async ORM.
+    """
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+    
+    async def aget_user(self, validated_token):
+        """get_user() without blocking the event loop"""
+        claims = self.get_cache_claims(validated_token)
+        if claims is None:
+            return await self.aload_user(validated_token)
+        
+        stamp = await auser_stamp(claims[0])
+        user = user_cache.get(*claims, stamp)
+        if user is None:
+            user = self.check_claims(await self.aload_user(validated_token), claims)
+            user_cache.set(user, stamp)
+        return user
+    
+    async def aload_user(self, validated_token):
+        """JWTAuthentication.get_user() with the same checks, using the async ORM"""
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+        
+        try:
+            user = await self.user_model.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+        
+        return user
@@ -0,0 +1,76 @@
+"""
+In-process cache of the users that access tokens resolve to, so that an
+authenticated request needs no database query to load its user.
+
+Entries are keyed by user id and only returned for tokens carrying the same
+token_version and type as the cached user. Every save or delete of a user
+also replaces its stamp, a per-user value in the cache shared by the worker
+processes (JWT_USER_CACHE_ALIAS, see users.signals). Entries remember the
+stamp read before the user was loaded and are only used while it is
+current, so every process reloads the user, and checks again that it is
+active and that the token isn't revoked, on its next request after a change.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import caches
+
+def get_stamp_cache():
+    return caches[settings.JWT_USER_CACHE_ALIAS]
+
+def stamp_key(user_id):
+    return f'user-stamp:{user_id}'
+
+def user_stamp(user_id):
+    # Stamps start from the clock so a lost stamp never reuses an old one
+    return get_stamp_cache().get_or_set(stamp_key(user_id), time.time_ns, None)
+
+async def auser_stamp(user_id):
+    return await get_stamp_cache().aget_or_set(stamp_key(user_id), time.time_ns, None)
+
+def touch_user(user_id):
+    """Outdate the cached copies of the user in every process"""
+    get_stamp_cache().set(stamp_key(user_id), time.time_ns(), None)
+
+class UserCache:
+    """A thread-safe LRU of users with a time to live"""
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+    
+    def get(self, user_id, token_version, user_type, stamp):
+        """A copy of the cached user, or None if it is missing or outdated by `stamp`"""
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is None:
+                return None
+            user, user_stamp, expires = entry
+            if (expires <= time.monotonic() or user_stamp != stamp
+                    or user.token_version != token_version or user.type != user_type):
+                del self.entries[user_id]
+                return None
+            self.entries.move_to_end(user_id)
+        # Requests may modify their user; keep the cached one intact
+        return copy.copy(user)
+    
+    def set(self, user, stamp):
+        """Cache `user`, loaded after reading its `stamp`"""
+        if settings.JWT_USER_CACHE_SIZE <= 0:
+            return
+        with self.lock:
+            self.entries[user.pk] = (copy.copy(user), stamp, time.monotonic() + settings.JWT_USER_CACHE_TIMEOUT)
+            self.entries.move_to_end(user.pk)
+            while len(self.entries) > settings.JWT_USER_CACHE_SIZE:
+                self.entries.popitem(last=False)
+    
+    def evict(self, user_id):
+        with self.lock:
+            self.entries.pop(user_id, None)
+    
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+user_cache = UserCache()
@@ -0,0 +1,78 @@
+"""
+Password hashers with parameters from settings.PASSWORD_HASHER_OPTIONS, and
+an optional process pool to run them in (PASSWORD_HASHING_BACKEND =
+'process'). Hashing is CPU-bound by design. A pool of
+PASSWORD_HASHING_WORKERS processes caps how much CPU registration and login
+spikes can take, leaving the rest to other requests. The request thread
+still waits for its hash, so it isn't freed meanwhile; it only stops
+competing for the CPU (and, with threads, the GIL).
+
+Django's check_password() rehashes a password on successful login when it
+was hashed with another hasher or other parameters. Changing the settings
+therefore upgrades stored hashes as users sign in.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from django.conf import settings
+from django.contrib.auth import hashers
+
+_pool = None
+
+# Set in pool workers, which hash inline
+_in_worker = False
+
+def _start_worker():
+    global _in_worker
+    _in_worker = True
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.PASSWORD_HASHING_WORKERS,
+            initializer=_start_worker
+        )
+    return _pool
+
+def _call(hasher, method, args, kwargs):
+    return getattr(hasher, method)(*args, **kwargs)
+
+class PooledHasherMixin:
+    """
+    Run encode() and verify() in the pool when the backend is 'process',
+    blocking the caller until the result is back. Instances carry their
+    parameters, so workers hash with the same ones.
+    """
+    options_key = None
+    
+    def __init__(self, **options):
+        options = {**settings.PASSWORD_HASHER_OPTIONS.get(self.options_key, {}), **options}
+        for name, value in options.items():
+            setattr(self, name, value)
+    
+    def encode(self, *args, **kwargs):
+        return self.run('encode', *args, **kwargs)
+    
+    def verify(self, password, encoded):
+        return self.run('verify', password, encoded)
+    
+    def run(self, method, *args, **kwargs):
+        local = getattr(super(), method)
+        if _in_worker or settings.PASSWORD_HASHING_BACKEND != 'process':
+            return local(*args, **kwargs)
+        global _pool
+        try:
+            return get_pool().submit(_call, self, method, args, kwargs).result()
+        except BrokenProcessPool:
+            # A worker died (e.g. out of memory); start a new pool next time
+            _pool = None
+            return local(*args, **kwargs)
+
+class PBKDF2PasswordHasher(PooledHasherMixin, hashers.PBKDF2PasswordHasher):
+    options_key = 'pbkdf2'
+
+class ScryptPasswordHasher(PooledHasherMixin, hashers.ScryptPasswordHasher):
+    options_key = 'scrypt'
+
+class Argon2PasswordHasher(PooledHasherMixin, hashers.Argon2PasswordHasher):
+    options_key = 'argon2'
@@ -0,0 +1,108 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from users import hashers
+
+HASHERS = {
+    'pbkdf2': hashers.PBKDF2PasswordHasher,
+    'scrypt': hashers.ScryptPasswordHasher,
+    'argon2': hashers.Argon2PasswordHasher,
+}
+
+PASSWORD = 'Bench-password-123'
+
+def verify_for(hasher, encoded, seconds):
+    """Verify `encoded` repeatedly for `seconds`; return how many times"""
+    count = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        hasher.verify(PASSWORD, encoded)
+        count += 1
+    return count
+
+def int_list(value):
+    return [int(item) for item in value.split(',') if item]
+
+class Command(BaseCommand):
+    """
+    Measure how many logins per second each password hasher setting allows.
+    One process per core verifies a password for --seconds, like the
+    PASSWORD_HASHING_BACKEND = 'process' pool does at login, and the rate is
+    reported per core along with how long one verification takes meanwhile.
+    Parameter lists sweep a hasher, e.g. --argon2-memory 19456,47104.
+    """
+    help = 'Benchmark password hashers and their parameters'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--hashers', default=','.join(HASHERS),
+                            help='Comma-separated hashers to compare')
+        parser.add_argument('--pbkdf2-iterations', type=int_list, default=[],
+                            help='PBKDF2 iteration counts (default: configured)')
+        parser.add_argument('--scrypt-log-n', type=int_list, default=[],
+                            help='scrypt work factors as log2(N) (default: configured)')
+        parser.add_argument('--argon2-memory', type=int_list, default=[],
+                            help='Argon2 memory costs in KiB (default: configured)')
+        parser.add_argument('--argon2-time', type=int_list, default=[],
+                            help='Argon2 time costs (default: configured)')
+        parser.add_argument('--processes', type=int, default=os.cpu_count(),
+                            help='Verifying processes, one per core by default')
+        parser.add_argument('--seconds', type=float, default=5,
+                            help='How long each setting is measured')
+    
+    def handle(self, *args, **options):
+        names = options['hashers'].split(',')
+        unknown = set(names) - set(HASHERS)
+        if unknown:
+            raise CommandError(f'Unknown hashers: {", ".join(sorted(unknown))}')
+        
+        cores = min(options['processes'], os.cpu_count())
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'{options["processes"]} processes for {options["seconds"]:g} s per setting '
+            f'(configured: {settings.PASSWORD_HASHER})'
+        ))
+        self.stdout.write(f'{"setting":<44}{"logins/s":>10}{"per core":>10}{"ms each":>10}')
+        with ProcessPoolExecutor(max_workers=options['processes'], initializer=hashers._start_worker) as pool:
+            for name in names:
+                for label, hasher in self.settings_for(name, options):
+                    try:
+                        encoded = hasher.encode(PASSWORD, hasher.salt())
+                    except ValueError as e:
+                        # The argon2 library isn't installed
+                        self.stderr.write(f'Skipping {label}: {e}')
+                        break
+                    rate = self.measure(pool, hasher, encoded, options['processes'], options['seconds'])
+                    latency = 1000 * options['processes'] / rate if rate else float('inf')
+                    self.stdout.write(f'{label:<44}{rate:>10.1f}{rate / cores:>10.1f}{latency:>10.1f}')
+    
+    def settings_for(self, name, options):
+        """(label, hasher) for each parameter setting to measure"""
+        configured = settings.PASSWORD_HASHER_OPTIONS.get(name, {})
+        if name == 'pbkdf2':
+            variants = [{'iterations': value} for value in options['pbkdf2_iterations']]
+        elif name == 'scrypt':
+            variants = [
+                {'work_factor': 2 ** value, 'maxmem': 2 * 128 * 2 ** value * configured.get('block_size', 8)}
+                for value in options['scrypt_log_n']
+            ]
+        else:
+            variants = [
+                {key: value for key, value in (('memory_cost', memory), ('time_cost', cost)) if value is not None}
+                for memory in options['argon2_memory'] or [None]
+                for cost in options['argon2_time'] or [None]
+            ]
+        for variant in variants or [{}]:
+            hasher = HASHERS[name](**variant)
+            if name == 'pbkdf2':
+                params = f'iterations={hasher.iterations}'
+            elif name == 'scrypt':
+                params = f'N=2^{hasher.work_factor.bit_length() - 1} r={hasher.block_size} p={hasher.parallelism}'
+            else:
+                params = f'm={hasher.memory_cost} KiB t={hasher.time_cost} p={hasher.parallelism}'
+            yield f'{name} {params}', hasher
+    
+    def measure(self, pool, hasher, encoded, processes, seconds):
+        """Verifications per second across the pool"""
+        futures = [pool.submit(verify_for, hasher, encoded, seconds) for _ in range(processes)]
+        return sum(future.result() for future in futures) / seconds
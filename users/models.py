@@ -22,10 +22,45 @@ class User(AbstractUser):
     aadhaar_number = models.CharField(max_length=12, blank=True, null=True)
     phone_number = models.CharField(max_length=10, blank=True, null=True)
     
+    # Access tokens carry this as a claim; it is bumped whenever a field in
+    # TOKEN_VERSION_FIELDS changes, which revokes the tokens issued before
+    token_version = models.PositiveIntegerField(default=0, editable=False)
+    
+    TOKEN_VERSION_FIELDS = ('type', 'is_active', 'is_staff', 'is_superuser')
+    
     class Meta:
         verbose_name = _('User')
         verbose_name_plural = _('Users')
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._token_fields = instance.get_token_fields()
+        return instance
+    
+    def get_token_fields(self):
+        return {name: getattr(self, name) for name in self.TOKEN_VERSION_FIELDS if name in self.__dict__}
+    
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._token_fields = self.get_token_fields()
+    
+    def save(self, *args, **kwargs):
+        loaded = getattr(self, '_token_fields', {})
+        update_fields = kwargs.get('update_fields')
+        current = self.get_token_fields()
+        changed = {name for name, value in loaded.items() if current.get(name) != value}
+        if update_fields is not None:
+            changed &= set(update_fields)
+        if changed:
+            self.token_version += 1
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'token_version'}
+        super().save(*args, **kwargs)
+        if update_fields is not None:
+            current = {name: value for name, value in current.items() if name in update_fields}
+        self._token_fields = {**loaded, **current}
+    
     def is_municipal_user(self):
         """Check if the user is a municipal officer"""
         return self.type == self.UserType.MUNICIPAL
@@ -0,0 +1,10 @@
+from rest_framework.pagination import PageNumberPagination
+from nagarkranti.pagination import KeysetPagination
+
+class UserCursorPagination(KeysetPagination):
+    """
+    Keyset pagination for the user list, keyed on id.
+    Requests with a `page` parameter keep the old page-number format.
+    """
+    ordering = ('id',)
+    page_number_class = PageNumberPagination
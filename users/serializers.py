@@ -2,10 +2,13 @@ from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 from rest_framework.validators import UniqueValidator
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from nagarkranti.metrics import MeasuredSerializerMixin
+from .authentication import add_user_claims
 
 User = get_user_model()
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(MeasuredSerializerMixin, serializers.ModelSerializer):
     """Serializer for viewing user information"""
     class Meta:
         model = User
@@ -65,4 +68,10 @@ class UpdateUserSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = User
-        fields = ['first_name', 'last_name', 'email']
\ No newline at end of file
+        fields = ['first_name', 'last_name', 'email']
+
+class UserTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Issue tokens with the claims CachedJWTAuthentication resolves users by"""
+    @classmethod
+    def get_token(cls, user):
+        return add_user_claims(super().get_token(user), user)
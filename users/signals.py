@@ -0,0 +1,16 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .cache import touch_user, user_cache
+from .models import User
+
+@receiver([post_save, post_delete], sender=User)
+def evict_cached_user(sender, instance, **kwargs):
+    """Drop the user from this process's user cache and outdate it in the others"""
+    def evict():
+        user_cache.evict(instance.pk)
+        touch_user(instance.pk)
+    
+    evict()
+    # A request reading before the commit may have cached the old row again
+    transaction.on_commit(evict, using=kwargs.get('using'))
@@ -0,0 +1,125 @@
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+from django.contrib.auth import get_user_model
+from users.cache import touch_user, user_cache
+
+User = get_user_model()
+
+class CachedJWTAuthenticationTest(APITestCase):
+    """Test case for resolving token users from the user cache"""
+    
+    def setUp(self):
+        user_cache.clear()
+        self.citizen_user = User.objects.create_user(
+            username='testcitizen',
+            email='citizen@example.com',
+            password='test1234',
+            type=User.UserType.CITIZEN
+        )
+        self.me_url = reverse('user-me')
+    
+    def login(self):
+        response = self.client.post(
+            reverse('token_obtain_pair'),
+            {'username': 'testcitizen', 'password': 'test1234'},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {response.data["access"]}')
+        return response.data['access']
+    
+    def test_token_claims(self):
+        """Test that issued tokens carry the token version and user type"""
+        token = AccessToken(self.login())
+        self.assertEqual(token['token_version'], 0)
+        self.assertEqual(token['type'], User.UserType.CITIZEN)
+    
+    def test_cached_user_needs_no_query(self):
+        """Test that the user is loaded once and then served from the cache"""
+        self.login()
+        with self.assertNumQueries(1):
+            response = self.client.get(self.me_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.me_url)
+        self.assertEqual(response.data['username'], 'testcitizen')
+    
+    def test_tokens_without_claims(self):
+        """Test that tokens issued without the claims load the user every time"""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.citizen_user)}')
+        for _ in range(2):
+            with self.assertNumQueries(1):
+                response = self.client.get(self.me_url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+    
+    def test_profile_update_evicts(self):
+        """Test that profile changes are seen by the next request"""
+        self.login()
+        self.client.get(self.me_url)
+        response = self.client.patch(
+            reverse('user-detail', kwargs={'pk': self.citizen_user.pk}),
+            {'first_name': 'Asha', 'last_name': 'Rao', 'email': 'asha@example.com'},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(self.me_url).data['email'], 'asha@example.com')
+    
+    def test_change_password_evicts(self):
+        """Test that a changed password is checked against on the next request"""
+        self.login()
+        url = reverse('user-change-password')
+        for old, new in (('test1234', 'NewStrongPass123!'), ('NewStrongPass123!', 'OtherStrongPass456!')):
+            response = self.client.post(url, {
+                'old_password': old,
+                'new_password': new,
+                'new_password2': new,
+            }, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        # Other fields are left alone
+        self.citizen_user.refresh_from_db()
+        self.assertEqual(self.citizen_user.email, 'citizen@example.com')
+        self.assertTrue(self.citizen_user.check_password('OtherStrongPass456!'))
+    
+    def test_role_change_revokes_tokens(self):
+        """Test that tokens issued before a type change are rejected"""
+        self.login()
+        self.assertEqual(self.client.get(self.me_url).status_code, status.HTTP_200_OK)
+        
+        user = User.objects.get(pk=self.citizen_user.pk)
+        user.type = User.UserType.MUNICIPAL
+        user.save()
+        self.assertEqual(user.token_version, 1)
+        
+        response = self.client.get(self.me_url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        
+        self.login()
+        response = self.client.get(self.me_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['type'], User.UserType.MUNICIPAL)
+    
+    def test_change_in_other_process(self):
+        """Test that a deactivation saved by another process applies to the next request"""
+        self.login()
+        self.assertEqual(self.client.get(self.me_url).status_code, status.HTTP_200_OK)
+        
+        # Another process's save: the row changes and the shared stamp with it,
+        # but nothing is evicted from this process's cache
+        User.objects.filter(pk=self.citizen_user.pk).update(is_active=False)
+        touch_user(self.citizen_user.pk)
+        
+        response = self.client.get(self.me_url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+    
+    def test_profile_save_keeps_tokens(self):
+        """Test that saves that don't change the role keep the token version"""
+        user = User.objects.get(pk=self.citizen_user.pk)
+        user.first_name = 'Asha'
+        user.save()
+        user.set_password('AnotherPass789!')
+        user.save(update_fields=['password'])
+        user.refresh_from_db()
+        self.assertEqual(user.token_version, 0)
@@ -0,0 +1,84 @@
+from django.contrib.auth.hashers import check_password, get_hasher, identify_hasher, make_password
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from users import hashers
+
+User = get_user_model()
+
+SCRYPT_HASHERS = [
+    'users.hashers.ScryptPasswordHasher',
+    'users.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.MD5PasswordHasher',
+]
+# Cheap parameters; the hashing cost isn't what is tested
+SCRYPT_OPTIONS = {'scrypt': {'work_factor': 2 ** 10, 'block_size': 8, 'parallelism': 1}, 'pbkdf2': {'iterations': 1000}}
+
+@override_settings(PASSWORD_HASHERS=SCRYPT_HASHERS, PASSWORD_HASHER_OPTIONS=SCRYPT_OPTIONS)
+class PasswordHasherTest(TestCase):
+    """Test case for the configured password hashers"""
+    
+    def tearDown(self):
+        if hashers._pool is not None:
+            hashers._pool.shutdown()
+            hashers._pool = None
+    
+    def test_options(self):
+        """Test that hashers use the parameters from settings"""
+        encoded = make_password('test1234')
+        self.assertTrue(encoded.startswith('scrypt$1024$'))
+        self.assertTrue(check_password('test1234', encoded))
+        self.assertFalse(get_hasher('scrypt').must_update(encoded))
+        self.assertTrue(hashers.ScryptPasswordHasher(work_factor=2 ** 11).must_update(encoded))
+    
+    @override_settings(PASSWORD_HASHING_BACKEND='process', PASSWORD_HASHING_WORKERS=1)
+    def test_process_backend(self):
+        """Test that hashing and verification run in the process pool"""
+        encoded = make_password('test1234')
+        self.assertIsNotNone(hashers._pool)
+        self.assertTrue(check_password('test1234', encoded))
+        self.assertFalse(check_password('wrong', encoded))
+        self.assertEqual(identify_hasher(encoded).algorithm, 'scrypt')
+        
+        pbkdf2 = hashers.PBKDF2PasswordHasher()
+        self.assertTrue(pbkdf2.verify('test1234', pbkdf2.encode('test1234', pbkdf2.salt(), 1500)))
+
+@override_settings(PASSWORD_HASHERS=SCRYPT_HASHERS, PASSWORD_HASHER_OPTIONS=SCRYPT_OPTIONS)
+class PasswordRehashTest(APITestCase):
+    """Test case for upgrading stored password hashes on login"""
+    
+    def setUp(self):
+        self.citizen_user = User.objects.create_user(
+            username='testcitizen',
+            email='citizen@example.com',
+            password='test1234',
+            type=User.UserType.CITIZEN
+        )
+        self.citizen_user.password = make_password('test1234', hasher='md5')
+        self.citizen_user.save()
+    
+    def test_login_rehashes(self):
+        """Test that logging in rehashes with the preferred hasher"""
+        response = self.client.post(
+            reverse('token_obtain_pair'),
+            {'username': 'testcitizen', 'password': 'test1234'},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        self.citizen_user.refresh_from_db()
+        self.assertEqual(identify_hasher(self.citizen_user.password).algorithm, 'scrypt')
+        self.assertTrue(self.citizen_user.check_password('test1234'))
+    
+    def test_failed_login_keeps_hash(self):
+        """Test that a wrong password leaves the stored hash alone"""
+        response = self.client.post(
+            reverse('token_obtain_pair'),
+            {'username': 'testcitizen', 'password': 'wrong'},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.citizen_user.refresh_from_db()
+        self.assertEqual(identify_hasher(self.citizen_user.password).algorithm, 'md5')
@@ -4,12 +4,15 @@ from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework_simplejwt.views import TokenObtainPairView
+from nagarkranti.routers import ReplicaReadMixin
+from nagarkranti.throttling import AddressBucketThrottle
 from .serializers import (
     UserSerializer, 
     UserCreateSerializer, 
     ChangePasswordSerializer,
     UpdateUserSerializer
 )
+from .pagination import UserCursorPagination
 from .permissions import IsMunicipalUser, IsOwnerOrMunicipal
 
 User = get_user_model()
@@ -22,8 +25,10 @@ class RegisterView(generics.CreateAPIView):
     queryset = User.objects.all()
     permission_classes = [AllowAny]
     serializer_class = UserCreateSerializer
+    throttle_classes = [AddressBucketThrottle]
+    throttle_scope = 'register'
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """
     API endpoint for user management.
     - Municipal users can view all users
@@ -32,6 +37,7 @@ class UserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = UserCursorPagination
     
     def get_permissions(self):
         """
@@ -87,7 +93,8 @@ class UserViewSet(viewsets.ModelViewSet):
             
             # Set new password
             user.set_password(serializer.validated_data['new_password'])
-            user.save()
+            # request.user may come from the user cache; only write what changed
+            user.save(update_fields=['password'])
             return Response({"message": "Password changed successfully."}, 
                            status=status.HTTP_200_OK)
             